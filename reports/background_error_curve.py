@@ -0,0 +1,121 @@
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, List
+
+import numpy as np
+
+# --- 설정 ---
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(PROJECT_ROOT, "src"))
+
+from model_train.feature_encoder import FeatureEncoder, FEATURE_ENCODER_PATH
+from model_train.background import BACKGROUND_METHODS, build_background, build_stratified_background
+from model_train.infer import load_model
+from model_train.shap_utils import build_explainer_for_expected_grade, shap_values_for_batch, penalties_from_values
+from coach.coach import select_top3_factors_by_contrib
+from labeling.data_store import read_dataset
+
+MODEL_PATH = os.path.join(PROJECT_ROOT, "data/models/model_lgbm.pkl")
+TRAIN_DATA_PATH = os.path.join(PROJECT_ROOT, "data/processed/train")
+TEST_DATA_PATH = os.path.join(PROJECT_ROOT, "data/processed/test")
+
+DEFAULT_KS = [5, 10, 20, 50, 100]
+# 기준 SHAP 값: 층별 표본 1000행 배경 (permutation 비용은 배경 행 수에 비례 → 행당 ~10s)
+DEFAULT_REFERENCE_ROWS = 1000
+# 해석할 테스트 행 수 (permutation 은 행당 ~1s × 배경 행 수 / 100)
+DEFAULT_EVAL_ROWS = 32
+# 배경 표본/k-means seed (평균 내는 횟수), 기준 배경 seed 는 따로
+DEFAULT_SEEDS = [42, 43, 44]
+REFERENCE_SEED = 7
+# 배경마다 같은 순열을 쓰도록 explain 직전에 고정하는 seed (차이에서 순열 표본 잡음을 줄임)
+EXPLAIN_SEED = 0
+
+
+def explain(model, background: np.ndarray, X: np.ndarray) -> Dict[str, Any]:
+    """permutation 기대등급 SHAP (첫 호출 워밍업은 제외하고 시간 측정)"""
+    explainer = build_explainer_for_expected_grade(model, background, mode="permutation")
+    np.random.seed(EXPLAIN_SEED)
+    shap_values_for_batch(explainer, X[:1])
+    np.random.seed(EXPLAIN_SEED)
+    t0 = time.perf_counter()
+    values = shap_values_for_batch(explainer, X)
+    return {"values": values, "seconds_per_row": (time.perf_counter() - t0) / len(X)}
+
+
+def top3(values: np.ndarray, feature_names: List[str]) -> List[List[str]]:
+    return [select_top3_factors_by_contrib(penalties_from_values(v, feature_names)) for v in values]
+
+
+def run_curve(ks: List[int], methods: List[str], reference_rows: int, eval_rows: int,
+              seeds: List[int] = DEFAULT_SEEDS) -> Dict[str, Any]:
+    """
+    배경 선택 방식 × 크기 k 별로 기준(큰 층별 표본 배경) 대비 SHAP 오차와 행당 시간
+    - mean/max |Δφ|: 기대등급 SHAP 값 차이
+    - top1: 카드 첫 번째 팩터가 기준과 같은 행 비율, top3_overlap: Top3 팩터 중 기준과 겹치는 평균 비율
+      (MoodScore 외 피처의 기여가 매우 작아 2~3순위는 작은 차이로도 바뀜)
+    - stratified/kmeans 는 배경 seed 마다 결과가 달라 seeds 평균 (mean|Δφ| 는 seed 간 표준편차도), head 는 1회
+    """
+    encoder = FeatureEncoder.load(FEATURE_ENCODER_PATH)
+    model = load_model(MODEL_PATH)
+    df_train = read_dataset(TRAIN_DATA_PATH)
+    X = build_stratified_background(read_dataset(TEST_DATA_PATH), encoder, eval_rows, seed=seeds[0])
+    names = encoder.feature_names
+
+    print(f"기준 배경: 층별 표본 {reference_rows}행, 해석 {len(X)}행, 배경 seed {seeds}", flush=True)
+    ref = explain(model, build_stratified_background(df_train, encoder, reference_rows, seed=REFERENCE_SEED), X)
+    ref_top3 = top3(ref["values"], names)
+    print(f"  기준 {ref['seconds_per_row']:.2f} s/row", flush=True)
+
+    rows = []
+    for method in methods:
+        for k in ks:
+            runs = []
+            for seed in (seeds[:1] if method == "head" else seeds):
+                background = build_background(df_train, encoder, method, k, seed)
+                res = explain(model, background, X)
+                diff = np.abs(res["values"] - ref["values"])
+                got = top3(res["values"], names)
+                runs.append({
+                    "mean_abs_error": float(diff.mean()),
+                    "max_abs_error": float(diff.max()),
+                    "top1": float(np.mean([a[:1] == b[:1] for a, b in zip(got, ref_top3)])),
+                    "top3_overlap": float(np.mean([len(set(a) & set(b)) / max(len(b), 1) for a, b in zip(got, ref_top3)])),
+                    "seconds_per_row": res["seconds_per_row"],
+                })
+            # kmeans 의 k 는 중심 수 (배경 행은 가중 복제 후 rows 행)
+            row = {"method": method, "k": int(min(k, background.shape[0])), "rows": int(background.shape[0]),
+                   "seeds": len(runs)}
+            row.update({key: float(np.mean([r[key] for r in runs])) for key in runs[0]})
+            row["mean_abs_error_std"] = float(np.std([r["mean_abs_error"] for r in runs]))
+            rows.append(row)
+            print(f"  {method:>10} k={row['k']:>4} ({row['rows']}행)  mean|Δ| {row['mean_abs_error']:.4f} (±{row['mean_abs_error_std']:.4f})  "
+                  f"max|Δ| {row['max_abs_error']:.3f}  top1 일치 {row['top1']:.2f}  top3 겹침 {row['top3_overlap']:.2f}  "
+                  f"{row['seconds_per_row']:.3f} s/row", flush=True)
+    return {
+        "reference_rows": reference_rows,
+        "eval_rows": int(len(X)),
+        "seeds": list(seeds),
+        "reference_seconds_per_row": ref["seconds_per_row"],
+        "results": rows,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="SHAP 배경 데이터 크기/선택 방식별 오차-지연 곡선 (permutation explainer)")
+    parser.add_argument("--ks", type=int, nargs="+", default=DEFAULT_KS)
+    parser.add_argument("--methods", nargs="+", choices=BACKGROUND_METHODS, default=list(BACKGROUND_METHODS))
+    parser.add_argument("--reference-rows", type=int, default=DEFAULT_REFERENCE_ROWS)
+    parser.add_argument("--eval-rows", type=int, default=DEFAULT_EVAL_ROWS)
+    parser.add_argument("--seeds", type=int, nargs="+", default=DEFAULT_SEEDS)
+    parser.add_argument("--out", default=None, help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    print("--- SHAP 배경 데이터 오차-지연 곡선 ---")
+    result = run_curve(args.ks, args.methods, args.reference_rows, args.eval_rows, args.seeds)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"\n결과 저장: {args.out}")
@@ -0,0 +1,75 @@
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+# --- 설정 ---
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(PROJECT_ROOT, "src"))
+
+from model_train.infer import predict_grade_and_proba, predict_grades_and_proba
+from model_train.feature_encoder import FeatureEncoder
+from labeling.data_store import read_dataset
+from coach.pipeline import CoachPipeline
+
+MODEL_PATH = os.path.join(PROJECT_ROOT, "data/models/model_lgbm.pkl")
+TRAIN_DATA_PATH = os.path.join(PROJECT_ROOT, "data/processed/train")
+ENCODER_PATH = os.path.join(PROJECT_ROOT, "data/models/feature_encoder.json")
+
+
+def load_rows(n: int, X_train: np.ndarray, seed: int = 0) -> np.ndarray:
+    """train.csv 행을 복원추출해서 n행짜리 입력 배치 생성"""
+    rng = np.random.default_rng(seed)
+    return X_train[rng.integers(0, X_train.shape[0], size=n)]
+
+
+def measure(fn, repeat: int = 1) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CoachPipeline 배치 처리량 측정")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000],
+                        help="등급 예측(predict_proba) 처리량을 잴 배치 크기")
+    parser.add_argument("--card-sizes", type=int, nargs="+", default=[100],
+                        help="SHAP 포함 predict_cards 처리량을 잴 배치 크기")
+    parser.add_argument("--loop-limit", type=int, default=10_000,
+                        help="행 단위 루프 비교는 이 크기까지만 수행")
+    args = parser.parse_args()
+
+    encoder = FeatureEncoder.load(ENCODER_PATH)
+    X_train = encoder.encode_columns(read_dataset(TRAIN_DATA_PATH))
+    feature_names = encoder.feature_names
+
+    pipeline = CoachPipeline(
+        model_path=MODEL_PATH,
+        background_X=X_train[:100],
+        feature_names=feature_names
+    )
+
+    print("--- 1. 등급 예측: 행 단위 루프 vs 배치 ---")
+    for n in args.sizes:
+        X = load_rows(n, X_train)
+        t_batch = measure(lambda: predict_grades_and_proba(pipeline.model, X), repeat=3)
+        line = f"n={n:>7}  batch {t_batch:8.3f}s ({n / t_batch:12,.0f} rows/s)"
+        if n <= args.loop_limit:
+            t_loop = measure(lambda: [predict_grade_and_proba(pipeline.model, X[i:i + 1]) for i in range(n)])
+            line += f"  loop {t_loop:8.3f}s ({n / t_loop:10,.0f} rows/s)  x{t_loop / t_batch:.1f}"
+        print(line)
+
+    print("\n--- 2. predict_cards (예측 + SHAP + 카드) ---")
+    for n in args.card_sizes:
+        X = load_rows(n, X_train)
+        t_cards = measure(lambda: pipeline.predict_cards(X))
+        print(f"n={n:>7}  predict_cards {t_cards:8.3f}s ({n / t_cards:10,.1f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
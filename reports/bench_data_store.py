@@ -0,0 +1,88 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+# --- 설정 ---
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(PROJECT_ROOT, "src"))
+
+from model_train.feature_encoder import FeatureEncoder
+from labeling.data_store import PROCESSED_DIR, FORMATS, read_dataset, read_table, write_dataset
+
+ENCODER_PATH = os.path.join(PROJECT_ROOT, "data/models/feature_encoder.json")
+DATASETS = ["train", "val", "test", "life_synth_merged", "env_merged"]
+
+
+def best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def bench_dir(data_dir: str, name: str, encoder: FeatureEncoder, repeat: int):
+    """CSV / parquet / feather 각각: 파일 크기, DataFrame 전체 로드, 피처 컬럼만 읽어 인코딩"""
+    csv_path = os.path.join(data_dir, name + ".csv")
+    rows = {}
+    t_csv = best_of(lambda: pd.read_csv(csv_path), repeat)
+    t_csv_enc = best_of(lambda: encoder.encode_columns(pd.read_csv(csv_path)), repeat)
+    rows["csv"] = (os.path.getsize(csv_path), t_csv, t_csv_enc)
+
+    cols = None
+    if name != "env_merged":
+        cols = [c for c in encoder.numeric_cols + list(encoder.categories) if c in pd.read_csv(csv_path, nrows=0).columns]
+    for fmt, ext in FORMATS.items():
+        path = os.path.join(data_dir, name + ext)
+        if not os.path.exists(path):
+            continue
+        t_full = best_of(lambda: read_dataset(path, fmt=fmt), repeat)
+        t_enc = best_of(lambda: encoder.encode_columns(read_table(path, columns=cols, fmt=fmt)), repeat) if cols else float("nan")
+        rows[fmt] = (os.path.getsize(path), t_full, t_enc)
+
+    base_size, base_t, base_enc = rows["csv"]
+    for fmt, (size, t_full, t_enc) in rows.items():
+        print(f"  {fmt:8s} {size / 1024:10.1f} KB ({size / base_size:5.2f}x) | "
+              f"DataFrame 로드 {t_full * 1e3:9.2f} ms (x{base_t / t_full:5.1f}) | "
+              f"피처 컬럼 → 인코딩 {t_enc * 1e3:9.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="processed 데이터: CSV vs Parquet/Feather 로드 시간·디스크 크기")
+    parser.add_argument("--datasets", nargs="+", default=DATASETS)
+    parser.add_argument("--rows", type=int, nargs="*", default=[1_000_000],
+                        help="train 을 이 행 수로 늘린 복사본으로도 측정 (임시 폴더)")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    encoder = FeatureEncoder.load(ENCODER_PATH)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # 저장소의 CSV 에서 parquet/feather 를 새로 만들어 같은 내용으로 비교
+        for name in args.datasets:
+            df = pd.read_csv(os.path.join(PROCESSED_DIR, name + ".csv"))
+            df.to_csv(os.path.join(tmp, name + ".csv"), index=False)
+            for fmt in FORMATS:
+                write_dataset(df, name, data_dir=tmp, fmt=fmt)
+            print(f"{name} ({len(df):,} rows)")
+            bench_dir(tmp, name, encoder, args.repeat)
+
+        train = pd.read_csv(os.path.join(PROCESSED_DIR, "train.csv"))
+        for n in args.rows:
+            name = f"train_x{n}"
+            big = train.iloc[np.arange(n) % len(train)].reset_index(drop=True)
+            big.to_csv(os.path.join(tmp, name + ".csv"), index=False)
+            for fmt in FORMATS:
+                write_dataset(big, name, data_dir=tmp, fmt=fmt)
+            print(f"train 반복 ({n:,} rows)")
+            bench_dir(tmp, name, encoder, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+# --- 설정 ---
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(PROJECT_ROOT, "src"))
+
+from model_train.feature_encoder import FeatureEncoder
+from labeling.data_store import read_dataset
+
+ENCODER_PATH = os.path.join(PROJECT_ROOT, "data/models/feature_encoder.json")
+TEST_DATA_PATH = os.path.join(PROJECT_ROOT, "data/processed/test")
+
+N_SINGLE = 2_000       # 단일 레코드 반복 횟수
+BATCH_SIZES = [1_000, 100_000]
+
+
+def per_call(fn, n: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - t0) / n
+
+
+def pandas_encode(df: pd.DataFrame, feature_names) -> np.ndarray:
+    """기존 방식: get_dummies + reindex + astype"""
+    return pd.get_dummies(df).reindex(columns=feature_names, fill_value=0).values.astype(np.float32)
+
+
+def main():
+    encoder = FeatureEncoder.load(ENCODER_PATH)
+    df_test = read_dataset(TEST_DATA_PATH).drop("ConditionLabel", axis=1)
+    record = df_test.iloc[0].to_dict()
+
+    print("--- 단일 레코드 (UI 제출 1회) ---")
+    buf = np.zeros((1, encoder.n_features), dtype=np.float32)
+    t_pd = per_call(lambda: pandas_encode(pd.DataFrame([record]), encoder.feature_names), N_SINGLE)
+    t_enc = per_call(lambda: encoder.encode_record(record, out=buf), N_SINGLE)
+    assert np.array_equal(pandas_encode(pd.DataFrame([record]), encoder.feature_names), encoder.encode_record(record))
+    print(f"pandas  {t_pd * 1e6:9.1f} us/row")
+    print(f"encoder {t_enc * 1e6:9.1f} us/row  (x{t_pd / t_enc:.0f})")
+
+    print("\n--- 배치 ---")
+    rng = np.random.default_rng(0)
+    for n in BATCH_SIZES:
+        batch = df_test.iloc[rng.integers(0, len(df_test), size=n)].reset_index(drop=True)
+        records = batch.to_dict("records")
+        t_pd = per_call(lambda: pandas_encode(batch, encoder.feature_names), 3)
+        t_cols = per_call(lambda: encoder.encode_columns(batch), 3)
+        t_recs = per_call(lambda: encoder.encode_records(records), 1)
+        assert np.array_equal(pandas_encode(batch, encoder.feature_names), encoder.encode_columns(batch))
+        print(f"n={n:>7}  pandas {t_pd * 1e3:9.2f} ms | encode_columns {t_cols * 1e3:9.2f} ms"
+              f" | encode_records {t_recs * 1e3:9.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
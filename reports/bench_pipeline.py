@@ -0,0 +1,246 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+# --- 설정 ---
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(PROJECT_ROOT, "src"))
+
+from model_train.feature_encoder import FeatureEncoder, parse_today_input, time_str_to_hours
+from model_train.infer import predict_grade_and_proba, predict_grades_and_proba
+from model_train.shap_utils import shap_penalties_for_sample, shap_penalties_for_batch
+from model_train.background import load_background
+from coach.coach import select_top3_factors_by_contrib
+from coach.card_builder import build_card
+from coach.pipeline import CoachPipeline
+from labeling.data_store import read_dataset
+
+MODEL_PATH = os.path.join(PROJECT_ROOT, "data/models/model_lgbm.pkl")
+BACKGROUND_PATH = os.path.join(PROJECT_ROOT, "data/models/shap_background.npz")
+ENCODER_PATH = os.path.join(PROJECT_ROOT, "data/models/feature_encoder.json")
+TEST_DATA_PATH = os.path.join(PROJECT_ROOT, "data/processed/test")
+BENCH_DIR = os.path.join(PROJECT_ROOT, "reports", "bench")
+
+# 1 = UI 제출 1회, 나머지 = 배치 경로 (predict_cards 등)
+# permutation SHAP 은 행당 ~1s 라 기본 배치 크기는 작게 (tree explainer 는 --sizes 로 크게)
+SIZES = [1, 32]
+# (단계, 크기) 당 반복 횟수 상한과 시간 예산 (느린 단계는 예산 안에서 최소 1회)
+DEFAULT_REPEATS = 200
+DEFAULT_BUDGET_SECONDS = 2.0
+# 비교 시 이 비율 이상 느려지면 표시
+REGRESSION_RATIO = 1.2
+
+TIME_KEYS = {"SleepTime": "sleep_time", "ActivityTime": "activity_time", "PhoneTime": "phone_time"}
+VALUE_KEYS = {"Caffeine": "caffeine", "MoodScore": "mood_score", "Temp": "temp", "Humidity": "humidity", "PM10": "pm10"}
+
+
+def hours_to_time_str(hours: float) -> str:
+    """time_str_to_hours 의 역변환: 시간(float) → 'hh:mm:ss'"""
+    total = int(round(float(hours) * 3600))
+    return f"{total // 3600:02d}:{total % 3600 // 60:02d}:{total % 60:02d}"
+
+
+def to_raw_input(record: Dict[str, Any]) -> Dict[str, str]:
+    """데이터셋 행 → TodayInputPage 입력 형식(dict of str)"""
+    raw = {key: hours_to_time_str(record[col]) for col, key in TIME_KEYS.items()}
+    raw.update({key: str(int(round(record[col]))) if col in ("Caffeine", "MoodScore") else str(record[col])
+                for col, key in VALUE_KEYS.items()})
+    if record.get("profile_type") is not None:
+        # 범주 컬럼은 입력 키 = 모델 입력 컬럼 이름 (서비스 /predict 는 없으면 400)
+        raw["profile_type"] = str(record["profile_type"])
+    return raw
+
+
+def measure(fn: Callable[[], Any], repeats: int = DEFAULT_REPEATS, budget_seconds: float = DEFAULT_BUDGET_SECONDS) -> Dict[str, Any]:
+    """
+    1회 워밍업 후 repeats 회 또는 budget_seconds 가 찰 때까지 반복 → 호출당 시간 분포 (ms)
+    - 워밍업 한 번이 예산을 넘는 느린 단계(permutation SHAP 배치 등)는 그 1회를 결과로 사용
+    """
+    t0 = time.perf_counter()
+    fn()
+    first = (time.perf_counter() - t0) * 1e3
+    if first >= budget_seconds * 1e3:
+        return {"runs": 1, "p50_ms": first, "p95_ms": first, "min_ms": first}
+    times = []
+    start = time.perf_counter()
+    while len(times) < repeats and (not times or time.perf_counter() - start < budget_seconds):
+        t0 = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - t0) * 1e3)
+    p50, p95 = np.percentile(times, [50, 95])
+    return {"runs": len(times), "p50_ms": float(p50), "p95_ms": float(p95), "min_ms": float(min(times))}
+
+
+def build_stages(pipeline: CoachPipeline, encoder: FeatureEncoder, raws: List[Dict[str, str]]) -> Dict[str, Callable[[int], Callable[[], Any]]]:
+    """
+    단계 이름 → (크기 n → 측정할 함수)
+    - n == 1 은 UI 단건 경로 함수, n > 1 은 배치 함수가 있으면 배치, 없으면 행 단위 루프
+    - 각 단계 입력은 앞 단계 결과를 미리 계산해 두고 사용 (해당 단계 시간만 측정)
+    """
+    records = [parse_today_input(r) for r in raws]
+    X_all = encoder.encode_records(records)
+    grades, _ = predict_grades_and_proba(pipeline.backend, X_all)
+    contribs = shap_penalties_for_batch(pipeline.explainer, X_all, pipeline.feature_names)
+    top3 = [select_top3_factors_by_contrib(c) for c in contribs]
+    ctxs = [pipeline._context_env(x) for x in X_all]
+    buf = np.zeros((1, encoder.n_features), dtype=np.float32)
+
+    def parse_time(n):
+        values = [r[key] for r in raws[:n] for key in TIME_KEYS.values()]
+        return lambda: [time_str_to_hours(v) for v in values]
+
+    def parse_input(n):
+        return lambda: [parse_today_input(r) for r in raws[:n]]
+
+    def encode(n):
+        if n == 1:
+            return lambda: encoder.encode_record(records[0], out=buf)
+        return lambda: encoder.encode_records(records[:n])
+
+    def predict(n):
+        X = X_all[:n]
+        if n == 1:
+            return lambda: predict_grade_and_proba(pipeline.backend, X)
+        return lambda: predict_grades_and_proba(pipeline.backend, X)
+
+    def shap_stage(n):
+        X = X_all[:n]
+        if n == 1:
+            return lambda: shap_penalties_for_sample(pipeline.explainer, X, pipeline.feature_names)
+        return lambda: shap_penalties_for_batch(pipeline.explainer, X, pipeline.feature_names)
+
+    def top3_stage(n):
+        return lambda: [select_top3_factors_by_contrib(c) for c in contribs[:n]]
+
+    def card(n):
+        return lambda: [build_card(int(grades[i]), top3[i], pipeline.lib, context_env=ctxs[i], max_actions=5)
+                        for i in range(n)]
+
+    def full(n):
+        X = X_all[:n]
+        if n == 1:
+            return lambda: pipeline.predict_card(X)
+        return lambda: pipeline.predict_cards(X)
+
+    return {
+        "time_str_to_hours": parse_time,
+        "parse_today_input": parse_input,
+        "encode": encode,
+        "predict_grade_and_proba": predict,
+        "shap_penalties": shap_stage,
+        "select_top3_factors": top3_stage,
+        "build_card": card,
+        "predict_card": full,
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT,
+                             capture_output=True, text=True, check=True)
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=PROJECT_ROOT,
+                               capture_output=True, text=True).stdout.strip()
+        return out.stdout.strip() + ("-dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def machine_info() -> Dict[str, Any]:
+    """같은 머신끼리만 비교하도록 결과에 함께 기록"""
+    import lightgbm
+    import shap
+
+    return {
+        "host": platform.node(),
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "lightgbm": lightgbm.__version__,
+        "shap": shap.__version__,
+    }
+
+
+def run_bench(sizes: List[int] = SIZES, stages: Optional[List[str]] = None, explainer_mode: str = "permutation",
+              repeats: int = DEFAULT_REPEATS, budget_seconds: float = DEFAULT_BUDGET_SECONDS) -> Dict[str, Any]:
+    encoder = FeatureEncoder.load(ENCODER_PATH)
+    pipeline = CoachPipeline.from_artifacts(MODEL_PATH, BACKGROUND_PATH, explainer_mode=explainer_mode)
+    df = read_dataset(TEST_DATA_PATH)
+    rows = df.iloc[np.arange(max(sizes)) % len(df)].to_dict("records")
+    raws = [to_raw_input(r) for r in rows]
+
+    stage_fns = build_stages(pipeline, encoder, raws)
+    names = stages or list(stage_fns)
+    results = []
+    for name in names:
+        for n in sizes:
+            r = measure(stage_fns[name](n), repeats, budget_seconds)
+            r.update(stage=name, size=n, row_us=r["p50_ms"] * 1e3 / n)
+            results.append(r)
+            print(f"  {name:<24} n={n:>5}  p50 {r['p50_ms']:10.3f} ms  p95 {r['p95_ms']:10.3f} ms"
+                  f"  {r['row_us']:10.1f} µs/row  ({r['runs']} runs)")
+    return {
+        "commit": git_commit(),
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "machine": machine_info(),
+        "explainer_mode": explainer_mode,
+        "background_rows": int(load_background(BACKGROUND_PATH)[0].shape[0]),
+        "results": results,
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], ratio: float = REGRESSION_RATIO) -> List[Dict[str, Any]]:
+    """(단계, 크기)별 p50 비율 = 현재 / 기준. ratio 이상이면 regression 으로 표시"""
+    if current["machine"].get("host") != baseline["machine"].get("host"):
+        print(f"[WARN] 다른 머신의 결과와 비교 중: {baseline['machine'].get('host')}")
+    if current.get("explainer_mode") != baseline.get("explainer_mode"):
+        print(f"[WARN] explainer 가 다름: {baseline.get('explainer_mode')} → {current.get('explainer_mode')}")
+    base = {(r["stage"], r["size"]): r for r in baseline["results"]}
+    rows = []
+    print(f"\n--- 비교: {baseline.get('commit')} → {current.get('commit')} ---")
+    for r in current["results"]:
+        b = base.get((r["stage"], r["size"]))
+        if b is None:
+            continue
+        x = r["p50_ms"] / b["p50_ms"] if b["p50_ms"] else float("inf")
+        flag = "  ← regression" if x >= ratio else ""
+        print(f"  {r['stage']:<24} n={r['size']:>5}  {b['p50_ms']:10.3f} → {r['p50_ms']:10.3f} ms  x{x:5.2f}{flag}")
+        rows.append({"stage": r["stage"], "size": r["size"], "ratio": x, "regression": x >= ratio})
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="코칭 파이프라인 단계별 벤치마크 (단건/배치, JSON 저장 후 커밋 간 비교)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--stages", nargs="+", default=None, help="측정할 단계 (기본: 전부)")
+    parser.add_argument("--explainer", choices=["permutation", "tree"], default="permutation")
+    parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS)
+    parser.add_argument("--budget", type=float, default=DEFAULT_BUDGET_SECONDS, help="(단계, 크기) 당 측정 시간 예산(초)")
+    parser.add_argument("--out", default=None, help="결과 JSON (기본: reports/bench/pipeline_<commit>.json)")
+    parser.add_argument("--compare", default=None, help="비교할 이전 결과 JSON")
+    args = parser.parse_args()
+
+    print(f"--- 파이프라인 벤치마크 (explainer={args.explainer}) ---")
+    result = run_bench(args.sizes, args.stages, args.explainer, args.repeats, args.budget)
+
+    out = args.out or os.path.join(BENCH_DIR, f"pipeline_{result['commit'] or 'nogit'}_{args.explainer}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            result["comparison"] = {"baseline": args.compare, "rows": compare(result, json.load(f))}
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    print(f"\n결과 저장: {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import argparse
+import json
+import os
+import sys
+from typing import Any, Dict, List
+
+import numpy as np
+
+# --- 설정 ---
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(PROJECT_ROOT, "src"))
+
+from model_train.feature_encoder import FeatureEncoder, FEATURE_ENCODER_PATH
+from model_train.shap_pool import ShapPool
+from labeling.data_store import read_dataset
+
+TEST_DATA_PATH = os.path.join(PROJECT_ROOT, "data/processed/test")
+
+# permutation 은 행당 ~1s 라 기본 행 수를 작게 (tree 는 --rows 로 크게)
+DEFAULT_ROWS = {"permutation": 64, "tree": 65536}
+
+
+def make_rows(n_rows: int) -> np.ndarray:
+    """테스트셋을 반복해서 n_rows 행 인코딩 배열"""
+    X = FeatureEncoder.load(FEATURE_ENCODER_PATH).encode_columns(read_dataset(TEST_DATA_PATH))
+    return np.ascontiguousarray(X[np.arange(n_rows) % len(X)])
+
+
+def run_scaling(worker_counts: List[int], mode: str, n_rows: int, repeats: int = 1) -> Dict[str, Any]:
+    """
+    워커 수별 ShapPool.explain 처리량
+    - 기동(모델 로드 + explainer 워밍업)은 따로 측정하고 explain 시간에서 제외
+    - 첫 워커 수 결과를 기준으로 속도 향상/효율, 최대 |Δ| (tree 는 0 이어야 함)
+    """
+    X = make_rows(n_rows)
+    rows = []
+    reference = None
+    for w in worker_counts:
+        with ShapPool(mode=mode, workers=w) as pool:
+            startup = pool.warmup()
+            times = []
+            for _ in range(repeats):
+                values = pool.explain(X)
+                times.append(pool.last_stats["wall_seconds"])
+            wall = float(np.median(times))
+            if reference is None:
+                reference = (w, wall, values)
+            row = {
+                "workers": w,
+                "startup_seconds": startup,
+                "wall_seconds": wall,
+                "rows_per_second": n_rows / wall,
+                "speedup": reference[1] / wall,
+                "efficiency": reference[1] / wall / (w / reference[0]),
+                "shards": pool.last_stats["shards"],
+                "max_abs_diff": float(np.abs(values - reference[2]).max()),
+            }
+        rows.append(row)
+        print(f"  workers={w:>2}  기동 {row['startup_seconds']:6.1f}s  explain {wall:8.2f}s  "
+              f"{row['rows_per_second']:9.1f} rows/s  x{row['speedup']:4.2f} (효율 {row['efficiency']:4.2f})  "
+              f"max|Δ| {row['max_abs_diff']:.1e}", flush=True)
+    return {"mode": mode, "rows": n_rows, "cpu_count": os.cpu_count(), "results": rows}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="ShapPool 워커 수별 SHAP 해석 처리량 (1..N 프로세스)")
+    parser.add_argument("--workers", type=int, nargs="+", default=None, help="기본: 1, 2, 4, ... cpu 수")
+    parser.add_argument("--explainer", choices=["permutation", "tree"], default="permutation")
+    parser.add_argument("--rows", type=int, default=None)
+    parser.add_argument("--repeats", type=int, default=1)
+    parser.add_argument("--out", default=None, help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    cpus = os.cpu_count() or 1
+    workers = args.workers or sorted({1, cpus, *[2 ** k for k in range(1, 8) if 2 ** k < cpus]})
+    n_rows = args.rows or DEFAULT_ROWS[args.explainer]
+    print(f"--- ShapPool 확장성 (explainer={args.explainer}, {n_rows}행, cpu {cpus}개) ---")
+    result = run_scaling(workers, args.explainer, n_rows, args.repeats)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"\n결과 저장: {args.out}")
@@ -0,0 +1,54 @@
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+# --- 설정 ---
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(PROJECT_ROOT, "src"))
+sys.path.append(os.path.join(PROJECT_ROOT, "src", "labeling"))
+
+from synth_merge import load_cfg, deep_merge, synth_one_profile, synth_one_profile_loop
+from labeling.data_store import read_dataset
+
+CFG_PATH = os.path.join(PROJECT_ROOT, "config/life_profile.yaml")
+ENV_PATH = os.path.join(PROJECT_ROOT, "data/processed/env_merged")
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    out = fn()
+    return out, time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="합성 데이터 생성기: 루프 vs 벡터화 비교")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[6_000, 1_000_000, 10_000_000])
+    parser.add_argument("--loop-limit", type=int, default=1_000_000, help="루프 기준 구현은 이 크기까지만 실행")
+    parser.add_argument("--profile", default="weekday_baseline")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    cfg = load_cfg(CFG_PATH)
+    prof = next(p for p in cfg["profiles"] if p["name"] == args.profile)
+    params = deep_merge(cfg.get("defaults", {}), prof.get("overrides", {}))
+    env_df = read_dataset(ENV_PATH, columns=["PM10", "Temp", "Humidity"])
+
+    # numba 컴파일(또는 캐시 로드) 시간은 따로 표시
+    _, t_warm = timed(lambda: synth_one_profile(10, args.seed, env_df, params, args.profile))
+    print(f"warm-up (커널 컴파일/캐시 로드): {t_warm:.2f}s")
+
+    for n in args.sizes:
+        fast, t_fast = timed(lambda: synth_one_profile(n, args.seed, env_df, params, args.profile))
+        line = f"n={n:>10,}  vectorized {t_fast:8.3f}s ({n / t_fast:12,.0f} rows/s)"
+        if n <= args.loop_limit:
+            ref, t_loop = timed(lambda: synth_one_profile_loop(n, args.seed, env_df, params, args.profile))
+            same = all(np.array_equal(ref[c].to_numpy(), fast[c].to_numpy()) for c in ref.columns)
+            line += f"  loop {t_loop:8.3f}s  x{t_loop / t_fast:6.1f}  bit-identical={same}"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
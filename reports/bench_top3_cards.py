@@ -0,0 +1,135 @@
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Any, Callable, Dict
+
+import numpy as np
+
+# --- 설정 ---
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(PROJECT_ROOT, "src"))
+
+from model_train.feature_encoder import FeatureEncoder, FEATURE_ENCODER_PATH
+from model_train.infer import load_model, predict_grades_and_proba
+from model_train.shap_utils import build_explainer_for_expected_grade, shap_values_for_batch, penalties_from_values
+from coach.coach import select_top3_factors_by_contrib, FactorIndex, select_top_factors_batch, factor_lists
+from coach.card_builder import get_library, build_card, CompiledCardRules, build_cards_batch, WARNING_RULES
+from coach.pipeline import CONTEXT_ENV_FEATURES
+from labeling.data_store import read_dataset
+
+MODEL_PATH = os.path.join(PROJECT_ROOT, "data/models/model_lgbm.pkl")
+TEST_DATA_PATH = os.path.join(PROJECT_ROOT, "data/processed/test")
+
+DEFAULT_ROWS = 100_000
+DEFAULT_REPEATS = 3
+
+
+def make_inputs(n_rows: int, seed: int = 0) -> Dict[str, Any]:
+    """
+    테스트셋 행의 기대등급 SHAP 값(tree explainer)·등급·환경값을 n_rows 행으로 반복
+    - 그대로 반복하면 동점/조합이 실제보다 적으므로 SHAP 값에 작은 잡음을 섞음
+    - 환경값(경고 규칙 키 → PM10/Temp/Humidity 피처 열)에도 표준편차만큼 잡음 → 모든 경고 규칙이 일부 행에서 걸림
+    """
+    encoder = FeatureEncoder.load(FEATURE_ENCODER_PATH)
+    model = load_model(MODEL_PATH)
+    X = encoder.encode_columns(read_dataset(TEST_DATA_PATH))
+    values = shap_values_for_batch(build_explainer_for_expected_grade(model, X, mode="tree"), X)
+    grades, _ = predict_grades_and_proba(model, X)
+    idx = np.arange(n_rows) % len(X)
+    rng = np.random.default_rng(seed)
+    noise = rng.normal(scale=np.abs(values).mean(axis=0) * 0.5, size=(n_rows, values.shape[1]))
+    env = {}
+    for key, col in CONTEXT_ENV_FEATURES.items():
+        column = X[:, encoder.feature_names.index(col)].astype(np.float64)
+        env[key] = column[idx] + rng.normal(scale=column.std(), size=n_rows)
+    return {
+        "feature_names": encoder.feature_names,
+        "values": values[idx] + noise,
+        "grades": np.asarray(grades)[idx],
+        "env": env,
+    }
+
+
+def timed(fn: Callable[[], Any], repeats: int) -> Dict[str, Any]:
+    """repeats 회 실행 → 가장 빠른 시간과 마지막 결과"""
+    best = float("inf")
+    result = None
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return {"seconds": best, "result": result}
+
+
+def run(n_rows: int, repeats: int) -> Dict[str, Any]:
+    """
+    행 단위 경로(penalties_from_values → select_top3_factors_by_contrib → build_card)와
+    배치 경로(select_top_factors_batch + factor_lists → build_cards_batch)의 행당 시간 (µs) + 결과 일치 확인
+    """
+    data = make_inputs(n_rows)
+    names, values, grades, env = data["feature_names"], data["values"], data["grades"], data["env"]
+    lib = get_library()
+    index = FactorIndex(names)
+    rules = CompiledCardRules(lib, index.factor_names, max_actions=5)
+
+    def per_row_top3():
+        return [select_top3_factors_by_contrib(penalties_from_values(v, names)) for v in values]
+
+    def batch_top3():
+        top = select_top_factors_batch(values, index)
+        factor_lists(top, index)  # 파이프라인 출력(top3 이름 리스트)까지 포함
+        return top
+
+    row_top3 = timed(per_row_top3, repeats)
+    bat_top3 = timed(batch_top3, repeats)
+    top3 = row_top3["result"]
+
+    def per_row_cards():
+        return [build_card(int(g), t, lib, context_env={key: float(v[i]) for key, v in env.items()}, max_actions=5)
+                for i, (g, t) in enumerate(zip(grades, top3))]
+
+    def batch_cards():
+        return build_cards_batch(grades, bat_top3["result"], rules, context_env=env)
+
+    row_cards = timed(per_row_cards, repeats)
+    bat_cards = timed(batch_cards, repeats)
+
+    top3_match = factor_lists(bat_top3["result"], index) == top3
+    cards_match = row_cards["result"] == bat_cards["result"]
+    # 경고가 붙은 카드도 비교했는지 (규칙별 경고 행 수)
+    warning_rows = {text: sum(text in card["warnings"] for card in bat_cards["result"])
+                    for _key, _threshold, _above, text in WARNING_RULES}
+    stages = {
+        "top3": (row_top3["seconds"], bat_top3["seconds"]),
+        "cards": (row_cards["seconds"], bat_cards["seconds"]),
+        "top3+cards": (row_top3["seconds"] + row_cards["seconds"], bat_top3["seconds"] + bat_cards["seconds"]),
+    }
+    results = {}
+    for stage, (row_s, bat_s) in stages.items():
+        results[stage] = {
+            "per_row_us": row_s / n_rows * 1e6,
+            "batch_us": bat_s / n_rows * 1e6,
+            "speedup": row_s / bat_s,
+        }
+        print(f"  {stage:>10}: 행 단위 {results[stage]['per_row_us']:7.2f} µs/row  →  배치 "
+              f"{results[stage]['batch_us']:6.2f} µs/row  (x{results[stage]['speedup']:.1f})")
+    print(f"  결과 일치: top3 {top3_match}, 카드 {cards_match} (경고 행: {list(warning_rows.values())})")
+    return {"rows": n_rows, "results": results, "top3_match": top3_match, "cards_match": cards_match,
+            "warning_rows": warning_rows}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Top3 팩터 선택 + 카드 생성: 행 단위 vs 배치 경로 행당 시간")
+    parser.add_argument("--rows", type=int, default=DEFAULT_ROWS)
+    parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS)
+    parser.add_argument("--out", default=None, help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    print(f"--- Top3 + 카드 ({args.rows:,}행, 최소 시간 / {args.repeats}회) ---")
+    result = run(args.rows, args.repeats)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"\n결과 저장: {args.out}")
@@ -1,24 +1,32 @@
+import argparse
+import json
+import os
+import sys
 import pandas as pd
-import lightgbm as lgb
 import numpy as np
-from sklearn.model_selection import KFold, cross_val_score
 
 # --- 설정 ---
 # 교차검증 분할 개수 (K)
 N_SPLITS = 5
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(PROJECT_ROOT, "src"))
+
+from model_train.feature_encoder import FeatureEncoder
+from model_train.cross_validation import cross_validate_oof
+from labeling.data_store import read_dataset
+
 # 데이터 경로
-TRAIN_DATA_PATH = os.path.join(PROJECT_ROOT, "data/processed/train.csv")
-VAL_DATA_PATH = os.path.join(PROJECT_ROOT, "data/processed/val.csv")
+TRAIN_DATA_PATH = os.path.join(PROJECT_ROOT, "data/processed/train")
+VAL_DATA_PATH = os.path.join(PROJECT_ROOT, "data/processed/val")
 
 
-def cross_validate():
+def cross_validate(n_splits: int = N_SPLITS, n_workers: int = 1, stratified: bool = False, out_path=None):
     print("--- LightGBM 모델 K-Fold 교차검증 시작 ---")
 
     # 1. 전체 학습 데이터 구성 (train + val)
     try:
-        train_df = pd.read_csv(TRAIN_DATA_PATH)
-        val_df = pd.read_csv(VAL_DATA_PATH)
+        train_df = read_dataset(TRAIN_DATA_PATH)
+        val_df = read_dataset(VAL_DATA_PATH)
         # 두 데이터프레임을 하나로 합침
         full_train_df = pd.concat([train_df, val_df], ignore_index=True)
         print("전체 학습 데이터 구성 완료.")
@@ -28,40 +36,47 @@ def cross_validate():
 
     # 2. 데이터 전처리
     X = full_train_df.drop("ConditionLabel", axis=1)
-    y = full_train_df["ConditionLabel"]
+    y = full_train_df["ConditionLabel"].to_numpy()
 
-    X_dummies = pd.get_dummies(X)
+    encoder = FeatureEncoder.fit(X)
+    X_dummies = encoder.encode_columns(X)
     print("데이터 전처리 완료.")
 
-    # 3. 모델 정의
-    model = lgb.LGBMClassifier(random_state=42)
-
-    # 4. K-Fold 교차검증 설정
-    # 데이터를 5개로 나누고, 섞어서 사용
-    kfold = KFold(n_splits=N_SPLITS, shuffle=True, random_state=42)
-
-    # 5. 교차검증 실행 및 평가
-    print(f"\n--- {N_SPLITS}-Fold 교차검증을 수행합니다 ---")
-
-    # 5-1. 정확도(Accuracy) 계산
-    # cross_val_score는 각 Fold의 점수를 배열(array) 형태로 반환
-    accuracy_scores = cross_val_score(model, X_dummies, y, cv=kfold, scoring='accuracy')
+    # 3. 교차검증: fold 당 한 번 학습 → out-of-fold 확률에서 모든 지표 계산
+    print(f"\n--- {n_splits}-Fold 교차검증을 수행합니다 (workers={n_workers}) ---")
+    report = cross_validate_oof(X_dummies, y, n_splits=n_splits, n_workers=n_workers, stratified=stratified)
 
-    print("\n[정확도 점수]")
-    for i, score in enumerate(accuracy_scores):
-        print(f"  Fold {i + 1}: {score:.4f}")
-    print(f"▶ 평균 정확도: {np.mean(accuracy_scores):.4f} (표준편차: {np.std(accuracy_scores):.4f})")
+    print("\n[Fold 별 결과]")
+    print("  fold  n_valid  accuracy     MAE     ±1  log-loss   fit(s)  predict(s)")
+    for f in report["folds"]:
+        print(f"  {f['fold']:>4}  {f['n_valid']:>7}  {f['accuracy']:8.4f}  {f['mae']:6.4f}  {f['within_one']:6.4f}"
+              f"  {f['log_loss']:8.4f}  {f['fit_seconds']:7.2f}  {f['predict_seconds']:10.3f}")
+    for key, label in (("accuracy", "정확도"), ("mae", "MAE"), ("within_one", "±1 등급 정확도"), ("log_loss", "log-loss")):
+        vals = np.array([f[key] for f in report["folds"]])
+        print(f"▶ 평균 {label}: {vals.mean():.4f} (표준편차: {vals.std():.4f})")
 
-    # 5-2. MAE(Mean Absolute Error) 계산
-    # scikit-learn의 점수(score)는 높을수록 좋은 것을 가정하므로, MAE는 음수로 변환된 값을 사용
-    mae_scores = cross_val_score(model, X_dummies, y, cv=kfold, scoring='neg_mean_absolute_error')
-    mae_scores = -mae_scores  # 다시 양수로 변환
+    overall = report["overall"]
+    print(f"\n[전체 OOF 지표] n={overall['n']}")
+    print(f"  정확도 {overall['accuracy']:.4f} | MAE {overall['mae']:.4f} | ±1 {overall['within_one']:.4f}"
+          f" | log-loss {overall['log_loss']:.4f} | macro-F1 {overall['macro_f1']:.4f}")
+    print("  등급  precision  recall      f1  support")
+    for grade, m in overall["per_class"].items():
+        print(f"  {grade:>4}  {m['precision']:9.4f}  {m['recall']:6.4f}  {m['f1']:6.4f}  {m['support']:7d}")
+    total_fit = sum(f["fit_seconds"] for f in report["folds"])
+    print(f"\n학습 시간 합 {total_fit:.2f}s, 전체 {report['wall_seconds']:.2f}s (fold 당 LightGBM 스레드 {report['n_jobs_per_fold']})")
 
-    print("\n[MAE 점수]")
-    for i, score in enumerate(mae_scores):
-        print(f"  Fold {i + 1}: {score:.4f}")
-    print(f"▶ 평균 MAE: {np.mean(mae_scores):.4f} (표준편차: {np.std(mae_scores):.4f})")
+    if out_path:
+        with open(out_path, "w", encoding="utf-8") as fp:
+            json.dump({k: v for k, v in report.items() if k != "oof_proba"}, fp, ensure_ascii=False, indent=2)
+        print(f"리포트 저장: {out_path}")
+    return report
 
 
 if __name__ == "__main__":
-    cross_validate()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="LightGBM K-Fold 교차검증 (fold 당 1회 학습, OOF 기반 지표)")
+    parser.add_argument("--splits", type=int, default=N_SPLITS)
+    parser.add_argument("--workers", type=int, default=1, help="동시에 학습할 fold 수")
+    parser.add_argument("--stratified", action="store_true", help="등급 비율을 유지하는 StratifiedKFold 사용")
+    parser.add_argument("--out", default=None, help="리포트 JSON 저장 경로")
+    args = parser.parse_args()
+    cross_validate(args.splits, args.workers, args.stratified, args.out)
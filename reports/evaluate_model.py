@@ -1,21 +1,25 @@
-import pandas as pd
 import joblib
 from sklearn.metrics import accuracy_score, classification_report, confusion_matrix, mean_absolute_error
 import seaborn as sns
 import matplotlib.pyplot as plt
 import os
+import sys
 import numpy as np
 
 # --- 설정 ---
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(PROJECT_ROOT, "src"))
+
+from model_train.feature_encoder import FeatureEncoder
+from labeling.data_store import read_dataset
 # 1. 평가할 모델 파일 경로를 LogisticRegression 모델로 지정
 MODEL_PATH = os.path.join(PROJECT_ROOT, "data/models/model_lgbm.pkl")
 
 # 2. 검증할 데이터 경로를 val.csv로 지정
-DATA_PATH = os.path.join(PROJECT_ROOT, "data/processed/val.csv")
+DATA_PATH = os.path.join(PROJECT_ROOT, "data/processed/val")
 
-# 3. 학습 데이터 경로는 컬럼 정렬을 위해 필요
-TRAIN_DATA_PATH = os.path.join(PROJECT_ROOT, "data/processed/train.csv")
+# 3. 컬럼 정렬은 학습 때 저장한 피처 인코더 사용
+ENCODER_PATH = os.path.join(PROJECT_ROOT, "data/models/feature_encoder.json")
 
 # 4. 결과를 저장할 폴더 경로
 REPORTS_DIR = os.path.join(PROJECT_ROOT, "reports")
@@ -36,24 +40,17 @@ def evaluate():
 
     # 데이터 불러오기
     try:
-        train_df = pd.read_csv(TRAIN_DATA_PATH)
-        val_df = pd.read_csv(DATA_PATH)
-        print("학습 및 검증 데이터 불러오기 성공.")
+        encoder = FeatureEncoder.load(ENCODER_PATH)
+        val_df = read_dataset(DATA_PATH)
+        print("피처 인코더 및 검증 데이터 불러오기 성공.")
     except FileNotFoundError as e:
-        print(f"[오류] 데이터 파일을 찾을 수 없습니다: {e.filename}")
+        print(f"[오류] 파일을 찾을 수 없습니다: {e.filename}")
         return
 
-    # 데이터 전처리 (학습 데이터와 동일하게)
+    # 데이터 전처리 (학습 때 고정한 컬럼 순서로 인코딩)
     print("검증 데이터 전처리를 수행합니다...")
-    X_train = train_df.drop("ConditionLabel", axis=1)
-    X_val = val_df.drop("ConditionLabel", axis=1)
     y_val = val_df["ConditionLabel"]
-
-    X_train_dummies = pd.get_dummies(X_train)
-    X_val_dummies = pd.get_dummies(X_val)
-
-    # 학습 데이터에 있는 컬럼을 기준으로 검증 데이터의 컬럼을 맞춤
-    X_val_aligned = X_val_dummies.reindex(columns=X_train_dummies.columns, fill_value=0)
+    X_val_aligned = encoder.encode_columns(val_df)
 
     print("데이터 전처리 완료.")
 
@@ -1,115 +1,178 @@
+import argparse
 import json
+import os
+import sys
+import time
+from typing import Any, Dict, List, Optional, Sequence
 import numpy as np
-import pandas as pd
-from pathlib import Path
-from openvino import Core
-from sklearn.metrics import accuracy_score
 
 # -----------------------------
 # 경로 설정
 # -----------------------------
-TRAIN_PATH = Path("data/processed/train.csv")
-TEST_PATH  = Path("data/processed/test.csv")
-FEAT_PATH  = Path("data/models/feature_names.json")
-IR_PATH    = Path("data/models/openvino_ir/model_lgbm_hb.xml")
-
-LABEL_OFFSET = 1  # 라벨이 1~5면 1, 0~4면 0
-
-# -----------------------------
-# ① feature_names.json 로드 / 재생성
-# -----------------------------
-def regenerate_feature_names():
-    """train.csv를 원-핫 인코딩해서 feature_names.json 재생성"""
-    df_train = pd.read_csv(TRAIN_PATH)
-    X_train_df = df_train.drop(columns=["ConditionLabel"])
-    X_train_ohe = pd.get_dummies(X_train_df)
-    feature_names = X_train_ohe.columns.tolist()
-
-    FEAT_PATH.parent.mkdir(parents=True, exist_ok=True)
-    with open(FEAT_PATH, "w", encoding="utf-8") as f:
-        json.dump(feature_names, f, ensure_ascii=False)
-
-    print(f"[INFO] feature_names.json 재생성 완료 (원핫 기준, {len(feature_names)}개)")
-    return feature_names
-
-if not FEAT_PATH.exists():
-    feature_names = regenerate_feature_names()
-else:
-    with open(FEAT_PATH, "r", encoding="utf-8") as f:
-        feature_names = json.load(f)
-    # 원핫 전 컬럼일 경우 강제로 재생성
-    if len(feature_names) < 14:  # 모델이 기대하는 14보다 적음
-        print(f"[WARN] feature_names.json 피처 {len(feature_names)}개 → 재생성 필요")
-        feature_names = regenerate_feature_names()
-    else:
-        print(f"[INFO] feature_names.json 로드 완료 (피처 {len(feature_names)}개)")
-
-# -----------------------------
-# ② test.csv 불러오기 & 전처리
-# -----------------------------
-df_test = pd.read_csv(TEST_PATH)
-
-y_test = df_test["ConditionLabel"].to_numpy().ravel().astype(int)
-X_test_df = df_test.drop(columns=["ConditionLabel"])
-
-# 원핫
-X_test_ohe = pd.get_dummies(X_test_df)
-
-# 누락 피처 0으로 채움
-missing = [c for c in feature_names if c not in X_test_ohe.columns]
-for c in missing:
-    X_test_ohe[c] = 0
-
-# 불필요 피처 제거
-extra = [c for c in X_test_ohe.columns if c not in feature_names]
-if extra:
-    X_test_ohe = X_test_ohe.drop(columns=extra)
-
-# 순서 정렬
-X_test_ohe = X_test_ohe[feature_names]
-X_test = X_test_ohe.to_numpy().astype(np.float32)
-
-print(f"[INFO] 테스트셋 정렬 완료. 샘플 {X_test.shape[0]}, 피처 {X_test.shape[1]}")
-if missing:
-    print(f"[INFO] 테스트에 없던 피처 {len(missing)}개 0으로 채움: {missing[:5]}{' ...' if len(missing) > 5 else ''}")
-if extra:
-    print(f"[INFO] 테스트 전용 피처 {len(extra)}개 제거: {extra[:5]}{' ...' if len(extra) > 5 else ''}")
-
-# -----------------------------
-# ③ IR 모델 로드 & 추론
-# -----------------------------
-ie = Core()
-compiled = ie.compile_model(str(IR_PATH), "CPU")
-inp = compiled.inputs[0].get_any_name()
-out = compiled.outputs[0].get_any_name()
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(PROJECT_ROOT, "src"))
+
+from model_train.feature_encoder import FeatureEncoder, FEATURE_ENCODER_PATH
+from model_train.infer import (
+    BACKENDS, INFERENCE_CONFIG_PATH, MODEL_META_PATH, load_backend_from_config, load_model_meta, backend_classes
+)
+from model_train.metrics import grade_metrics
+from labeling.data_store import read_dataset
+
+TEST_PATH = os.path.join(PROJECT_ROOT, "data/processed/test")
+
+# 지연 측정 배치 크기 (단건 UI 요청 ~ 대량 배치 채점)
+BATCH_SIZES = (1, 32, 1024, 65536)
+# (백엔드, 배치 크기) 당 반복 횟수 상한과 시간 예산: 큰 배치의 느린 백엔드는 예산 안에서만 반복
+DEFAULT_REPEATS = 50
+DEFAULT_BUDGET_SECONDS = 5.0
+
+
+def make_batch(X: np.ndarray, batch_size: int) -> np.ndarray:
+    """평가 행을 반복해서 batch_size 행짜리 float32 배치 생성 (테스트셋보다 큰 배치용)"""
+    reps = -(-batch_size // len(X))
+    return np.ascontiguousarray(np.tile(X, (reps, 1))[:batch_size], dtype=np.float32)
+
+
+def parity(backends: Dict[str, Any], X: np.ndarray, classes: List[int], y: Optional[np.ndarray] = None,
+           reference: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    같은 배치 X 로 모든 백엔드 확률 비교
+    - reference(기본: 첫 백엔드) 대비 최대 |Δp|, 등급 일치율
+    - y 가 있으면 백엔드별 정확도/±1 (등급은 메타데이터 classes 로 매핑 → 오프셋 추정 없음)
+    """
+    reference = reference or next(iter(backends))
+    probas = {name: np.asarray(b.predict_proba(X), dtype=np.float64) for name, b in backends.items()}
+    p_ref = probas[reference]
+    out = {}
+    for name, p in probas.items():
+        diff = np.abs(p - p_ref).max(axis=1)
+        row = {
+            "max_abs_diff": float(diff.max()),
+            "grade_agreement": float(np.mean(p.argmax(axis=1) == p_ref.argmax(axis=1))),
+            "rows_over_1e-3": int((diff > 1e-3).sum()),
+        }
+        if y is not None:
+            m = grade_metrics(y, p, classes)
+            row.update(accuracy=m["accuracy"], within_one=m["within_one"])
+        out[name] = row
+    return out
+
+
+def check_class_mapping(backends: Dict[str, Any], X: np.ndarray, classes: List[int], config_path: str):
+    """
+    변환 모델의 확률 열이 메타데이터 classes 순서인지 실제 출력으로 확인 (변환 모델은 classes_ 가 없음)
+    - LightGBM classes_ 가 메타데이터 classes 와 같아야 함
+    - 백엔드마다 출력 열 수 = len(classes), argmax → classes 등급이 LightGBM(classes_ 매핑) 등급과 모든 행에서 같아야 함
+    """
+    lgbm = backends.get("lightgbm") or load_backend_from_config(config_path, kind="lightgbm")
+    lgbm_classes = backend_classes(lgbm)
+    if lgbm_classes != list(classes):
+        raise ValueError(f"LightGBM classes_ {lgbm_classes} 가 모델 메타데이터 classes {classes} 와 다름")
+    expected = np.asarray(lgbm_classes)[np.asarray(lgbm.predict_proba(X)).argmax(axis=1)]
+    for name, b in backends.items():
+        p = np.asarray(b.predict_proba(X))
+        if p.ndim != 2 or p.shape[1] != len(classes):
+            raise ValueError(f"[{name}] 확률 출력 열 수 {p.shape[1:]} 가 classes 수 {len(classes)} 와 다름")
+        mismatched = int((np.asarray(classes)[p.argmax(axis=1)] != expected).sum())
+        if mismatched:
+            raise ValueError(f"[{name}] {mismatched}/{len(X)}행의 등급이 LightGBM classes_ 매핑과 다름 (확률 열 순서 확인)")
+
+
+def latency_profile(backend, X: np.ndarray, batch_sizes: Sequence[int] = BATCH_SIZES, repeats: int = DEFAULT_REPEATS,
+                    budget_seconds: float = DEFAULT_BUDGET_SECONDS) -> List[Dict[str, Any]]:
+    """
+    배치 크기별 predict_proba 지연 분포 (ms)
+    - 배치마다 1회 워밍업 후, repeats 회 또는 budget_seconds 가 찰 때까지 반복 (최소 1회)
+    """
+    rows = []
+    for bs in batch_sizes:
+        batch = make_batch(X, bs)
+        backend.predict_proba(batch)  # 워밍업 (OpenVINO reshape, ONNX Runtime 메모리 할당 등)
+        times = []
+        start = time.perf_counter()
+        while len(times) < repeats and (not times or time.perf_counter() - start < budget_seconds):
+            t0 = time.perf_counter()
+            backend.predict_proba(batch)
+            times.append((time.perf_counter() - t0) * 1e3)
+        p50, p95, p99 = np.percentile(times, [50, 95, 99])
+        rows.append({
+            "batch_size": bs, "runs": len(times),
+            "p50_ms": float(p50), "p95_ms": float(p95), "p99_ms": float(p99),
+            "row_us": float(p50) * 1e3 / bs,
+        })
+    return rows
+
+
+def run_harness(
+    backend_kinds: Sequence[str] = tuple(BACKENDS),
+    data_path: str = TEST_PATH,
+    config_path: str = INFERENCE_CONFIG_PATH,
+    encoder_path: str = FEATURE_ENCODER_PATH,
+    meta_path: str = MODEL_META_PATH,
+    batch_sizes: Sequence[int] = BATCH_SIZES,
+    repeats: int = DEFAULT_REPEATS,
+    budget_seconds: float = DEFAULT_BUDGET_SECONDS
+) -> Dict[str, Any]:
+    """
+    LightGBM / ONNX Runtime / OpenVINO IR 를 같은 인코딩 배치로 비교
+    - 정합성: 첫 백엔드 기준 최대 |Δp|, 등급 일치율, 정확도/±1
+    - 속도: 배치 크기별 p50/p95/p99 지연
+    - label mapping 은 모델 메타데이터(model_meta.json)의 classes 사용
+    """
+    encoder = FeatureEncoder.load(encoder_path)
+    meta = load_model_meta(meta_path)
+    if meta is None:
+        raise FileNotFoundError(f"모델 메타데이터가 없음: {meta_path} (run_pipeline_lgbm.py 학습 시 생성)")
+    if meta["feature_names"] != encoder.feature_names:
+        raise ValueError("모델 메타데이터와 피처 인코더의 피처 순서가 다름")
+
+    df = read_dataset(data_path)
+    X = encoder.encode_columns(df)
+    y = df["ConditionLabel"].to_numpy().astype(int) if "ConditionLabel" in df.columns else None
+    backends = {kind: load_backend_from_config(config_path, kind=kind) for kind in backend_kinds}
+    check_class_mapping(backends, X, meta["classes"], config_path)
+
+    return {
+        "data": data_path,
+        "n_rows": int(len(X)),
+        "classes": meta["classes"],
+        "reference": backend_kinds[0],
+        "parity": parity(backends, X, meta["classes"], y),
+        "latency": {name: latency_profile(b, X, batch_sizes, repeats, budget_seconds) for name, b in backends.items()},
+    }
 
-proba = compiled({inp: X_test})[out]
-print("[INFO] OpenVINO IR 추론 완료.")
 
-# -----------------------------
-# ④ 결과 해석 (자동 오프셋 탐지)
-# -----------------------------
-print(f"[INFO] proba shape: {proba.shape}")
-
-if proba.ndim == 2 and proba.shape[1] >= 2:
-    # 멀티클래스 확률 출력
-    pred0 = proba.argmax(axis=1)  # 0~(n_classes-1)
-    # 자동 오프셋 탐지
-    candidates = {
-        "shift_-1": np.clip(pred0 - 1, 0, 4) + 1,
-        "shift_0" : pred0 + 1,
-        "shift_+1": np.clip(pred0 + 1, 0, 4) + 1,
-    }
-    scores = {k: accuracy_score(y_test, v) for k, v in candidates.items()}
-    best_key = max(scores, key=scores.get)
-    y_pred = candidates[best_key]
-    print(f"[INFO] Offset auto-select → {best_key}, Acc={scores[best_key]:.4f}")
-else:
-    # 단일 회귀 점수 출력 (예: 1~5 등급 직접 예측)
-    y_pred = np.rint(proba).astype(int).clip(1, 5).ravel()
-    acc = accuracy_score(y_test, y_pred)
-    print(f"[INFO] Regression-style output, Acc={acc:.4f}")
-
-# ±1-grade accuracy
-w1a = np.mean(np.abs(y_test - y_pred) <= 1)
-print(f"IR ±1-grade Accuracy: {w1a:.4f}")
+def print_report(report: Dict[str, Any]):
+    print(f"[INFO] 데이터 {report['data']} ({report['n_rows']}행), 등급 매핑 {report['classes']}, "
+          f"기준 {report['reference']}")
+    print("\n  backend   max|Δp|   agree  rows>1e-3  accuracy      ±1")
+    for name, r in report["parity"].items():
+        acc = f"{r['accuracy']:8.4f}  {r['within_one']:6.4f}" if "accuracy" in r else "       -       -"
+        print(f"  {name:<8} {r['max_abs_diff']:8.1e}  {r['grade_agreement']:6.4f}  {r['rows_over_1e-3']:9d}  {acc}")
+    print("\n  backend    batch  runs     p50(ms)     p95(ms)     p99(ms)  µs/row")
+    for name, rows in report["latency"].items():
+        for r in rows:
+            print(f"  {name:<8} {r['batch_size']:>7}  {r['runs']:>4}  {r['p50_ms']:10.3f}  {r['p95_ms']:10.3f}"
+                  f"  {r['p99_ms']:10.3f}  {r['row_us']:6.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="LightGBM / ONNX / OpenVINO IR 정합성 + 배치 크기별 지연 비교")
+    parser.add_argument("--data", default=TEST_PATH)
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=sorted(BACKENDS),
+                        help="첫 번째가 비교 기준")
+    parser.add_argument("--config", default=INFERENCE_CONFIG_PATH)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=list(BATCH_SIZES))
+    parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS)
+    parser.add_argument("--budget", type=float, default=DEFAULT_BUDGET_SECONDS, help="(백엔드, 배치) 당 측정 시간 예산(초)")
+    parser.add_argument("--out", default=None, help="리포트 JSON 저장 경로")
+    args = parser.parse_args()
+
+    result = run_harness(args.backends, args.data, args.config, batch_sizes=args.batch_sizes,
+                         repeats=args.repeats, budget_seconds=args.budget)
+    print_report(result)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"\n리포트 저장: {args.out}")
@@ -0,0 +1,219 @@
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+# --- 설정 ---
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(PROJECT_ROOT, "src"))
+
+from coach.service import DEFAULT_HOST, DEFAULT_PORT
+from labeling.data_store import read_dataset
+from bench_pipeline import TEST_DATA_PATH, to_raw_input
+
+SERVICE_PATH = os.path.join(PROJECT_ROOT, "src", "coach", "service.py")
+
+DEFAULT_CONCURRENCY = 32
+DEFAULT_REQUESTS = 2000
+# 서비스 기동(모델/SHAP explainer 로드) 대기 상한
+STARTUP_TIMEOUT_SECONDS = 120.0
+
+
+class ServiceClient:
+    """
+    예측 서비스 클라이언트 (asyncio, keep-alive 연결 하나)
+    - predict(raw) / predict_batch(raws) / stats() / health()
+    - 동시 요청은 연결을 여러 개 만들어서 (연결당 요청은 순서대로)
+    """
+    def __init__(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT):
+        self.host = host
+        self.port = port
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+
+    async def connect(self) -> "ServiceClient":
+        self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        return self
+
+    async def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except ConnectionError:
+                pass
+            self._writer = None
+
+    async def request(self, method: str, path: str, payload: Optional[Dict[str, Any]] = None) -> Tuple[int, Dict[str, Any]]:
+        if self._writer is None:
+            await self.connect()
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8") if payload is not None else b""
+        head = (f"{method} {path} HTTP/1.1\r\nHost: {self.host}:{self.port}\r\n"
+                f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n")
+        self._writer.write(head.encode("latin-1") + body)
+        await self._writer.drain()
+
+        status = int((await self._reader.readline()).split()[1])
+        headers = {}
+        while True:
+            line = await self._reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            key, _, value = line.decode("latin-1").partition(":")
+            headers[key.strip().lower()] = value.strip()
+        data = await self._reader.readexactly(int(headers.get("content-length", 0)))
+        if headers.get("connection", "").lower() == "close":
+            await self.close()
+        return status, json.loads(data)
+
+    async def predict(self, raw: Dict[str, str]) -> Tuple[int, Dict[str, Any]]:
+        return await self.request("POST", "/predict", {"input": raw})
+
+    async def predict_batch(self, raws: List[Dict[str, str]]) -> Tuple[int, Dict[str, Any]]:
+        return await self.request("POST", "/predict_batch", {"items": [{"input": r} for r in raws]})
+
+    async def stats(self) -> Dict[str, Any]:
+        return (await self.request("GET", "/stats"))[1]
+
+    async def reset_stats(self) -> Dict[str, Any]:
+        return (await self.request("POST", "/stats/reset", {}))[1]
+
+    async def health(self) -> Dict[str, Any]:
+        return (await self.request("GET", "/health"))[1]
+
+
+async def wait_ready(host: str, port: int, timeout: float = STARTUP_TIMEOUT_SECONDS,
+                     proc: Optional[subprocess.Popen] = None):
+    """/health 가 응답할 때까지 대기 (proc 를 주면 그 프로세스가 먼저 종료됐을 때 바로 실패)"""
+    deadline = time.perf_counter() + timeout
+    while True:
+        if proc is not None and proc.poll() is not None:
+            raise RuntimeError(f"서비스 프로세스가 종료됨 (exit code {proc.returncode})")
+        client = ServiceClient(host, port)
+        try:
+            await client.health()
+            return
+        except (OSError, asyncio.IncompleteReadError):
+            if time.perf_counter() > deadline:
+                raise TimeoutError(f"서비스가 {timeout:.0f}s 안에 응답하지 않음: {host}:{port}")
+            await asyncio.sleep(0.5)
+        finally:
+            await client.close()
+
+
+async def run_load(raws: List[Dict[str, str]], host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                   concurrency: int = DEFAULT_CONCURRENCY, n_requests: int = DEFAULT_REQUESTS,
+                   batch_size: int = 0) -> Dict[str, Any]:
+    """
+    concurrency 개 연결이 /predict (batch_size > 0 이면 /predict_batch) 를 n_requests 회 나눠 호출
+    - 요청 지연 분포(p50/p95/p99), 처리량(카드/s), 상태 코드별 개수, 끝난 뒤 서버 /stats
+    - 시작 전에 서버 통계를 초기화하므로 /stats 는 이번 구간만의 배치 크기/대기열 분포
+    """
+    client = ServiceClient(host, port)
+    try:
+        await client.reset_stats()
+    finally:
+        await client.close()
+    latencies: List[float] = []
+    statuses: Dict[int, int] = {}
+    counter = iter(range(n_requests))
+
+    async def worker():
+        client = await ServiceClient(host, port).connect()
+        try:
+            for i in counter:
+                t0 = time.perf_counter()
+                if batch_size > 0:
+                    start = i * batch_size % len(raws)
+                    status, _ = await client.predict_batch([raws[(start + j) % len(raws)] for j in range(batch_size)])
+                else:
+                    status, _ = await client.predict(raws[i % len(raws)])
+                latencies.append((time.perf_counter() - t0) * 1e3)
+                statuses[status] = statuses.get(status, 0) + 1
+        finally:
+            await client.close()
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - t0
+
+    client = ServiceClient(host, port)
+    try:
+        server_stats = await client.stats()
+    finally:
+        await client.close()
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    cards = statuses.get(200, 0) * max(batch_size, 1)
+    return {
+        "concurrency": concurrency,
+        "requests": n_requests,
+        "batch_size": batch_size,
+        "wall_seconds": wall,
+        "requests_per_second": n_requests / wall,
+        "cards_per_second": cards / wall,
+        "latency_ms": {"p50": float(p50), "p95": float(p95), "p99": float(p99), "max": float(max(latencies))},
+        "statuses": {str(k): v for k, v in sorted(statuses.items())},
+        "server": server_stats,
+    }
+
+
+def print_report(report: Dict[str, Any]):
+    mode = f"/predict_batch × {report['batch_size']}" if report["batch_size"] else "/predict"
+    lat = report["latency_ms"]
+    print(f"  {mode}: 연결 {report['concurrency']}개, 요청 {report['requests']}건, {report['wall_seconds']:.2f}s")
+    print(f"  처리량 {report['requests_per_second']:.1f} req/s ({report['cards_per_second']:.1f} cards/s), "
+          f"지연 p50 {lat['p50']:.1f} / p95 {lat['p95']:.1f} / p99 {lat['p99']:.1f} / max {lat['max']:.1f} ms")
+    print(f"  상태 코드: {report['statuses']}")
+    mb = report["server"]["microbatch"]
+    print(f"  [서버] 배치 {mb['batches']}개, 평균 배치 크기 {mb['mean_batch_size']:.1f}, "
+          f"대기 p95 ≤{mb['queue_wait_ms']['p95_ms']:.1f} ms, 배치 계산 p50 ≤{mb['batch_compute_ms']['p50_ms']:.1f} ms, "
+          f"거절 {mb['rejected']}")
+    print(f"  [서버] 배치 크기 분포: {mb['batch_size_histogram']}")
+    print(f"  [서버] 대기열 길이 분포: {mb['queue_depth_histogram']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="예측 서비스 부하 테스트 (test.csv 입력을 여러 연결로 동시에 전송)")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[DEFAULT_CONCURRENCY],
+                        help="동시 연결 수 (여러 개 주면 차례로 측정)")
+    parser.add_argument("--requests", type=int, default=DEFAULT_REQUESTS)
+    parser.add_argument("--batch-size", type=int, default=0, help="0: /predict 단건, N: /predict_batch 에 N건씩")
+    parser.add_argument("--data", default=TEST_DATA_PATH)
+    parser.add_argument("--spawn", action="store_true", help="서비스를 하위 프로세스로 띄우고 끝나면 종료")
+    parser.add_argument("--service-args", default="", help="--spawn 시 service.py 에 넘길 인자 (예: '--explainer tree')")
+    parser.add_argument("--out", default=None, help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    raws = [to_raw_input(r) for r in read_dataset(args.data).to_dict("records")]
+    proc = None
+    if args.spawn:
+        cmd = [sys.executable, SERVICE_PATH, "--host", args.host, "--port", str(args.port), *args.service_args.split()]
+        proc = subprocess.Popen(cmd, cwd=PROJECT_ROOT)
+    try:
+        asyncio.run(wait_ready(args.host, args.port, proc=proc))
+        reports = []
+        for c in args.concurrency:
+            print(f"--- 연결 {c}개 ---")
+            report = asyncio.run(run_load(raws, args.host, args.port, c, args.requests, args.batch_size))
+            print_report(report)
+            reports.append(report)
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait()
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(reports, f, ensure_ascii=False, indent=2)
+        print(f"\n결과 저장: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
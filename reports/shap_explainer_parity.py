@@ -0,0 +1,71 @@
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+# --- 설정 ---
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(PROJECT_ROOT, "src"))
+
+from model_train.infer import load_model
+from model_train.shap_utils import (
+    build_explainer_for_expected_grade, expected_grade_proba, shap_values_for_batch, penalties_from_values
+)
+from model_train.feature_encoder import FeatureEncoder
+from labeling.data_store import read_dataset
+from coach.coach import select_top3_factors_by_contrib
+
+MODEL_PATH = os.path.join(PROJECT_ROOT, "data/models/model_lgbm.pkl")
+TRAIN_DATA_PATH = os.path.join(PROJECT_ROOT, "data/processed/train")
+TEST_DATA_PATH = os.path.join(PROJECT_ROOT, "data/processed/test")
+ENCODER_PATH = os.path.join(PROJECT_ROOT, "data/models/feature_encoder.json")
+
+# 가법성 허용 오차: sum(phi) + base == E[grade](x)
+ADDITIVITY_TOL = 1e-4
+
+
+def top3(vals, feature_names):
+    return select_top3_factors_by_contrib(penalties_from_values(vals, feature_names))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="tree vs permutation 기대등급 SHAP 비교")
+    parser.add_argument("--rows", type=int, default=50, help="비교할 test.csv 행 수")
+    args = parser.parse_args()
+
+    model = load_model(MODEL_PATH)
+    encoder = FeatureEncoder.load(ENCODER_PATH)
+    feature_names = encoder.feature_names
+    background_X = encoder.encode_columns(read_dataset(TRAIN_DATA_PATH).head(100))
+    X = encoder.encode_columns(read_dataset(TEST_DATA_PATH).head(args.rows))
+
+    results = {}
+    for mode in ("permutation", "tree"):
+        explainer = build_explainer_for_expected_grade(model, background_X, mode=mode)
+        t0 = time.perf_counter()
+        vals = shap_values_for_batch(explainer, X)
+        elapsed = time.perf_counter() - t0
+        results[mode] = vals
+        print(f"[{mode:>11}] {elapsed:8.3f}s  ({elapsed / len(X) * 1000:9.2f} ms/row)")
+
+    ref, fast = results["permutation"], results["tree"]
+
+    # 가법성 확인 (tree 모드)
+    tree_exp = build_explainer_for_expected_grade(model, background_X, mode="tree")(X)
+    gap = np.abs(tree_exp.values.sum(axis=1) + tree_exp.base_values - expected_grade_proba(model, X)).max()
+    print(f"\ntree 가법성 오차(max): {gap:.2e}  {'OK' if gap < ADDITIVITY_TOL else 'FAIL'}")
+
+    # 값/Top3 일치도
+    print(f"max |Δphi|: {np.abs(ref - fast).max():.4f}")
+    print(f"corr(phi): {np.corrcoef(ref.ravel(), fast.ravel())[0, 1]:.4f}")
+    top_ref = [top3(v, feature_names) for v in ref]
+    top_fast = [top3(v, feature_names) for v in fast]
+    top1 = np.mean([a[:1] == b[:1] for a, b in zip(top_ref, top_fast)])
+    overlap = np.mean([len(set(a) & set(b)) / max(1, len(a)) for a, b in zip(top_ref, top_fast)])
+    print(f"Top1 팩터 일치율: {top1:.2%}, Top3 겹침 비율: {overlap:.2%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+# src/coach/batch_score.py
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import json
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+
+# 스크립트로 실행하면 src/coach 가 sys.path 에 들어가 coach/coach.py 가 coach 패키지를 가리므로 빼고 src 를 추가
+_HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path[:] = [p for p in sys.path if os.path.abspath(p or os.curdir) != _HERE]
+sys.path.append(os.path.abspath(os.path.join(_HERE, '..')))
+from model_train.feature_encoder import FeatureEncoder, FEATURE_ENCODER_PATH, parse_today_columns
+from model_train.streaming_eval import iter_chunks
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+MODEL_PATH = os.path.join(PROJECT_ROOT, "data/models/model_lgbm.pkl")
+BACKGROUND_PATH = os.path.join(PROJECT_ROOT, "data/models/shap_background.npz")
+
+# 한 번에 읽어서 채점하는 행 수 (프로세스당 메모리 = 청크 크기만큼의 입력/카드)
+DEFAULT_CHUNK_ROWS = 4096
+# 진행 상황 출력 간격
+DEFAULT_PROGRESS_SECONDS = 10.0
+# 대량 채점 기본 explainer: permutation 은 행당 ~1s 라 수백만 행에는 tree
+DEFAULT_EXPLAINER = "tree"
+
+OUTPUT_FORMATS = {".jsonl": "jsonl", ".json": "jsonl", ".parquet": "parquet"}
+
+# 카드 parquet 스키마 (JSON Lines 는 같은 필드를 한 줄에 하나씩)
+CARD_SCHEMA = pa.schema([
+    ("row", pa.int64()),
+    ("id", pa.string()),
+    ("grade", pa.int8()),
+    ("top3", pa.list_(pa.string())),
+    ("title", pa.string()),
+    ("summary", pa.string()),
+    ("actions", pa.list_(pa.string())),
+    ("food", pa.struct([("morning", pa.string()), ("snack", pa.string()), ("dinner", pa.string())])),
+    ("warnings", pa.list_(pa.string())),
+    ("error", pa.string()),
+])
+
+# 프로세스별 파이프라인 (워커 초기화 시 한 번 로드)
+_WORKER: Dict[str, Any] = {}
+
+
+def _init_worker(explainer_mode: str, inference_config: Optional[str], threads: int):
+    """워커 프로세스마다 모델/Explainer/인코더를 한 번만 로드"""
+    if threads > 0:
+        # 프로세스 수 × LightGBM(OpenMP) 스레드가 코어 수를 넘지 않게
+        try:
+            from threadpoolctl import threadpool_limits
+            threadpool_limits(threads)
+        except ImportError:
+            pass
+    from coach.pipeline import CoachPipeline
+
+    _WORKER["pipeline"] = CoachPipeline.from_artifacts(
+        MODEL_PATH, BACKGROUND_PATH, explainer_mode=explainer_mode, inference_config=inference_config
+    )
+    _WORKER["encoder"] = FeatureEncoder.load(FEATURE_ENCODER_PATH)
+
+
+def score_frame(df: pd.DataFrame, start_row: int, id_col: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    원시 입력 청크 → 카드 레코드 리스트 (입력 순서 유지)
+    - 파싱 실패(빈 값, 시간 형식 오류, 학습 때 없던 범주값 등) 행은 채점하지 않고 error 만 기록
+    """
+    pipeline, encoder = _WORKER["pipeline"], _WORKER["encoder"]
+    columns = parse_today_columns(df, categorical_cols=encoder.categories)
+    valid = np.all([np.isin(v, encoder.categories[k]) if k in encoder.categories else np.isfinite(v)
+                    for k, v in columns.items()], axis=0)
+    X = encoder.encode_columns({k: v[valid] for k, v in columns.items()})
+
+    ids = df[id_col].astype(str).tolist() if id_col else [None] * len(df)
+    rows: List[Dict[str, Any]] = [
+        {"row": start_row + i, "id": ids[i], "error": "invalid input"} for i in range(len(df))
+    ]
+    if len(X):
+        grades, _proba, top3_all, cards = pipeline.score_batch(X)
+        for i, grade, top3, card in zip(np.flatnonzero(valid), grades, top3_all, cards):
+            rows[i] = {
+                "row": start_row + int(i), "id": ids[i], "grade": int(grade), "top3": top3,
+                "title": card["title"], "summary": card["summary"], "actions": card["actions"],
+                "food": card["food"], "warnings": card["warnings"], "error": None,
+            }
+    return rows
+
+
+def _score_task(task: Tuple[pd.DataFrame, int, Optional[str], str]) -> Tuple[Any, int, int]:
+    """워커에서 청크 채점 → 출력 형식으로 직렬화까지 (메인 프로세스는 쓰기만)"""
+    df, start_row, id_col, fmt = task
+    rows = score_frame(df, start_row, id_col)
+    n_errors = sum(r["error"] is not None for r in rows)
+    if fmt == "parquet":
+        return pa.Table.from_pylist(rows, schema=CARD_SCHEMA), len(rows), n_errors
+    lines = "".join(json.dumps({k: v for k, v in r.items() if v is not None}, ensure_ascii=False) + "\n"
+                    for r in rows)
+    return lines.encode("utf-8"), len(rows), n_errors
+
+
+class CardWriter:
+    """JSON Lines / Parquet(청크마다 row group) 출력"""
+    def __init__(self, path: str, fmt: str):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.fmt = fmt
+        if fmt == "parquet":
+            self._writer = pq.ParquetWriter(path, CARD_SCHEMA, compression="zstd")
+        else:
+            self._file = open(path, "wb")
+
+    def write(self, part):
+        if self.fmt == "parquet":
+            self._writer.write_table(part)
+        else:
+            self._file.write(part)
+
+    def close(self):
+        if self.fmt == "parquet":
+            self._writer.close()
+        else:
+            self._file.close()
+
+
+def count_rows(path: str) -> Optional[int]:
+    """parquet/feather 는 메타데이터로 전체 행 수 (CSV 는 모름 → None)"""
+    if path.endswith(".parquet"):
+        return pq.ParquetFile(path).metadata.num_rows
+    if path.endswith(".feather"):
+        return feather.read_table(path, memory_map=True).num_rows
+    return None
+
+
+def iter_frames(path: str, chunk_rows: int) -> Iterator[pd.DataFrame]:
+    for chunk in iter_chunks(path, chunk_rows=chunk_rows, data_dir=os.path.dirname(os.path.abspath(path))):
+        yield chunk.to_pandas() if isinstance(chunk, pa.Table) else chunk
+
+
+def score_file(
+    input_path: str,
+    output_path: str,
+    workers: int = 1,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    explainer_mode: str = DEFAULT_EXPLAINER,
+    inference_config: Optional[str] = None,
+    id_col: Optional[str] = None,
+    progress_seconds: float = DEFAULT_PROGRESS_SECONDS
+) -> Dict[str, Any]:
+    """
+    입력 파일을 chunk_rows 행씩 스트리밍 → 인코딩 → 배치 등급 예측 + SHAP Top3 → 카드 (JSON Lines / Parquet)
+    - workers > 1 이면 청크를 프로세스 풀에 나눠서 채점 (워커당 파이프라인 1개, LightGBM 스레드는 코어 / workers)
+    - 진행 중인 청크는 workers × 2 개까지만 → 입력 크기와 무관하게 메모리 일정, 출력은 입력 순서 그대로
+    - return: 행 수, 오류 행 수, 시간, 처리량
+    """
+    fmt = OUTPUT_FORMATS.get(os.path.splitext(output_path)[1].lower())
+    if fmt is None:
+        raise ValueError(f"출력 형식은 {'/'.join(OUTPUT_FORMATS)} 중 하나: {output_path}")
+    workers = max(1, int(workers))
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    total = count_rows(input_path)
+
+    executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                   initargs=(explainer_mode, inference_config, threads)) if workers > 1 else None
+    if executor is None:
+        _init_worker(explainer_mode, inference_config, 0)
+
+    writer = CardWriter(output_path, fmt)
+    pending: deque = deque()
+    done_rows = 0
+    n_errors = 0
+    t0 = last_report = time.perf_counter()
+
+    def drain(block_until: int):
+        nonlocal done_rows, n_errors, last_report
+        while len(pending) > block_until:
+            part, n, errors = pending.popleft().result() if executor else pending.popleft()
+            writer.write(part)
+            done_rows += n
+            n_errors += errors
+            now = time.perf_counter()
+            if now - last_report >= progress_seconds:
+                last_report = now
+                rate = done_rows / (now - t0)
+                eta = f", 남은 시간 ~{(total - done_rows) / rate:.0f}s" if total and rate else ""
+                print(f"[progress] {done_rows:,}{f'/{total:,}' if total else ''}행, {rate:,.0f} rows/s{eta}",
+                      flush=True)
+
+    try:
+        start_row = 0
+        for df in iter_frames(input_path, chunk_rows):
+            task = (df, start_row, id_col, fmt)
+            start_row += len(df)
+            pending.append(executor.submit(_score_task, task) if executor else _score_task(task))
+            drain(workers * 2 if executor else 0)
+        drain(0)
+    finally:
+        writer.close()
+        if executor:
+            executor.shutdown(cancel_futures=True)
+
+    wall = time.perf_counter() - t0
+    return {
+        "input": input_path,
+        "output": output_path,
+        "rows": done_rows,
+        "errors": n_errors,
+        "workers": workers,
+        "chunk_rows": chunk_rows,
+        "explainer_mode": explainer_mode,
+        "wall_seconds": wall,
+        "rows_per_second": done_rows / wall if wall else None,
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="원시 일일 기록 파일(CSV/Parquet) → 코칭 카드 (JSON Lines/Parquet) 배치 채점")
+    parser.add_argument("input", help="입력 파일: sleep_time, activity_time, phone_time ('hh:mm:ss'), caffeine, "
+                                      "mood_score, temp, humidity, pm10 (또는 SleepTime 등 모델 입력 컬럼), profile_type")
+    parser.add_argument("output", help="출력 파일 (.jsonl / .parquet)")
+    parser.add_argument("--workers", type=int, default=1, help="채점 프로세스 수 (1 이면 현재 프로세스에서)")
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS)
+    parser.add_argument("--explainer", choices=["permutation", "tree"], default=DEFAULT_EXPLAINER)
+    parser.add_argument("--inference-config", default=None, help="onnx/openvino 백엔드 설정 (기본: LightGBM)")
+    parser.add_argument("--id-col", default=None, help="출력에 그대로 옮길 식별자 컬럼")
+    parser.add_argument("--progress-seconds", type=float, default=DEFAULT_PROGRESS_SECONDS)
+    args = parser.parse_args()
+
+    result = score_file(args.input, args.output, args.workers, args.chunk_rows, args.explainer,
+                        args.inference_config, args.id_col, args.progress_seconds)
+    print(f"[INFO] {result['rows']:,}행 채점 (오류 {result['errors']:,}행), {result['wall_seconds']:.1f}s, "
+          f"{result['rows_per_second']:,.0f} rows/s → {result['output']}")
@@ -1,7 +1,11 @@
 # src/coach/card_builder.py
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Sequence, Tuple
+import gc
 import json
 import os
+import numpy as np
+
+from coach.coach import unique_combos
 
 # 기본 요약 문구
 DEFAULT_GRADE_SUMMARY = {
@@ -70,6 +74,13 @@ DEFAULT_FOODS = {
     }
 }
 
+# 환경 경고: (context_env 키, 기준값, 기준 초과면 True / 미만이면 False, 문구)
+WARNING_RULES = [
+    ("pm10", 80, True, "미세먼지 높음: 실내 운동, 마스크 착용"),
+    ("temp", 30, True, "더위 주의: 한낮 외출 줄이고 수분 보충"),
+    ("humidity", 30, False, "건조 주의: 가습 40~60% 유지"),
+]
+
 def load_rules_from_json(json_path: str) -> Dict[str, Any]:
     """
     coach_rules.json 구조 예시:
@@ -137,15 +148,10 @@ def build_card(
 
     warnings: List[str] = []
     if context_env:
-        pm = context_env.get("pm10")
-        temp = context_env.get("temp")
-        humid = context_env.get("humidity")
-        if pm is not None and pm > 80:
-            warnings.append("미세먼지 높음: 실내 운동, 마스크 착용")
-        if temp is not None and temp > 30:
-            warnings.append("더위 주의: 한낮 외출 줄이고 수분 보충")
-        if humid is not None and humid < 30:
-            warnings.append("건조 주의: 가습 40~60% 유지")
+        for key, threshold, above, text in WARNING_RULES:
+            value = context_env.get(key)
+            if value is not None and (value > threshold if above else value < threshold):
+                warnings.append(text)
 
     return {
         "title": f"오늘의 컨디션 {grade}/5",
@@ -155,3 +161,85 @@ def build_card(
         "food": {"morning": fm, "snack": fs, "dinner": fd},
         "warnings": warnings
     }
+
+
+class CompiledCardRules:
+    """
+    배치 카드 생성을 위해 룰 라이브러리를 미리 풀어 둔 표
+    - 등급별 제목/요약/음식 (lib["grade_summary"], lib["foods"] 조회를 등급 수만큼만)
+    - 팩터 번호 조합(Top3 튜플) → 행동 리스트는 처음 나올 때 한 번 계산해서 재사용
+      (팩터 8개 기준 조합 수는 수백 개라 행 수와 무관하게 작음)
+    """
+    def __init__(self, lib: Dict[str, Any], factor_names: List[str], max_actions: int = 5):
+        self.factor_names = list(factor_names)
+        self.max_actions = max_actions
+        self.rules_ranked = lib["factor_rules_ranked"]
+        self.by_grade = {}
+        for key, summary in lib["grade_summary"].items():
+            grade = int(key)
+            fm, fs, fd = pick_foods(grade, lib["foods"])
+            self.by_grade[grade] = (f"오늘의 컨디션 {grade}/5", summary, (fm, fs, fd))
+        self._actions: Dict[Tuple[int, ...], Tuple[List[str], List[str]]] = {}
+
+    def actions_for(self, top: Tuple[int, ...]) -> Tuple[List[str], List[str]]:
+        """팩터 번호 튜플 (-1 은 빈자리) → (팩터 이름 리스트, 행동 리스트)"""
+        hit = self._actions.get(top)
+        if hit is None:
+            factors = [self.factor_names[f] for f in top if f >= 0]
+            hit = (factors, select_ranked_actions(factors, self.rules_ranked, max_actions=self.max_actions))
+            self._actions[top] = hit
+        return hit
+
+
+def build_cards_batch(
+    grades: Sequence[int],
+    top_factors: np.ndarray,
+    rules: CompiledCardRules,
+    context_env: Optional[Dict[str, np.ndarray]] = None
+) -> List[Dict[str, Any]]:
+    """
+    배치 버전 build_card
+    - top_factors: select_top_factors_batch 결과 (n, k) 팩터 번호
+    - context_env: {"pm10": (n,), "temp": (n,), "humidity": (n,)} 중 있는 것만 (경고 조건은 배열로 한 번에 계산)
+    - 행마다 build_card 와 같은 dict (리스트는 행마다 새로 만들어 서로 공유하지 않음)
+    """
+    n = len(grades)
+    if n == 0:
+        return []
+    warn_masks = []
+    if context_env:
+        for key, threshold, above, text in WARNING_RULES:
+            values = context_env.get(key)
+            if values is not None:
+                values = np.asarray(values, dtype=np.float64)
+                warn_masks.append((values > threshold if above else values < threshold, text))
+    # Top-k 조합마다 한 번만 행동 리스트 조회
+    top_factors = np.asarray(top_factors)
+    first, inverse = unique_combos(top_factors, len(rules.factor_names))
+    combos = [rules.actions_for(tuple(top_factors[i].tolist())) for i in first.tolist()]
+    by_grade = rules.by_grade
+
+    # 행마다 dict/list 를 대량으로 만드는 동안 순환 GC 가 계속 돌지 않게 (순환 참조 없는 객체만 생성)
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        warnings_all: List[List[str]] = [[] for _ in range(n)]
+        for mask, text in warn_masks:
+            for i in np.flatnonzero(mask).tolist():
+                warnings_all[i].append(text)
+        cards = []
+        for grade, c, warnings in zip(np.asarray(grades).tolist(), inverse.tolist(), warnings_all):
+            title, summary, (fm, fs, fd) = by_grade[grade]
+            factors, actions = combos[c]
+            cards.append({
+                "title": title,
+                "summary": summary,
+                "reasons": factors[:],
+                "actions": actions[:],
+                "food": {"morning": fm, "snack": fs, "dinner": fd},
+                "warnings": warnings
+            })
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return cards
@@ -1,5 +1,6 @@
 # src/coach/coach.py
 from typing import List, Tuple, Dict
+import numpy as np
 
 # 변수명 → 팩터 키 매핑(방향은 '기대등급↑ = 나빠짐' 가정)
 VAR_TO_FACTOR = {
@@ -35,3 +36,84 @@ def select_top3_factors_by_contrib(
         if len(factors) == k:
             break
     return factors
+
+
+class FactorIndex:
+    """
+    배치 Top-k 선택용으로 미리 계산해 둔 피처 → 팩터 인덱스
+    - factor_names: 팩터 목록 (VAR_TO_FACTOR 값 첫 등장 순서)
+    - factor_cols[f]: 팩터 f 에 매핑된 피처 열 번호들 (매핑 없는 피처는 제외)
+    - first_col[f]: 팩터 f 의 첫 피처 열 (동점 시 행 단위 경로처럼 앞 피처 우선)
+    """
+    def __init__(self, feature_names: List[str], var_to_factor: Dict[str, str] = VAR_TO_FACTOR):
+        self.feature_names = list(feature_names)
+        self.factor_names: List[str] = []
+        cols: Dict[str, List[int]] = {}
+        for j, var in enumerate(self.feature_names):
+            f = var_to_factor.get(var)
+            if not f:
+                continue
+            if f not in cols:
+                cols[f] = []
+                self.factor_names.append(f)
+            cols[f].append(j)
+        self.factor_cols = [np.asarray(cols[f], dtype=np.intp) for f in self.factor_names]
+        self.first_col = np.asarray([c[0] for c in self.factor_cols], dtype=np.intp)
+        # 팩터마다 피처가 하나뿐이면 열 인덱싱 한 번으로 팩터 점수
+        self._single = self.first_col if all(len(c) == 1 for c in self.factor_cols) else None
+
+    def factor_scores(self, values: np.ndarray) -> np.ndarray:
+        """SHAP 값 (n, n_features) → 팩터별 감점 (n, n_factors): 양수 기여만, 같은 팩터는 최댓값"""
+        penalties = np.maximum(values, 0.0)
+        if self._single is not None:
+            return penalties[:, self._single]
+        return np.stack([penalties[:, c].max(axis=1) for c in self.factor_cols], axis=1)
+
+
+def select_top_factors_batch(values: np.ndarray, index: FactorIndex, k: int = 3) -> np.ndarray:
+    """
+    배치 버전 penalties_from_values + select_top3_factors_by_contrib
+    - values: SHAP 값 (n, n_features) → 팩터 번호 (n, k) int, 감점 > 0 인 팩터가 k 개보다 적으면 -1 로 채움
+    - 행마다 argpartition 으로 상위 k 팩터만 골라 그 k 개만 정렬 (감점 내림차순, 동점은 앞 피처 우선)
+    """
+    scores = index.factor_scores(np.atleast_2d(values))
+    n, n_factors = scores.shape
+    k = min(k, n_factors)
+    if k == 0:
+        return np.full((n, 0), -1, dtype=np.intp)
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k] if k < n_factors else \
+        np.broadcast_to(np.arange(n_factors), (n, n_factors)).copy()
+    top_scores = np.take_along_axis(scores, top, axis=1)
+    # k 번째 경계에 같은 감점(> 0)이 걸친 드문 행만 전체 정렬로 다시 골라 행 단위 경로와 똑같이 맞춤
+    kth = top_scores.min(axis=1, keepdims=True)
+    tied = (kth[:, 0] > 0) & ((scores == kth).sum(axis=1) > (top_scores == kth).sum(axis=1))
+    if tied.any():
+        rows = np.flatnonzero(tied)
+        cols = np.broadcast_to(index.first_col, (len(rows), n_factors))
+        top[rows] = np.lexsort((cols, -scores[rows]), axis=-1)[:, :k]
+        top_scores[rows] = np.take_along_axis(scores[rows], top[rows], axis=1)
+    order = np.lexsort((index.first_col[top], -top_scores), axis=1)
+    top = np.take_along_axis(top, order, axis=1)
+    top[np.take_along_axis(top_scores, order, axis=1) <= 0] = -1
+    return top
+
+
+def unique_combos(top: np.ndarray, n_factors: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    팩터 번호 (n, k) → 서로 다른 Top-k 조합별 첫 행 번호, 행마다 조합 번호 (n,)
+    (행이 많아도 조합 수는 작으므로 조합마다 한 번만 계산하고 나눠 쓰기 위함)
+    """
+    top = np.asarray(top)
+    codes = (top + 1) @ ((n_factors + 1) ** np.arange(top.shape[1]))
+    _codes, first, inverse = np.unique(codes, return_index=True, return_inverse=True)
+    return first, inverse.reshape(-1)
+
+
+def factor_lists(top: np.ndarray, index: FactorIndex) -> List[List[str]]:
+    """팩터 번호 (n, k) → 행마다 팩터 이름 리스트 (select_top3_factors_by_contrib 결과 형식)"""
+    if len(top) == 0:
+        return []
+    first, inverse = unique_combos(top, len(index.factor_names))
+    names = index.factor_names
+    combos = [[names[f] for f in top[i].tolist() if f >= 0] for i in first.tolist()]
+    return [combos[c][:] for c in inverse.tolist()]
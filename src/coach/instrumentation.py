@@ -0,0 +1,216 @@
+# src/coach/instrumentation.py
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+import bisect
+import cProfile
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# 지연 히스토그램 버킷 상한 (ms, 대략 로그 간격). 마지막 버킷은 그 이상 전부
+DEFAULT_BUCKETS_MS = [
+    0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500,
+    1_000, 2_000, 5_000, 10_000, 30_000,
+]
+
+
+class LatencyHistogram:
+    """
+    고정 버킷 지연 히스토그램 (호출 수와 무관하게 메모리 일정)
+    - 백분위는 버킷 상한으로 근사 (max 를 넘지 않게 자름)
+    """
+    def __init__(self, buckets_ms: Optional[List[float]] = None):
+        self.bounds = list(buckets_ms or DEFAULT_BUCKETS_MS)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.min_ms = float("inf")
+
+    def record(self, ms: float):
+        self.counts[bisect.bisect_left(self.bounds, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+        self.min_ms = min(self.min_ms, ms)
+
+    def percentile(self, q: float) -> float:
+        if self.count == 0:
+            return 0.0
+        rank = q / 100.0 * self.count
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if c and seen >= rank:
+                return min(self.bounds[i], self.max_ms) if i < len(self.bounds) else self.max_ms
+        return self.max_ms
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "total_ms": self.total_ms,
+            "mean_ms": self.total_ms / self.count if self.count else 0.0,
+            "min_ms": self.min_ms if self.count else 0.0,
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "p99_ms": self.percentile(99),
+            "max_ms": self.max_ms,
+            "buckets": {("inf" if i == len(self.bounds) else str(self.bounds[i])): c
+                        for i, c in enumerate(self.counts) if c},
+        }
+
+
+class PipelineInstrumentation:
+    """
+    CoachPipeline 단계별 계측 (opt-in: CoachPipeline(instrumentation=...) 로 넘길 때만 동작)
+    - stage(name): 단계 wall time 을 이름별 히스토그램에 기록 (호출 수 포함)
+    - count(name, n): SHAP 모델 평가 횟수/행 수 같은 누적 카운터
+    - request(name): 요청 전체 시간 기록, summary_interval_seconds 마다 요약 로그,
+      profile_threshold_ms 를 주면 요청을 cProfile 로 감싸고 임계값을 넘은 요청만 profile_dir 에 .prof 저장
+    - snapshot(): 현재까지의 히스토그램 요약 + 카운터 (스레드 안전)
+    """
+    def __init__(
+        self,
+        summary_interval_seconds: Optional[float] = 60.0,
+        profile_threshold_ms: Optional[float] = None,
+        profile_dir: Optional[str] = None,
+        buckets_ms: Optional[List[float]] = None,
+        log: Optional[logging.Logger] = None
+    ):
+        self.summary_interval_seconds = summary_interval_seconds
+        self.profile_threshold_ms = profile_threshold_ms
+        self.profile_dir = profile_dir or os.path.join(os.getcwd(), "profiles")
+        self.buckets_ms = buckets_ms
+        self.log = log or logger
+        self._hist: Dict[str, LatencyHistogram] = {}
+        self._counters: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._started = time.time()
+        self._last_summary = time.monotonic()
+        self._local = threading.local()
+        self.profiles_written: List[str] = []
+
+    def record(self, name: str, ms: float):
+        with self._lock:
+            hist = self._hist.get(name)
+            if hist is None:
+                hist = self._hist[name] = LatencyHistogram(self.buckets_ms)
+            hist.record(ms)
+
+    def count(self, name: str, n: int = 1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + int(n)
+
+    @contextmanager
+    def stage(self, name: str):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, (time.perf_counter() - t0) * 1e3)
+
+    @contextmanager
+    def request(self, name: str = "predict_card"):
+        """
+        요청 하나 (중첩 호출이면 바깥 요청만 기록/프로파일)
+        - cProfile 은 스레드 단위라 다른 스레드에서 동시에 온 요청은 각자 프로파일
+        """
+        if getattr(self._local, "active", False):
+            yield
+            return
+        self._local.active = True
+        profiler = cProfile.Profile() if self.profile_threshold_ms is not None else None
+        t0 = time.perf_counter()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            yield
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            ms = (time.perf_counter() - t0) * 1e3
+            self._local.active = False
+            self.record(name, ms)
+            if profiler is not None and ms >= self.profile_threshold_ms:
+                self._dump_profile(profiler, name, ms)
+            self.maybe_log_summary()
+
+    def _dump_profile(self, profiler: cProfile.Profile, name: str, ms: float):
+        os.makedirs(self.profile_dir, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        path = os.path.join(self.profile_dir, f"{name}_{stamp}_{int(ms)}ms_{threading.get_ident()}.prof")
+        profiler.dump_stats(path)
+        with self._lock:
+            self.profiles_written.append(path)
+        self.log.warning("[instrumentation] %s %.1f ms ≥ %.1f ms → cProfile 저장: %s",
+                         name, ms, self.profile_threshold_ms, path)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "since": self._started,
+                "uptime_seconds": time.time() - self._started,
+                "stages": {name: h.summary() for name, h in self._hist.items()},
+                "counters": dict(self._counters),
+                "profiles_written": list(self.profiles_written),
+            }
+
+    def reset(self):
+        with self._lock:
+            self._hist.clear()
+            self._counters.clear()
+            self.profiles_written.clear()
+            self._started = time.time()
+
+    def format_summary(self, snapshot: Optional[Dict[str, Any]] = None) -> str:
+        snap = snapshot or self.snapshot()
+        lines = [f"[instrumentation] {snap['uptime_seconds']:.0f}s 동안"]
+        for name, s in sorted(snap["stages"].items(), key=lambda kv: -kv[1]["total_ms"]):
+            lines.append(f"  {name:<16} n={s['count']:>6}  mean {s['mean_ms']:9.3f} ms  p50 ≤{s['p50_ms']:9.3f}"
+                         f"  p95 ≤{s['p95_ms']:9.3f}  p99 ≤{s['p99_ms']:9.3f}  max {s['max_ms']:9.3f}")
+        if snap["counters"]:
+            lines.append("  " + ", ".join(f"{k}={v}" for k, v in sorted(snap["counters"].items())))
+        return "\n".join(lines)
+
+    def maybe_log_summary(self, force: bool = False):
+        """summary_interval_seconds 가 지났으면 요약 로그 (None 이면 force 일 때만)"""
+        now = time.monotonic()
+        with self._lock:
+            due = self.summary_interval_seconds is not None and now - self._last_summary >= self.summary_interval_seconds
+            if not (due or force):
+                return
+            self._last_summary = now
+        self.log.info(self.format_summary())
+
+
+class CountingModel:
+    """
+    SHAP explainer 에 넘기는 모델 래퍼: predict_proba 호출 수/평가 행 수를 카운터에 기록
+    - permutation: 기대등급 함수가 부르는 predict_proba
+    - tree: booster_.predict(pred_contrib=True)
+    - 그 외 속성은 원래 모델로 위임
+    """
+    def __init__(self, model, instrumentation: PipelineInstrumentation, prefix: str = "shap"):
+        self._model = model
+        self._instr = instrumentation
+        self._prefix = prefix
+        if hasattr(model, "booster_"):
+            self.booster_ = CountingModel(model.booster_, instrumentation, prefix)
+
+    def _counted(self, X):
+        self._instr.count(f"{self._prefix}_model_calls")
+        self._instr.count(f"{self._prefix}_model_rows", len(X))
+
+    def predict_proba(self, X, *args, **kwargs):
+        self._counted(X)
+        return self._model.predict_proba(X, *args, **kwargs)
+
+    def predict(self, X, *args, **kwargs):
+        self._counted(X)
+        return self._model.predict(X, *args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._model, name)
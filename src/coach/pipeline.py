@@ -1,5 +1,6 @@
 # src/pipeline.py
-from typing import Dict, List, Tuple, Optional
+from contextlib import nullcontext
+from typing import Any, Dict, List, Tuple, Optional
 import numpy as np
 import os
 import sys
@@ -8,10 +9,21 @@ current_dir = os.path.dirname(__file__)
 parent_dir = os.path.abspath(os.path.join(current_dir, '..'))
 sys.path.append(parent_dir)
 
-from model_train.infer import load_model, predict_grade_and_proba
-from model_train.shap_utils import build_explainer_for_expected_grade, shap_penalties_for_sample
-from coach.coach import select_top3_factors_by_contrib
-from coach.card_builder import get_library, build_card
+from model_train.infer import (
+    load_model, predict_grade_and_proba, predict_grades_and_proba,
+    load_inference_config, load_backend_from_config, verify_backend, load_verify_rows
+)
+from model_train.shap_utils import build_explainer_for_expected_grade, shap_penalties_for_sample, shap_values_for_batch
+from coach.coach import select_top3_factors_by_contrib, FactorIndex, select_top_factors_batch, factor_lists
+from coach.card_builder import get_library, build_card, CompiledCardRules, build_cards_batch
+from model_train.background import load_background
+from coach.prediction_cache import PredictionCache
+from coach.instrumentation import PipelineInstrumentation, CountingModel
+
+_NO_STAGE = nullcontext()
+
+# 환경 경고 규칙 키(card_builder.WARNING_RULES) → 모델 입력 피처 이름
+CONTEXT_ENV_FEATURES = {"pm10": "PM10", "temp": "Temp", "humidity": "Humidity"}
 
 class CoachPipeline:
     """
@@ -23,38 +35,183 @@ class CoachPipeline:
         model_path: str,
         background_X: np.ndarray,
         feature_names: List[str],
-        coach_rules_json: Optional[str] = None
+        coach_rules_json: Optional[str] = None,
+        explainer_mode: str = "permutation",
+        inference_config: Optional[str] = None,
+        cache: Optional[PredictionCache] = None,
+        instrumentation: Optional[PipelineInstrumentation] = None
     ):
-        self.model = load_model(model_path)
+        self.model_path = model_path
+        self.background_X = background_X
         self.feature_names = feature_names
-        self.explainer = build_explainer_for_expected_grade(self.model, background_X)
+        self.coach_rules_json = coach_rules_json
+        self.explainer_mode = explainer_mode
+        self.inference_config = inference_config
+        # 결과 캐시 (선택): 같은(양자화 기준) 입력 재제출 시 모델/SHAP 생략
+        self.cache = cache
+        # 단계별 계측 (선택): 없으면 측정 코드 없이 기존과 동일하게 동작
+        self.instrumentation = instrumentation
+        if cache is not None:
+            cache.bind(feature_names, watch_paths=[model_path, coach_rules_json, inference_config])
+        self.reload()
+
+    def reload(self):
+        """모델/백엔드/Explainer/코치 룰을 파일에서 다시 로드 (캐시도 비움)"""
+        model_path = self.model_path
+        background_X = self.background_X
+        inference_config = self.inference_config
+        explainer_mode = self.explainer_mode
+        coach_rules_json = self.coach_rules_json
+
+        self.model = load_model(model_path)
+        # 등급 예측 백엔드: 기본은 LightGBM 모델 그대로, 설정 파일이 있으면 onnx/openvino 선택
+        # (SHAP 해석은 항상 LightGBM 모델 기준)
+        self.backend = self.model
+        if inference_config:
+            cfg = load_inference_config(inference_config)
+            self.backend = load_backend_from_config(inference_config)
+            verify = cfg.get("verify", {}) or {}
+            if verify.get("enabled", True):
+                atol = (verify.get("atol") or {}).get(self.backend.name, 1e-4)
+                # 배경 행(k-means 중심 등)만으로는 분할 임계값 근처 행을 못 잡으므로 held-out 실제 행으로 검증
+                X_verify = load_verify_rows(cfg)
+                if X_verify is None:
+                    print(f"[WARN] 백엔드 검증 데이터({verify.get('data')})가 없어 SHAP 배경 행으로 검증")
+                    X_verify = background_X
+                verify_backend(self.backend, self.model, X_verify, atol=float(atol))
+        # explainer_mode: "permutation"(기존) | "tree"(LightGBM 트리 기반, 빠름)
+        explained_model = self.model
+        if self.instrumentation is not None:
+            # SHAP 이 모델을 몇 번/몇 행 평가하는지 카운트
+            explained_model = CountingModel(self.model, self.instrumentation)
+        self.explainer = build_explainer_for_expected_grade(explained_model, background_X, mode=explainer_mode)
         self.lib = get_library(coach_rules_json)  # 없으면 기본 룰 사용
+        # 배치 경로용: 피처→팩터 인덱스, 등급/팩터 조합별 카드 문구 표
+        self.factor_index = FactorIndex(self.feature_names)
+        self.card_rules = CompiledCardRules(self.lib, self.factor_index.factor_names, max_actions=5)
+        if self.cache is not None:
+            self.cache.sources_changed()
+            self.cache.clear()
+
+    @classmethod
+    def from_artifacts(cls, model_path: str, background_path: str, **kwargs) -> "CoachPipeline":
+        """저장된 SHAP 배경 artifact(npz: 배경 행렬 + 피처 이름)로 파이프라인 생성"""
+        background_X, feature_names = load_background(background_path)
+        return cls(model_path=model_path, background_X=background_X, feature_names=feature_names, **kwargs)
 
     def predict_card(self, X_row: np.ndarray) -> Dict:
         """
         X_row shape: (1, n_features)
         return: card dict (title, summary, reasons, actions, food, warnings)
         """
+        if self.instrumentation is None:
+            return self._predict_card(X_row)
+        with self.instrumentation.request("predict_card"):
+            return self._predict_card(X_row)
+
+    def _predict_card(self, X_row: np.ndarray) -> Dict:
+        if self.cache is not None:
+            with self._stage("cache"):
+                # 모델 파일/코치 룰이 바뀌었으면 다시 로드하고 캐시 무효화
+                if self.cache.sources_changed():
+                    self.reload()
+                card = self.cache.get(X_row)
+            if card is not None:
+                self._count("cache_hits")
+                return card
+
         # 1) 등급/확률
-        grade, _proba = predict_grade_and_proba(self.model, X_row)
+        with self._stage("model"):
+            grade, _proba = predict_grade_and_proba(self.backend, X_row)
 
         # 2) SHAP 기대등급 기준 기여도(+ 방향만 감점으로)
-        contribs: List[Tuple[str, float]] = shap_penalties_for_sample(
-            self.explainer, X_row, self.feature_names
-        )
+        with self._stage("shap"):
+            contribs: List[Tuple[str, float]] = shap_penalties_for_sample(
+                self.explainer, X_row, self.feature_names
+            )
         # 예: [("sleep_time", 0.31), ("phone_time", 0.12), ("temp", 0.08), ...]
 
         # 3) 변수→팩터 매핑 후 Top3
-        top3_factors = select_top3_factors_by_contrib(contribs)
+        with self._stage("top3"):
+            top3_factors = select_top3_factors_by_contrib(contribs)
         # 예: ["sleep_low","phone_high","temp_high"]
 
-        # 4) 환경값(경고용) 컨텍스트 구성
-        ctx = {}
-        for key in ("pm10", "temp", "humidity"):
-            if key in self.feature_names:
-                idx = self.feature_names.index(key)
-                ctx[key] = float(X_row[0, idx])
+        with self._stage("card"):
+            # 4) 환경값(경고용) 컨텍스트 구성
+            ctx = self._context_env(X_row[0])
 
-        # 5) 카드 생성
-        card = build_card(grade, top3_factors, self.lib, context_env=ctx, max_actions=5)
+            # 5) 카드 생성
+            card = build_card(grade, top3_factors, self.lib, context_env=ctx, max_actions=5)
+        if self.cache is not None:
+            self.cache.put(X_row, card)
         return card
+
+    def predict_cards(self, X: np.ndarray) -> List[Dict]:
+        """
+        X shape: (n, n_features)
+        predict_proba 한 번 + SHAP 한 번으로 n개 카드를 한꺼번에 생성
+        return: predict_card 와 같은 형식의 card dict 리스트 (입력 행 순서 유지)
+        """
+        X = np.atleast_2d(X)
+        if X.shape[0] == 0:
+            return []
+        if self.instrumentation is None:
+            return self._predict_cards(X)
+        self._count("batch_rows", X.shape[0])
+        with self.instrumentation.request("predict_cards"):
+            return self._predict_cards(X)
+
+    def score_batch(self, X: np.ndarray) -> Tuple[np.ndarray, np.ndarray, List[List[str]], List[Dict]]:
+        """
+        predict_cards 와 같은 계산을 하고 중간 결과도 함께 반환 (배치 채점/리포트용)
+        return: (grades (n,), proba (n, n_classes), 행별 Top3 팩터, cards)
+        """
+        X = np.atleast_2d(X)
+        if self.instrumentation is None:
+            return self._score_batch(X)
+        self._count("batch_rows", X.shape[0])
+        with self.instrumentation.request("score_batch"):
+            return self._score_batch(X)
+
+    def _predict_cards(self, X: np.ndarray) -> List[Dict]:
+        return self._score_batch(X)[3]
+
+    def _score_batch(self, X: np.ndarray) -> Tuple[np.ndarray, np.ndarray, List[List[str]], List[Dict]]:
+        # 1) 등급/확률 (벡터화)
+        with self._stage("batch_model"):
+            grades, proba = predict_grades_and_proba(self.backend, X)
+
+        # 2) SHAP 배치 해석
+        with self._stage("batch_shap"):
+            values = shap_values_for_batch(self.explainer, X)
+
+        # 3) Top3 팩터 (배열 연산) → 4)~5) 미리 풀어 둔 룰 표로 카드
+        with self._stage("batch_cards"):
+            top = select_top_factors_batch(values, self.factor_index)
+            top3_all = factor_lists(top, self.factor_index)
+            cards = build_cards_batch(grades, top, self.card_rules, context_env=self._context_env_columns(X))
+        return np.asarray(grades), proba, top3_all, cards
+
+    def instrumentation_snapshot(self) -> Optional[Dict[str, Any]]:
+        """단계별 지연 히스토그램/카운터 스냅샷 (계측을 켜지 않았으면 None)"""
+        return self.instrumentation.snapshot() if self.instrumentation is not None else None
+
+    def _stage(self, name: str):
+        return self.instrumentation.stage(name) if self.instrumentation is not None else _NO_STAGE
+
+    def _count(self, name: str, n: int = 1):
+        if self.instrumentation is not None:
+            self.instrumentation.count(name, n)
+
+    def _context_env(self, x: np.ndarray) -> Dict[str, float]:
+        """한 행(x shape: (n_features,))에서 경고용 환경값 추출 (규칙 키 → 해당 피처 값)"""
+        ctx = {}
+        for key, col in CONTEXT_ENV_FEATURES.items():
+            if col in self.feature_names:
+                ctx[key] = float(x[self.feature_names.index(col)])
+        return ctx
+
+    def _context_env_columns(self, X: np.ndarray) -> Dict[str, np.ndarray]:
+        """배치 버전 _context_env: 규칙 키 → 열 (n,)"""
+        return {key: X[:, self.feature_names.index(col)]
+                for key, col in CONTEXT_ENV_FEATURES.items() if col in self.feature_names}
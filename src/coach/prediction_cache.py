@@ -0,0 +1,131 @@
+# src/coach/prediction_cache.py
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+import copy
+import os
+import threading
+import time
+import numpy as np
+
+# 연속형 피처 양자화 단위 (이 단위 안에서 같은 값이면 같은 입력으로 취급)
+DEFAULT_QUANTIZE_STEPS = {
+    "SleepTime": 1 / 60,      # 분 단위
+    "ActivityTime": 1 / 60,
+    "PhoneTime": 1 / 60,
+    "Temp": 0.1,              # 0.1°C
+    "Humidity": 0.1,          # 0.1%
+    "PM10": 1.0,
+}
+
+
+class PredictionCache:
+    """
+    predict_card 결과 LRU 캐시 (키: 인코딩된 피처 벡터)
+    - quantize_steps 로 연속형 피처를 격자에 맞춰 반올림한 뒤 키 생성 (None 이면 정확히 같은 벡터만 hit)
+    - max_size 초과 시 가장 오래 안 쓴 항목부터, ttl_seconds 지나면 조회 시 제거
+    - watch_paths(모델 파일, 코치 룰 json 등)의 수정시각/크기가 바뀌면 sources_changed() 가 True
+    - 카드 dict 는 호출 측에서 수정될 수 있으므로 넣고 뺄 때 복사본을 사용
+    """
+    def __init__(
+        self,
+        max_size: int = 256,
+        ttl_seconds: Optional[float] = None,
+        quantize_steps: Optional[Dict[str, float]] = None,
+        watch_paths: Optional[List[str]] = None,
+        feature_names: Optional[List[str]] = None
+    ):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.quantize_steps = quantize_steps or {}
+        self.watch_paths = [p for p in (watch_paths or []) if p]
+        self._quant_mask = np.zeros(0, dtype=bool)
+        self._quant_steps = np.zeros(0)
+
+        self._items: "OrderedDict[bytes, Tuple[float, Dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._signature = self._source_signature()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        if feature_names is not None:
+            self.bind(feature_names)
+
+    def bind(self, feature_names: List[str], watch_paths: Optional[List[str]] = None):
+        """
+        피처 순서에 맞춰 양자화 단위를 배치하고, 감시 파일을 추가 (CoachPipeline 이 생성 시 호출)
+        """
+        steps = np.array([self.quantize_steps.get(name, 0.0) for name in feature_names], dtype=np.float64)
+        self._quant_mask = steps > 0
+        self._quant_steps = steps[self._quant_mask]
+        for p in watch_paths or []:
+            if p and p not in self.watch_paths:
+                self.watch_paths.append(p)
+        self._signature = self._source_signature()
+        self.clear()
+
+    def key(self, x_row: np.ndarray) -> bytes:
+        x = np.asarray(x_row, dtype=np.float64).ravel()
+        if self._quant_mask.any():
+            x = x.copy()
+            x[self._quant_mask] = np.round(x[self._quant_mask] / self._quant_steps)
+        return x.tobytes()
+
+    def get(self, x_row: np.ndarray) -> Optional[Dict]:
+        k = self.key(x_row)
+        with self._lock:
+            item = self._items.get(k)
+            if item is not None and self.ttl_seconds is not None and time.monotonic() - item[0] > self.ttl_seconds:
+                del self._items[k]
+                self.evictions += 1
+                item = None
+            if item is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(k)
+            self.hits += 1
+            return copy.deepcopy(item[1])
+
+    def put(self, x_row: np.ndarray, card: Dict):
+        k = self.key(x_row)
+        with self._lock:
+            self._items[k] = (time.monotonic(), copy.deepcopy(card))
+            self._items.move_to_end(k)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            if self._items:
+                self.invalidations += 1
+            self._items.clear()
+
+    def _source_signature(self) -> Tuple:
+        sig = []
+        for p in self.watch_paths:
+            try:
+                st = os.stat(p)
+                sig.append((p, st.st_mtime_ns, st.st_size))
+            except FileNotFoundError:
+                sig.append((p, None, None))
+        return tuple(sig)
+
+    def sources_changed(self) -> bool:
+        """감시 파일이 바뀌었으면 True (서명 갱신). 캐시 비우기는 호출 측에서"""
+        sig = self._source_signature()
+        if sig == self._signature:
+            return False
+        self._signature = sig
+        return True
+
+    def stats(self) -> Dict[str, float]:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._items),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
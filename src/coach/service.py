@@ -0,0 +1,436 @@
+# src/coach/service.py
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+
+# 스크립트로 실행하면 src/coach 가 sys.path 에 들어가 coach/coach.py 가 coach 패키지를 가리므로 빼고 src 를 추가
+_HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path[:] = [p for p in sys.path if os.path.abspath(p or os.curdir) != _HERE]
+sys.path.append(os.path.abspath(os.path.join(_HERE, '..')))
+from model_train.feature_encoder import FeatureEncoder, FEATURE_ENCODER_PATH, parse_today_input
+from coach.instrumentation import LatencyHistogram
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+MODEL_PATH = os.path.join(PROJECT_ROOT, "data/models/model_lgbm.pkl")
+BACKGROUND_PATH = os.path.join(PROJECT_ROOT, "data/models/shap_background.npz")
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+# 마이크로배치: 첫 요청이 온 뒤 max_wait_ms 동안 또는 max_batch_size 가 찰 때까지 모아서 predict_cards 한 번
+DEFAULT_MAX_BATCH_SIZE = 32
+DEFAULT_MAX_WAIT_MS = 5.0
+# 대기열 상한 (넘으면 503 → 클라이언트가 재시도)
+DEFAULT_MAX_QUEUE = 1024
+# 요청 본문 상한 (/predict_batch 포함)
+MAX_BODY_BYTES = 8 << 20
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+            413: "Payload Too Large", 500: "Internal Server Error", 503: "Service Unavailable"}
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def validate_record(record: Dict[str, Any], encoder: FeatureEncoder):
+    """
+    모델 입력 레코드 검증: 수치 컬럼은 모두 있고 유한한 숫자, 범주 컬럼은 학습 때 본 값
+    - encode_record 는 없는 컬럼/처음 보는 범주를 0 으로 채우므로 그대로 넘기면 다른 등급이 나옴 → ValueError (400)
+    """
+    if not isinstance(record, dict):
+        raise ValueError("record 는 JSON 객체여야 함")
+    missing = [col for col in [*encoder.numeric_cols, *encoder.categories] if record.get(col) is None]
+    if missing:
+        raise ValueError(f"필수 입력이 없음: {missing}")
+    for col in encoder.numeric_cols:
+        v = record[col]
+        if isinstance(v, bool) or not isinstance(v, (int, float)) or not np.isfinite(v):
+            raise ValueError(f"{col} 는 유한한 숫자여야 함: {v!r}")
+    for col, vals in encoder.categories.items():
+        if record[col] not in vals:
+            raise ValueError(f"{col} 는 {vals} 중 하나여야 함: {record[col]!r}")
+
+
+def encode_item(item: Dict[str, Any], encoder: FeatureEncoder) -> np.ndarray:
+    """
+    요청 항목 하나 → (n_features,) float32
+    - {"input": {...}}    : TodayInputPage 형식 (문자열, 'hh:mm:ss' 시간) → parse_today_input, 범주 컬럼(profile_type)은 그대로
+    - {"record": {...}}   : 모델 입력 레코드 (SleepTime, PM10, ..., profile_type)
+    - {"features": [...]} : 이미 인코딩된 피처 벡터 (encoder.feature_names 순서, 모두 유한한 값)
+    - 형식이 틀리거나 필수 입력이 빠지면 ValueError / KeyError
+    """
+    if not isinstance(item, dict):
+        raise ValueError("요청 항목은 JSON 객체여야 함")
+    if "features" in item:
+        x = np.asarray(item["features"], dtype=np.float32)
+        if x.shape != (encoder.n_features,):
+            raise ValueError(f"features 길이가 {encoder.n_features} 가 아님: {x.shape}")
+        if not np.isfinite(x).all():
+            raise ValueError("features 에 NaN/inf 가 있음")
+        return x
+    if "input" in item:
+        raw = item["input"]
+        if not isinstance(raw, dict):
+            raise ValueError("input 은 JSON 객체여야 함")
+        record = {**parse_today_input(raw), **{col: raw.get(col) for col in encoder.categories}}
+    elif "record" in item:
+        record = item["record"]
+    else:
+        raise ValueError("input / record / features 중 하나가 필요함")
+    validate_record(record, encoder)
+    return encoder.encode_record(record)[0]
+
+
+class MicroBatcher:
+    """
+    동시에 들어온 단건 요청을 모아서 pipeline.predict_cards 한 번으로 처리
+    - submit(x): 대기열에 넣고 카드가 나올 때까지 await
+    - 배치 루프: 첫 요청을 꺼낸 뒤 max_wait_ms 안에 온 요청을 max_batch_size 까지 추가
+    - 모델/SHAP 계산은 executor 스레드에서 (이벤트 루프는 계속 요청을 받음)
+    - 배치 크기 1 이면 predict_card (PredictionCache 를 켠 경우 캐시 사용)
+    """
+    def __init__(self, pipeline, executor: ThreadPoolExecutor, max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+                 max_wait_ms: float = DEFAULT_MAX_WAIT_MS, max_queue: int = DEFAULT_MAX_QUEUE):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size 는 1 이상이어야 함")
+        self.pipeline = pipeline
+        self.executor = executor
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.max_queue = max_queue
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        # 통계: 배치 크기 / 배치를 만들 때 대기열 길이 분포, 대기 시간 / 배치 계산 시간 히스토그램
+        self.batch_sizes: Counter = Counter()
+        self.queue_depths: Counter = Counter()
+        self.queue_wait = LatencyHistogram()
+        self.batch_compute = LatencyHistogram()
+        self.rejected = 0
+        self.failed_batches = 0
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def start(self):
+        if self._task is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queue)
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def submit(self, x: np.ndarray) -> Dict:
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait((x, future, time.perf_counter()))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise HTTPError(503, f"대기열이 가득 참 ({self.max_queue})")
+        return await future
+
+    async def _collect(self) -> List[Tuple[np.ndarray, asyncio.Future, float]]:
+        batch = [await self._queue.get()]
+        self.queue_depths[self._queue.qsize() + 1] += 1
+        deadline = time.perf_counter() + self.max_wait_ms / 1e3
+        while len(batch) < self.max_batch_size:
+            # 이미 쌓인 요청은 기다리지 않고 바로 꺼냄
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    def _compute(self, X: np.ndarray) -> List[Dict]:
+        if X.shape[0] == 1:
+            return [self.pipeline.predict_card(X)]
+        return self.pipeline.predict_cards(X)
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            # 기다리는 동안 연결이 끊겨 취소된 요청은 계산하지 않음
+            batch = [b for b in batch if not b[1].done()]
+            if not batch:
+                continue
+            t0 = time.perf_counter()
+            for _x, _future, queued in batch:
+                self.queue_wait.record((t0 - queued) * 1e3)
+            self.batch_sizes[len(batch)] += 1
+            X = np.stack([x for x, _future, _queued in batch])
+            try:
+                cards = await loop.run_in_executor(self.executor, self._compute, X)
+            except Exception as e:
+                self.failed_batches += 1
+                logger.exception("[service] 배치 %d건 처리 실패", len(batch))
+                for _x, future, _queued in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            self.batch_compute.record((time.perf_counter() - t0) * 1e3)
+            for (_x, future, _queued), card in zip(batch, cards):
+                if not future.done():
+                    future.set_result(card)
+
+    def stats(self) -> Dict[str, Any]:
+        n_batches = sum(self.batch_sizes.values())
+        n_items = sum(size * c for size, c in self.batch_sizes.items())
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait_ms,
+            "queue_depth": self.queue_depth,
+            "batches": n_batches,
+            "items": n_items,
+            "mean_batch_size": n_items / n_batches if n_batches else 0.0,
+            "batch_size_histogram": {str(k): v for k, v in sorted(self.batch_sizes.items())},
+            "queue_depth_histogram": {str(k): v for k, v in sorted(self.queue_depths.items())},
+            "queue_wait_ms": self.queue_wait.summary(),
+            "batch_compute_ms": self.batch_compute.summary(),
+            "rejected": self.rejected,
+            "failed_batches": self.failed_batches,
+        }
+
+    def reset_stats(self):
+        self.batch_sizes.clear()
+        self.queue_depths.clear()
+        self.queue_wait = LatencyHistogram()
+        self.batch_compute = LatencyHistogram()
+        self.rejected = 0
+        self.failed_batches = 0
+
+
+class PredictionService:
+    """
+    CoachPipeline 하나를 여러 클라이언트가 공유하는 asyncio HTTP/1.1 서비스 (표준 라이브러리만 사용, keep-alive 지원)
+    - POST /predict        {"input"|"record"|"features": ...} → {"card": {...}}  (MicroBatcher 로 합쳐서 처리)
+    - POST /predict_batch  {"items": [...]} → {"cards": [...]}  (요청 하나 = predict_cards 한 번, 입력 순서 유지)
+    - GET  /stats          대기열 길이, 배치 크기/대기열 길이 히스토그램, 요청 지연, (계측을 켰으면) 파이프라인 스냅샷
+    - POST /stats/reset    통계 초기화 (부하 테스트 구간별 측정용)
+    - GET  /health
+    """
+    def __init__(self, pipeline, encoder: FeatureEncoder, max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+                 max_wait_ms: float = DEFAULT_MAX_WAIT_MS, max_queue: int = DEFAULT_MAX_QUEUE, workers: int = 1):
+        self.pipeline = pipeline
+        self.encoder = encoder
+        # SHAP explainer 는 스레드 안전을 보장하지 않으므로 기본 1 스레드 (배치 하나씩 순서대로)
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="coach-service")
+        self.batcher = MicroBatcher(pipeline, self.executor, max_batch_size, max_wait_ms, max_queue)
+        self.latency: Dict[str, LatencyHistogram] = {}
+        self.status_counts: Counter = Counter()
+        self.batch_requests = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._started = time.time()
+
+    async def start(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> asyncio.AbstractServer:
+        self.batcher.start()
+        self._server = await asyncio.start_server(self._handle_connection, host, port)
+        return self._server
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        await self.batcher.stop()
+        self.executor.shutdown(wait=True)
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request = await self._read_request(reader)
+                if request is None:
+                    break
+                method, path, headers, body = request
+                t0 = time.perf_counter()
+                try:
+                    status, payload = await self._dispatch(method, path, body)
+                except HTTPError as e:
+                    status, payload = e.status, {"error": str(e)}
+                except (ValueError, KeyError, TypeError) as e:
+                    status, payload = 400, {"error": f"잘못된 입력: {e}"}
+                except Exception as e:
+                    logger.exception("[service] %s %s 처리 실패", method, path)
+                    status, payload = 500, {"error": str(e)}
+                self._record(path, status, (time.perf_counter() - t0) * 1e3)
+                keep_alive = headers.get("connection", "").lower() != "close"
+                await self._write_response(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except HTTPError as e:
+            # 헤더/본문을 읽는 단계의 오류는 응답 후 연결 종료
+            await self._write_response(writer, e.status, {"error": str(e)}, keep_alive=False)
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader: asyncio.StreamReader):
+        line = await reader.readline()
+        if not line:
+            return None
+        try:
+            method, target, _version = line.decode("latin-1").split()
+        except ValueError:
+            raise HTTPError(400, "잘못된 요청 줄")
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            key, _, value = line.decode("latin-1").partition(":")
+            headers[key.strip().lower()] = value.strip()
+        try:
+            length = int(headers.get("content-length", 0) or 0)
+        except ValueError:
+            raise HTTPError(400, f"잘못된 Content-Length: {headers['content-length']!r}")
+        if length < 0:
+            raise HTTPError(400, f"잘못된 Content-Length: {length}")
+        if length > MAX_BODY_BYTES:
+            raise HTTPError(413, f"요청 본문이 너무 큼 ({length} > {MAX_BODY_BYTES})")
+        body = await reader.readexactly(length) if length else b""
+        return method.upper(), target.split("?", 1)[0], headers, body
+
+    async def _write_response(self, writer: asyncio.StreamWriter, status: int, payload: Dict[str, Any],
+                              keep_alive: bool = True):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        head = (f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+                f"Content-Type: application/json; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+
+    async def _dispatch(self, method: str, path: str, body: bytes) -> Tuple[int, Dict[str, Any]]:
+        routes = {
+            "/predict": ("POST", self._predict),
+            "/predict_batch": ("POST", self._predict_batch),
+            "/stats": ("GET", self._stats),
+            "/stats/reset": ("POST", self._reset_stats),
+            "/health": ("GET", self._health),
+        }
+        if path not in routes:
+            raise HTTPError(404, f"없는 경로: {path}")
+        allowed, handler = routes[path]
+        if method != allowed:
+            raise HTTPError(405, f"{path} 는 {allowed} 만 지원")
+        if allowed == "GET":
+            return 200, handler()
+        try:
+            data = json.loads(body or b"{}")
+        except ValueError as e:
+            raise HTTPError(400, f"JSON 파싱 실패: {e}")
+        return 200, await handler(data)
+
+    async def _predict(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        x = encode_item(data, self.encoder)
+        return {"card": await self.batcher.submit(x)}
+
+    async def _predict_batch(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        items = data.get("items") if isinstance(data, dict) else None
+        if not isinstance(items, list):
+            raise ValueError("items 리스트가 필요함")
+        if not items:
+            return {"cards": []}
+        X = np.stack([encode_item(item, self.encoder) for item in items])
+        self.batch_requests += 1
+        cards = await asyncio.get_running_loop().run_in_executor(self.executor, self.pipeline.predict_cards, X)
+        return {"cards": cards}
+
+    def _health(self) -> Dict[str, Any]:
+        return {"status": "ok", "uptime_seconds": time.time() - self._started}
+
+    def _stats(self) -> Dict[str, Any]:
+        stats = {
+            "uptime_seconds": time.time() - self._started,
+            "microbatch": self.batcher.stats(),
+            "batch_requests": self.batch_requests,
+            "status_counts": {str(k): v for k, v in sorted(self.status_counts.items())},
+            "latency_ms": {path: h.summary() for path, h in self.latency.items()},
+        }
+        snapshot = getattr(self.pipeline, "instrumentation_snapshot", lambda: None)()
+        if snapshot is not None:
+            stats["pipeline"] = snapshot
+        return stats
+
+    async def _reset_stats(self, _data: Dict[str, Any]) -> Dict[str, Any]:
+        self.batcher.reset_stats()
+        self.latency.clear()
+        self.status_counts.clear()
+        self.batch_requests = 0
+        instrumentation = getattr(self.pipeline, "instrumentation", None)
+        if instrumentation is not None:
+            instrumentation.reset()
+        return {"status": "reset"}
+
+    def _record(self, path: str, status: int, ms: float):
+        self.status_counts[status] += 1
+        hist = self.latency.get(path)
+        if hist is None:
+            hist = self.latency[path] = LatencyHistogram()
+        hist.record(ms)
+
+
+async def serve(pipeline, encoder: FeatureEncoder, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, **kwargs):
+    """서비스 시작 후 종료(Ctrl+C)까지 실행"""
+    service = PredictionService(pipeline, encoder, **kwargs)
+    server = await service.start(host, port)
+    addrs = ", ".join(str(s.getsockname()) for s in server.sockets)
+    print(f"[INFO] 예측 서비스 시작: {addrs} (max_batch_size={service.batcher.max_batch_size}, "
+          f"max_wait_ms={service.batcher.max_wait_ms})", flush=True)
+    try:
+        await server.serve_forever()
+    finally:
+        await service.stop()
+
+
+if __name__ == "__main__":
+    import argparse
+    from coach.pipeline import CoachPipeline
+    from coach.instrumentation import PipelineInstrumentation
+
+    parser = argparse.ArgumentParser(description="CoachPipeline HTTP 예측 서비스 (/predict 마이크로배치, /predict_batch, /stats)")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--max-batch-size", type=int, default=DEFAULT_MAX_BATCH_SIZE)
+    parser.add_argument("--max-wait-ms", type=float, default=DEFAULT_MAX_WAIT_MS)
+    parser.add_argument("--max-queue", type=int, default=DEFAULT_MAX_QUEUE)
+    parser.add_argument("--workers", type=int, default=1, help="모델/SHAP 계산 스레드 수")
+    parser.add_argument("--explainer", choices=["permutation", "tree"], default="permutation")
+    parser.add_argument("--inference-config", default=None, help="onnx/openvino 백엔드 설정 (기본: LightGBM)")
+    parser.add_argument("--instrument", action="store_true", help="파이프라인 단계별 계측을 켜고 /stats 에 포함")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    pipeline = CoachPipeline.from_artifacts(
+        MODEL_PATH, BACKGROUND_PATH, explainer_mode=args.explainer, inference_config=args.inference_config,
+        instrumentation=PipelineInstrumentation(summary_interval_seconds=None) if args.instrument else None,
+    )
+    try:
+        asyncio.run(serve(pipeline, FeatureEncoder.load(FEATURE_ENCODER_PATH), args.host, args.port,
+                          max_batch_size=args.max_batch_size, max_wait_ms=args.max_wait_ms,
+                          max_queue=args.max_queue, workers=args.workers))
+    except KeyboardInterrupt:
+        pass
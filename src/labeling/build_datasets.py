@@ -1,15 +1,15 @@
+import os
+import sys
 import pandas as pd
 from pathlib import Path
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from labeling.csv_ingest import read_csv_cached
+from labeling.data_store import read_dataset
+
 OUT = Path("data/processed")
 OUT.mkdir(parents=True, exist_ok=True)
 
-def read_csv_safely(path, **kwargs):
-    try:
-        return pd.read_csv(path, **kwargs)
-    except UnicodeDecodeError:
-        return pd.read_csv(path, encoding="cp949", **kwargs)
-
 def normalize_date_col(df, col="date"):
     if pd.api.types.is_numeric_dtype(df[col]):
         df[col] = pd.to_datetime(df[col].astype(str), format="%Y%m%d", errors="coerce")
@@ -18,13 +18,11 @@ def normalize_date_col(df, col="date"):
     df.dropna(subset=[col], inplace=True)
     return df
 
-def merge_env_and_life(env_path="data/processed/env_merged.csv",
+def merge_env_and_life(env_path="data/processed/env_merged",
                        life_path="data/processed/life_synth.csv",
                        out_path="data/processed/dataset_merged.csv"):
-    # 1) 환경 데이터 읽기
-    if not Path(env_path).exists():
-        raise FileNotFoundError(f"환경 파일을 찾을 수 없음: {env_path}")
-    env = read_csv_safely(env_path)
+    # 1) 환경 데이터 읽기: merge_env.py 결과 (env_merged.parquet, 없으면 .csv), 없으면 FileNotFoundError
+    env = read_dataset(env_path)
 
     # region 컬럼 제거
     if "region" in env.columns:
@@ -41,7 +39,7 @@ def merge_env_and_life(env_path="data/processed/env_merged.csv",
     # 2) 생활 데이터 읽기
     if not Path(life_path).exists():
         raise FileNotFoundError(f"생활 파일을 찾을 수 없음: {life_path}")
-    life = read_csv_safely(life_path)
+    life = read_csv_cached(life_path)
 
     # 길이 맞추기
     if len(life) != len(env):
@@ -0,0 +1,257 @@
+# src/labeling/csv_ingest.py
+from typing import Any, Dict, Optional, Sequence
+import hashlib
+import json
+import os
+import uuid
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+import pyarrow.feather as feather
+
+from labeling.data_store import PROCESSED_DIR
+
+# 파싱 결과 캐시 위치: <원본 이름>-<옵션 키>-<내용 해시>.feather (Arrow IPC, memory-map 으로 읽기)
+CSV_CACHE_DIR = os.path.join(PROCESSED_DIR, "csv_cache")
+# (경로, 크기, mtime) → 내용 해시: mtime 이 그대로면 파일을 다시 해시하지 않음
+_INDEX_FILE = "index.json"
+
+# 파싱 결과가 바뀌는 수정 시 올림 (캐시 키에 포함 → 예전 방식으로 파싱한 캐시는 쓰지 않음)
+PARSER_VERSION = 2
+
+# 공공데이터 CSV 결측 표기 (pyarrow 기본값 + "-")
+NULL_VALUES = ["", "-", "NA", "N/A", "NaN", "nan", "null", "NULL"]
+
+# 인코딩 판별에 쓰는 앞부분 바이트 수
+SNIFF_BYTES = 1 << 16
+
+# 내용 해시 계산 시 한 번에 읽는 바이트 수
+_HASH_BLOCK = 1 << 20
+
+
+def sniff_encoding(path: str, n_bytes: int = SNIFF_BYTES) -> str:
+    """앞부분만 utf-8 로 디코딩해 보고 실패하면 cp949 (utf-8 → cp949 순서, 파일 전체는 읽지 않음)"""
+    with open(path, "rb") as f:
+        head = f.read(n_bytes)
+    try:
+        head.decode("utf-8")
+    except UnicodeDecodeError as e:
+        # 블록 경계에서 잘린 멀티바이트 문자는 utf-8 로 간주
+        if e.start < len(head) - 3:
+            return "cp949"
+    return "utf-8"
+
+
+def parse_timestamps(values) -> np.ndarray:
+    """
+    관측 시각 컬럼 → datetime64[s]
+    - 정수/숫자 문자열 YYYYMMDD (일별), YYYYMMDDHH (시간별, 에어코리아식 24시 = 다음날 0시)
+    - 그 외 문자열은 pandas 로 파싱, 엑셀용 "'" 접두어 허용
+    - 형식은 행마다 판별 (숫자 날짜와 다른 형식/잘못된 값이 섞여 있어도 숫자 날짜 행은 그대로 파싱)
+    - 파싱 실패/결측은 NaT
+    """
+    arr = pa.chunked_array([values]) if isinstance(values, pa.Array) else values
+    if not isinstance(arr, pa.ChunkedArray):
+        arr = pa.chunked_array([pa.array(np.asarray(values).astype(str))])
+    s = pc.utf8_ltrim(pc.utf8_trim_whitespace(pc.cast(arr, pa.string())), characters="'")
+    out = np.full(len(s), np.datetime64("NaT"), dtype="datetime64[s]")
+    # 숫자 날짜(8/10자리) 행만 골라 문자열 파싱 없이 산술로 분해, 나머지 행만 pandas 로 파싱
+    numeric = pc.fill_null(pc.match_substring_regex(s, r"^[0-9]{8}([0-9]{2})?$"), False).to_numpy(zero_copy_only=False)
+    if numeric.any():
+        ints = pc.cast(pc.filter(s, pa.array(numeric)), pa.int64()).to_numpy(zero_copy_only=False)
+        hourly = ints >= 10 ** 8
+        day = np.where(hourly, ints // 100, ints)
+        hour = np.where(hourly, ints % 100, 0)
+        y, m, d = day // 10000, day // 100 % 100, day % 100
+        months = np.datetime64("1970-01", "M") + ((y - 1970) * 12 + (m - 1)).astype("timedelta64[M]")
+        parsed = (months.astype("datetime64[D]") + (d - 1).astype("timedelta64[D]")
+                  + hour.astype("timedelta64[h]")).astype("datetime64[s]")
+        # 없는 날짜(2월 30일 등)/시각은 NaT
+        ok = (m >= 1) & (m <= 12) & (d >= 1) & (d <= _days_in_month(months)) & (hour <= 24)
+        parsed[~ok] = np.datetime64("NaT")
+        out[numeric] = parsed
+    rest = ~numeric & pc.is_valid(s).to_numpy(zero_copy_only=False)
+    if rest.any():
+        others = pd.Series(pc.filter(s, pa.array(rest)).to_pandas())
+        out[rest] = pd.to_datetime(others, errors="coerce", format="mixed").to_numpy("datetime64[s]")
+    return out
+
+
+def _days_in_month(months: np.ndarray) -> np.ndarray:
+    return ((months + 1).astype("datetime64[D]") - months.astype("datetime64[D]")).astype(np.int64)
+
+
+def _arrow_type(dtype) -> pa.DataType:
+    """'float32' / 'int8' / 'string' / 'category' / pa.DataType → CSV 파싱 타입"""
+    if isinstance(dtype, pa.DataType):
+        return dtype
+    if dtype == "category":
+        return pa.dictionary(pa.int32(), pa.string())
+    if dtype in ("str", "string", "object"):
+        return pa.string()
+    return pa.type_for_alias(dtype)
+
+
+def file_digest(path: str) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(_HASH_BLOCK), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def parse_csv(
+    path: str,
+    names: Optional[Sequence[str]] = None,
+    usecols: Optional[Sequence[int]] = None,
+    header: bool = True,
+    dtypes: Optional[Dict[str, Any]] = None,
+    date_cols: Sequence[str] = (),
+    encoding: Optional[str] = None
+) -> pa.Table:
+    """
+    CSV → Arrow Table (pyarrow CSV 엔진, 한 번만 파싱)
+    - 인코딩은 앞부분으로 한 번만 판별 (utf-8 실패 후 cp949 로 전체를 다시 읽지 않음)
+    - header=False 면 names 가 컬럼 이름, usecols 는 읽을 컬럼 위치 (names 와 같은 순서)
+    - dtypes 에 준 컬럼은 그 타입으로 바로 변환, 나머지는 pyarrow 추론
+    - date_cols 는 parse_timestamps 로 datetime 변환 후 실패한 행 제거 (normalize_date_col 과 같은 결과, 제거한 행 수는 [WARN] 출력)
+    - 컬럼 수가 맞지 않는 행은 건너뜀
+    """
+    dtypes = dict(dtypes or {})
+    read_options = pacsv.ReadOptions(encoding=encoding or sniff_encoding(path))
+    if header:
+        include = list(names) if names is not None else None
+    else:
+        # 파일 컬럼 수를 모르므로 f0, f1, ... 자동 이름으로 읽고 usecols 위치만 골라서 names 로 변경
+        read_options.autogenerate_column_names = True
+        positions = list(usecols) if usecols is not None else list(range(len(names or ())))
+        if names is None or len(names) != len(positions):
+            raise ValueError("header=False 이면 names 와 usecols 의 길이가 같아야 함")
+        include = [f"f{i}" for i in positions]
+        rename = dict(zip(include, names))
+        dtypes = {src: dtypes[dst] for src, dst in rename.items() if dst in dtypes}
+        date_cols = [src for src, dst in rename.items() if dst in date_cols]
+    # 날짜 컬럼은 문자열로 읽어서 parse_timestamps 에 넘김 (YYYYMMDD 정수, "'" 접두어 모두 처리)
+    column_types = {col: _arrow_type(t) for col, t in dtypes.items()}
+    column_types.update({col: pa.string() for col in date_cols})
+    table = pacsv.read_csv(
+        path,
+        read_options=read_options,
+        parse_options=pacsv.ParseOptions(invalid_row_handler=lambda row: "skip"),
+        convert_options=pacsv.ConvertOptions(
+            column_types=column_types, include_columns=include,
+            null_values=NULL_VALUES, strings_can_be_null=False,
+        ),
+    )
+    if not header:
+        table = table.rename_columns([rename[c] for c in table.column_names])
+        date_cols = [rename[c] for c in date_cols]
+    for col in date_cols:
+        if col not in table.column_names:
+            continue
+        ts = parse_timestamps(table.column(col))
+        table = table.set_column(table.column_names.index(col), col, pa.array(ts, type=pa.timestamp("s")))
+        valid = pc.is_valid(table.column(col))
+        dropped = table.num_rows - pc.sum(valid).as_py() if table.num_rows else 0
+        if dropped:
+            print(f"[WARN] {os.path.basename(path)}: '{col}' 날짜 파싱 실패 {dropped}/{table.num_rows}행 제거")
+        table = table.filter(valid)
+    return table
+
+
+class CsvCache:
+    """
+    parse_csv 결과를 feather 로 캐시 (원본 내용 해시 + 읽기 옵션이 같으면 다시 파싱하지 않음)
+    - 내용 해시는 (경로, 크기, mtime) 이 바뀐 경우에만 다시 계산 → 반복 실행은 stat + memory-map 읽기만
+    - 같은 원본/옵션의 이전 캐시 파일은 새로 저장할 때 지움
+    """
+    def __init__(self, cache_dir: str = CSV_CACHE_DIR):
+        self.cache_dir = cache_dir
+        self._index: Optional[Dict[str, Dict[str, Any]]] = None
+        self.hits = 0
+        self.misses = 0
+
+    def _index_path(self) -> str:
+        return os.path.join(self.cache_dir, _INDEX_FILE)
+
+    def _load_index(self) -> Dict[str, Dict[str, Any]]:
+        if self._index is None:
+            try:
+                with open(self._index_path(), "r", encoding="utf-8") as f:
+                    self._index = json.load(f)
+            except (OSError, ValueError):
+                self._index = {}
+        return self._index
+
+    def _save_index(self):
+        tmp = f"{self._index_path()}.{uuid.uuid4().hex}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self._index, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, self._index_path())
+
+    def content_key(self, path: str) -> str:
+        """원본 내용 해시 (크기와 mtime 이 index 와 같으면 저장된 해시 재사용)"""
+        path = os.path.abspath(path)
+        st = os.stat(path)
+        index = self._load_index()
+        entry = index.get(path)
+        if entry and entry["size"] == st.st_size and entry["mtime_ns"] == st.st_mtime_ns:
+            return entry["digest"]
+        digest = file_digest(path)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        index[path] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "digest": digest}
+        self._save_index()
+        return digest
+
+    @staticmethod
+    def options_key(**options) -> str:
+        spec = {k: (str(v) if isinstance(v, pa.DataType) else v) for k, v in options.items()}
+        spec = json.dumps({**spec, "parser_version": PARSER_VERSION},
+                          sort_keys=True, default=str, ensure_ascii=False)
+        return hashlib.blake2b(spec.encode("utf-8"), digest_size=6).hexdigest()
+
+    def read_table(self, path: str, **options) -> pa.Table:
+        """options 는 parse_csv 인자 (names, usecols, header, dtypes, date_cols, encoding)"""
+        stem = os.path.splitext(os.path.basename(path))[0]
+        prefix = f"{stem}-{self.options_key(**options)}-"
+        cache_path = os.path.join(self.cache_dir, prefix + self.content_key(path) + ".feather")
+        if os.path.exists(cache_path):
+            self.hits += 1
+            return feather.read_table(cache_path, memory_map=True)
+        self.misses += 1
+        table = parse_csv(path, **options)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp = f"{cache_path}.{uuid.uuid4().hex}.tmp"
+        feather.write_feather(table, tmp, compression="uncompressed")
+        os.replace(tmp, cache_path)
+        for name in os.listdir(self.cache_dir):
+            if name.startswith(prefix) and name.endswith(".feather") and name != os.path.basename(cache_path):
+                os.remove(os.path.join(self.cache_dir, name))
+        return table
+
+    def clear(self):
+        if os.path.isdir(self.cache_dir):
+            for name in os.listdir(self.cache_dir):
+                os.remove(os.path.join(self.cache_dir, name))
+        self._index = None
+
+
+_default_cache: Optional[CsvCache] = None
+
+
+def read_csv_cached(path, use_cache: bool = True, cache: Optional[CsvCache] = None, **options) -> pd.DataFrame:
+    """
+    기존 read_csv_safely 대체: parse_csv (+ 캐시) → pandas DataFrame
+    - use_cache=False 면 매번 파싱 (캐시 파일 없음)
+    """
+    global _default_cache
+    path = str(path)
+    if not use_cache:
+        return parse_csv(path, **options).to_pandas()
+    if cache is None:
+        if _default_cache is None:
+            _default_cache = CsvCache()
+        cache = _default_cache
+    return cache.read_table(path, **options).to_pandas()
@@ -0,0 +1,190 @@
+# src/labeling/data_store.py
+from typing import Dict, List, Optional
+import os
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+PROCESSED_DIR = os.path.join(PROJECT_ROOT, "data", "processed")
+
+# 저장 형식 (읽을 때 이 순서로 찾고, 없으면 같은 이름의 .csv)
+# - parquet: 압축, 기본 형식
+# - feather: Arrow IPC 비압축, memory-map 으로 복사 없이 컬럼 읽기
+FORMATS = {"parquet": ".parquet", "feather": ".feather"}
+DEFAULT_FORMAT = "parquet"
+
+# 생활/학습 데이터 (life_synth_merged, synth_*, train/val/test) 컬럼 dtype
+LIFE_COLUMN_TYPES = {
+    "SleepTime": "float32",
+    "MoodScore": "float32",
+    "ActivityTime": "float32",
+    "Caffeine": "int8",
+    "PhoneTime": "float32",
+    "PM10": "float32",
+    "Temp": "float32",
+    "Humidity": "float32",
+    "profile_type": "category",
+    "ConditionLabel": "int8",
+}
+
+# env_merged: 측정값은 원본 dtype 유지 (합성 생성기 입력이라 float32 로 줄이면 생성 결과가 달라짐)
+ENV_COLUMN_TYPES = {
+    "date": "datetime64[s]",
+    "region": "category",
+}
+
+DATASET_COLUMN_TYPES = {
+    "env_merged": ENV_COLUMN_TYPES,
+    "env_daily_regions": ENV_COLUMN_TYPES,
+}
+
+
+def dataset_name(name_or_path: str) -> str:
+    """'data/processed/train.csv' / 'train.parquet' / 'train' → 'train'"""
+    stem, ext = os.path.splitext(os.path.basename(name_or_path))
+    return stem if ext in (".csv", *FORMATS.values()) else os.path.basename(name_or_path)
+
+
+def column_types_for(name_or_path: str) -> Dict[str, str]:
+    return DATASET_COLUMN_TYPES.get(dataset_name(name_or_path), LIFE_COLUMN_TYPES)
+
+
+def apply_schema(df: pd.DataFrame, column_types: Optional[Dict[str, str]] = None,
+                 categories: Optional[Dict[str, List[str]]] = None) -> pd.DataFrame:
+    """
+    저장용 dtype 적용 (없는 컬럼은 무시, 표에 없는 컬럼은 그대로)
+    - category 컬럼은 범주를 정렬해서 고정 → pd.get_dummies 컬럼 순서가 CSV 때와 같음
+    - categories 로 범주 목록을 직접 주면 그 목록 사용 (청크별로 나눠 써도 같은 사전)
+    - datetime 컬럼은 엑셀용 "'" 접두어가 붙은 문자열도 허용
+    """
+    column_types = LIFE_COLUMN_TYPES if column_types is None else column_types
+    categories = categories or {}
+    out = df.copy(deep=False)
+    for col, dtype in column_types.items():
+        if col not in out.columns:
+            continue
+        if dtype == "category":
+            cats = categories.get(col)
+            if cats is None:
+                cats = sorted(pd.unique(out[col].dropna()).tolist())
+            out[col] = pd.Categorical(out[col], categories=sorted(cats))
+        elif dtype.startswith("datetime64"):
+            s = out[col]
+            if not pd.api.types.is_datetime64_any_dtype(s):
+                s = pd.to_datetime(s.astype(str).str.strip().str.lstrip("'"), errors="coerce")
+            out[col] = s.astype(dtype)
+        else:
+            out[col] = out[col].astype(dtype)
+    return out
+
+
+def to_table(df: pd.DataFrame, column_types: Optional[Dict[str, str]] = None,
+             categories: Optional[Dict[str, List[str]]] = None) -> pa.Table:
+    return pa.Table.from_pandas(apply_schema(df, column_types, categories), preserve_index=False)
+
+
+def write_table(table: pa.Table, path: str):
+    """확장자(.parquet / .feather)에 맞는 형식으로 저장"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    if path.endswith(FORMATS["feather"]):
+        feather.write_feather(table, path, compression="uncompressed")
+    else:
+        pq.write_table(table, path, compression="zstd")
+
+
+def write_dataset(df: pd.DataFrame, name: str, data_dir: str = PROCESSED_DIR, fmt: str = DEFAULT_FORMAT,
+                  csv: bool = False, categories: Optional[Dict[str, List[str]]] = None) -> str:
+    """
+    DataFrame → data_dir/<name>.<fmt> (명시 dtype 적용), csv=True 면 <name>.csv 도 함께 저장
+    - CSV 는 넘겨받은 df 값 그대로 기록 (여기서 하는 dtype 변환은 반영되지 않음)
+      단, read_dataset 으로 컬럼형 파일에서 읽은 df 는 이미 float32 로 저장됐던 값이므로 CSV 도 float32 로 반올림된 값
+      (label_split --csv 의 train/val/test.csv 가 이 경우, 원래 float64 값은 synth_merge 단계에서 남지 않음)
+    """
+    path = os.path.join(data_dir, name + FORMATS[fmt])
+    write_table(to_table(df, column_types_for(name), categories), path)
+    if csv:
+        df.to_csv(os.path.join(data_dir, name + ".csv"), index=False)
+    return path
+
+
+def resolve_dataset(name_or_path: str, data_dir: str = PROCESSED_DIR, fmt: Optional[str] = None) -> str:
+    """
+    이름 또는 경로 → 실제로 읽을 파일
+    - 확장자까지 준 경로('.../train.csv', 'train.parquet')는 그 파일이 있으면 그대로 (CSV 를 고친 뒤 읽어도 예전 parquet 로 바뀌지 않음)
+    - 이름만 주거나('train') 지정한 파일이 없으면 같은 폴더의 train.parquet → train.feather → train.csv 순서로 찾음
+    - fmt 를 주면 그 형식만
+    """
+    folder = os.path.dirname(name_or_path) or data_dir
+    name = dataset_name(name_or_path)
+    exts = [FORMATS[fmt]] if fmt else [*FORMATS.values(), ".csv"]
+    explicit = os.path.join(folder, os.path.basename(name_or_path))
+    if os.path.splitext(explicit)[1] in exts and os.path.exists(explicit):
+        return explicit
+    for ext in exts:
+        path = os.path.join(folder, name + ext)
+        if os.path.exists(path):
+            return path
+    raise FileNotFoundError(f"데이터셋을 찾을 수 없음: {name} ({folder}, {'/'.join(exts)})")
+
+
+def restore_units(table: pa.Table, column_types: Dict[str, str]) -> pa.Table:
+    """
+    parquet 에서 읽은 시간 컬럼을 명시 dtype 의 단위로 되돌림
+    - parquet 에는 초 단위 timestamp 가 없어 datetime64[s] 컬럼이 [ms] 로 저장됨 (feather/CSV 경로와 dtype 을 맞춤)
+    """
+    for col, dtype in column_types.items():
+        if not dtype.startswith("datetime64") or col not in table.column_names:
+            continue
+        field = table.schema.field(col)
+        target = pa.timestamp(dtype[len("datetime64["):-1], tz=getattr(field.type, "tz", None))
+        if pa.types.is_timestamp(field.type) and field.type != target:
+            table = table.set_column(table.column_names.index(col), col, table.column(col).cast(target))
+    return table
+
+
+def read_table(name_or_path: str, columns: Optional[List[str]] = None, data_dir: str = PROCESSED_DIR,
+               fmt: Optional[str] = None, memory_map: bool = True) -> pa.Table:
+    """
+    Arrow Table 로 읽기 (필요한 컬럼만)
+    - feather 는 memory-map 으로 복사 없이, parquet 는 memory-map 한 파일에서 해당 컬럼 청크만 디코딩
+    - FeatureEncoder.encode_columns 에 바로 넘길 수 있음
+    """
+    path = resolve_dataset(name_or_path, data_dir, fmt)
+    if path.endswith(FORMATS["feather"]):
+        return feather.read_table(path, columns=columns, memory_map=memory_map)
+    if path.endswith(FORMATS["parquet"]):
+        return restore_units(pq.read_table(path, columns=columns, memory_map=memory_map), column_types_for(path))
+    return to_table(pd.read_csv(path, usecols=columns), column_types_for(path))
+
+
+def read_dataset(name_or_path: str, columns: Optional[List[str]] = None, data_dir: str = PROCESSED_DIR,
+                 fmt: Optional[str] = None, memory_map: bool = True) -> pd.DataFrame:
+    """
+    pandas DataFrame 으로 읽기 (기존 pd.read_csv(path) 대체)
+    - 컬럼형 파일이 없으면 CSV 를 읽고 같은 dtype 을 적용하므로 어느 쪽이든 결과 dtype 동일
+    """
+    path = resolve_dataset(name_or_path, data_dir, fmt)
+    if path.endswith(".csv"):
+        return apply_schema(pd.read_csv(path, usecols=columns), column_types_for(path))
+    return read_table(path, columns=columns, memory_map=memory_map).to_pandas()
+
+
+def convert_csvs(data_dir: str = PROCESSED_DIR, fmt: str = DEFAULT_FORMAT, names: Optional[List[str]] = None) -> List[str]:
+    """data_dir 의 CSV 들을 컬럼형 파일로 변환 (기존 CSV 는 그대로 둠)"""
+    if names is None:
+        names = sorted(f[:-4] for f in os.listdir(data_dir) if f.endswith(".csv"))
+    return [write_dataset(pd.read_csv(os.path.join(data_dir, n + ".csv")), n, data_dir, fmt) for n in names]
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="data/processed CSV → Parquet/Feather 변환")
+    parser.add_argument("--data-dir", default=PROCESSED_DIR)
+    parser.add_argument("--format", choices=sorted(FORMATS), default=DEFAULT_FORMAT)
+    parser.add_argument("names", nargs="*", help="변환할 데이터셋 이름 (기본: 전부)")
+    args = parser.parse_args()
+    for p in convert_csvs(args.data_dir, args.format, args.names or None):
+        print(f"[INFO] saved {p}")
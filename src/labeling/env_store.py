@@ -0,0 +1,262 @@
+# src/labeling/env_store.py
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+import os
+import shutil
+import uuid
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from urllib.parse import quote, unquote
+
+from labeling.data_store import PROCESSED_DIR
+from labeling.csv_ingest import sniff_encoding, parse_timestamps
+
+# 원시 관측값 저장 위치: <root>/<변수>/region=<지역>/part-*.parquet (지역별로 나눠서 읽기)
+ENV_STORE_DIR = os.path.join(PROCESSED_DIR, "env_store")
+
+# 원시 파일 → 변수 이름 (merge_env 의 pm/temp/humidity.csv 와 같은 구성)
+RAW_FILES = {"PM10": "pm.csv", "Temp": "temp.csv", "Humidity": "humidity.csv"}
+VARIABLES = list(RAW_FILES)
+
+# 일별 집계: 첫 항목(mean)은 변수 이름 그대로, 나머지는 '<변수>_<집계>' 컬럼
+DAILY_AGGREGATES = {
+    "PM10": ["mean", "max"],
+    "Temp": ["mean", "min", "max"],
+    "Humidity": ["mean"],
+}
+
+# 시간 격자 시점에서 이보다 오래된 관측값은 쓰지 않음 (as-of 허용 오차)
+DEFAULT_TOLERANCE = pd.Timedelta("3h")
+
+_SERIES_SCHEMA = pa.schema([("ts", pa.timestamp("s")), ("value", pa.float64())])
+
+# CSV 를 한 번에 읽는 바이트 수 (스트리밍 → 메모리 사용량 상한)
+DEFAULT_BLOCK_SIZE = 16 << 20
+
+
+def asof_align(grid: np.ndarray, ts: np.ndarray, values: np.ndarray,
+               tolerance: pd.Timedelta = DEFAULT_TOLERANCE) -> np.ndarray:
+    """
+    정렬된 관측 (ts, values) 를 정렬된 격자 시점에 as-of 정렬
+    - 각 격자 시점 이하의 가장 최근 관측값, 차이가 tolerance 를 넘으면 NaN
+    - 같은 시각 관측이 여러 개면 마지막 값 (searchsorted right)
+    """
+    out = np.full(len(grid), np.nan)
+    if len(ts) == 0:
+        return out
+    idx = np.searchsorted(ts, grid, side="right") - 1
+    ok = idx >= 0
+    idx = np.clip(idx, 0, None)
+    ok &= (grid - ts[idx]) <= np.timedelta64(tolerance.value, "ns")
+    out[ok] = values[idx[ok]]
+    return out
+
+
+def _is_daily(ts: np.ndarray) -> bool:
+    return len(ts) > 0 and bool(np.all(ts.astype("datetime64[D]") == ts))
+
+
+class EnvStore:
+    """
+    지역별 환경 관측값 저장소
+    - ingest_*: 원시 관측 (시각, 지역, 값) 을 청크 단위로 읽어 변수/지역 파티션 parquet 로 추가 (전체를 메모리에 올리지 않음)
+    - daily_features: 지역 하나씩 읽어 변수들을 같은 시간 격자에 as-of 정렬 → 일별 평균/최소/최대
+      (메모리 사용량 = 한 지역 시계열 크기, 지역 수와 무관)
+    """
+    def __init__(self, root: str = ENV_STORE_DIR):
+        self.root = root
+
+    def _variable_dir(self, variable: str) -> str:
+        return os.path.join(self.root, variable)
+
+    def clear(self, variable: Optional[str] = None):
+        path = self._variable_dir(variable) if variable else self.root
+        if os.path.exists(path):
+            shutil.rmtree(path)
+
+    def variables(self) -> List[str]:
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(d for d in os.listdir(self.root) if os.path.isdir(os.path.join(self.root, d)))
+
+    def _region_dir(self, variable: str, region: str) -> str:
+        return os.path.join(self._variable_dir(variable), f"region={quote(region, safe='')}")
+
+    def ingest_table(self, table: pa.Table, variable: str, writers: Optional["_RegionWriters"] = None) -> int:
+        """(ts, region, value) 테이블 청크 하나를 지역 파티션으로 추가, 파싱 실패/결측 행은 버림"""
+        ts = pa.array(parse_timestamps(table.column("ts")), type=pa.timestamp("s"))
+        value = pc.cast(table.column("value"), pa.float64(), safe=False)
+        region = pc.utf8_trim_whitespace(pc.cast(table.column("region"), pa.string()))
+        chunk = pa.table({"ts": ts, "region": region, "value": value})
+        chunk = chunk.filter(pc.and_(pc.is_valid(chunk["ts"]), pc.is_valid(chunk["value"])))
+        if chunk.num_rows == 0:
+            return 0
+        if writers is not None:
+            writers.write(chunk)
+        else:
+            with _RegionWriters(self, variable) as w:
+                w.write(chunk)
+        return chunk.num_rows
+
+    def ingest_frame(self, df: pd.DataFrame, variable: str) -> int:
+        return self.ingest_table(pa.Table.from_pandas(df[["ts", "region", "value"]], preserve_index=False), variable)
+
+    def ingest_csv(self, path: str, variable: str, usecols: Sequence[int] = (0, 1, 2), header: bool = False,
+                   block_size: int = DEFAULT_BLOCK_SIZE, encoding: Optional[str] = None) -> int:
+        """
+        원시 CSV (시각, 지역, 값 컬럼 위치 = usecols) 를 block_size 바이트씩 스트리밍해서 추가
+        - 인코딩은 한 번만 판별 (utf-8 / cp949)
+        - 파일 하나 = 지역별 parquet 파일 하나 (청크마다 row group 추가)
+        """
+        n_cols = max(usecols) + 1
+        names = [f"c{i}" for i in range(n_cols)]
+        ts_col, region_col, value_col = (names[i] for i in usecols)
+        reader = pacsv.open_csv(
+            path,
+            read_options=pacsv.ReadOptions(
+                column_names=names, skip_rows=1 if header else 0,
+                encoding=encoding or sniff_encoding(path), block_size=block_size,
+            ),
+            parse_options=pacsv.ParseOptions(invalid_row_handler=lambda row: "skip"),
+            convert_options=pacsv.ConvertOptions(
+                column_types={ts_col: pa.string(), region_col: pa.string(), value_col: pa.float64()},
+                include_columns=[ts_col, region_col, value_col],
+            ),
+        )
+        total = 0
+        with _RegionWriters(self, variable) as writers:
+            for batch in reader:
+                table = pa.Table.from_batches([batch]).rename_columns(["ts", "region", "value"])
+                total += self.ingest_table(table, variable, writers)
+        return total
+
+    def regions(self, variables: Optional[Sequence[str]] = None) -> List[str]:
+        """저장된 지역 (파티션 폴더 이름만 보고 판단, 데이터는 읽지 않음)"""
+        found = set()
+        for v in variables or self.variables():
+            vdir = self._variable_dir(v)
+            if os.path.isdir(vdir):
+                found.update(unquote(d[len("region="):]) for d in os.listdir(vdir) if d.startswith("region="))
+        return sorted(found)
+
+    def read_series(self, variable: str, region: str) -> Tuple[np.ndarray, np.ndarray]:
+        """지역 하나의 관측 시계열 (ts datetime64[s] 오름차순, value float64)"""
+        path = self._region_dir(variable, region)
+        if not os.path.isdir(path):
+            return np.array([], dtype="datetime64[s]"), np.array([], dtype=np.float64)
+        table = ds.dataset(path, format="parquet").to_table(columns=["ts", "value"])
+        ts = table.column("ts").to_numpy().astype("datetime64[s]")
+        values = table.column("value").to_numpy()
+        order = np.argsort(ts, kind="stable")
+        return ts[order], values[order]
+
+    def align_region(self, region: str, variables: Sequence[str] = VARIABLES,
+                     tolerance: pd.Timedelta = DEFAULT_TOLERANCE, freq: Optional[str] = None) -> pd.DataFrame:
+        """
+        지역 하나의 변수들을 공통 시간 격자에 as-of 정렬
+        - 격자: 모든 변수 관측 구간 전체를 freq 간격으로 (None 이면 관측이 모두 자정이면 'D', 아니면 'h')
+        - return: ts + 변수별 컬럼 (tolerance 안에 관측이 없으면 NaN)
+        """
+        series = {v: self.read_series(v, region) for v in variables}
+        all_ts = [ts for ts, _ in series.values() if len(ts)]
+        if not all_ts:
+            return pd.DataFrame(columns=["ts", *variables])
+        start = min(ts[0] for ts in all_ts)
+        end = max(ts[-1] for ts in all_ts)
+        if freq is None:
+            freq = "D" if all(_is_daily(ts) for ts in all_ts) else "h"
+        step = np.timedelta64(pd.Timedelta(freq if freq[0].isdigit() else "1" + freq).value, "ns").astype("timedelta64[s]")
+        start = start.astype(f"datetime64[{'D' if step % np.timedelta64(1, 'D') == 0 else 'h'}]").astype("datetime64[s]")
+        grid = np.arange(start, end + step, step)
+        out = {"ts": grid}
+        for v, (ts, values) in series.items():
+            out[v] = asof_align(grid, ts, values, tolerance)
+        return pd.DataFrame(out)
+
+    def daily_region(self, region: str, variables: Sequence[str] = VARIABLES,
+                     tolerance: pd.Timedelta = DEFAULT_TOLERANCE, freq: Optional[str] = None,
+                     aggregates: Optional[Dict[str, List[str]]] = None) -> pd.DataFrame:
+        """지역 하나의 일별 피처 (모든 변수의 평균이 있는 날만)"""
+        aggregates = aggregates or DAILY_AGGREGATES
+        aligned = self.align_region(region, variables, tolerance, freq)
+        if aligned.empty:
+            return pd.DataFrame()
+        aligned["date"] = aligned["ts"].dt.floor("D")
+        grouped = aligned.groupby("date", sort=True)
+        daily = pd.DataFrame(index=grouped.size().index)
+        for v in variables:
+            for agg in aggregates.get(v, ["mean"]):
+                name = v if agg == "mean" else f"{v}_{agg}"
+                daily[name] = grouped[v].agg(agg)
+        daily["n_obs"] = grouped[list(variables)].count().min(axis=1)
+        daily = daily.dropna(subset=list(variables)).reset_index()
+        daily.insert(1, "region", region)
+        return daily
+
+    def iter_daily(self, regions: Optional[Sequence[str]] = None, **kwargs) -> Iterator[pd.DataFrame]:
+        """지역별 일별 피처를 하나씩 생성 (큰 저장소에서 한 지역 분량만 메모리에)"""
+        for region in regions or self.regions():
+            daily = self.daily_region(region, **kwargs)
+            if not daily.empty:
+                yield daily
+
+    def daily_features(self, regions: Optional[Sequence[str]] = None, **kwargs) -> pd.DataFrame:
+        """전체 지역 일별 피처 (date, region, PM10, Temp, Humidity, 집계 컬럼..., n_obs), 날짜/지역 순"""
+        parts = list(self.iter_daily(regions, **kwargs))
+        if not parts:
+            return pd.DataFrame(columns=["date", "region", *VARIABLES])
+        return pd.concat(parts, ignore_index=True).sort_values(["date", "region"], kind="stable").reset_index(drop=True)
+
+
+class _RegionWriters:
+    """
+    ingest 한 번 동안 지역별 ParquetWriter 를 열어 두고 청크를 지역별로 나눠 row group 으로 추가
+    - 지역 수만큼 파일을 동시에 열어 둠 (시군구 단위 수백 개 수준 가정)
+    """
+    def __init__(self, store: EnvStore, variable: str):
+        self.store = store
+        self.variable = variable
+        self.token = uuid.uuid4().hex
+        self.writers: Dict[str, pq.ParquetWriter] = {}
+
+    def write(self, chunk: pa.Table):
+        encoded = pc.dictionary_encode(chunk["region"]).combine_chunks()
+        codes = encoded.indices.to_numpy(zero_copy_only=False)
+        order = np.argsort(codes, kind="stable")
+        bounds = np.flatnonzero(np.diff(codes[order])) + 1
+        data = chunk.select(["ts", "value"])
+        for idx in np.split(order, bounds):
+            region = encoded.dictionary[int(codes[idx[0]])].as_py()
+            writer = self.writers.get(region)
+            if writer is None:
+                path = self.store._region_dir(self.variable, region)
+                os.makedirs(path, exist_ok=True)
+                writer = self.writers[region] = pq.ParquetWriter(
+                    os.path.join(path, f"part-{self.token}.parquet"), _SERIES_SCHEMA, compression="zstd"
+                )
+            writer.write_table(data.take(idx))
+
+    def __enter__(self) -> "_RegionWriters":
+        return self
+
+    def __exit__(self, *exc):
+        for writer in self.writers.values():
+            writer.close()
+        self.writers.clear()
+
+
+def ingest_raw_dir(raw_dir: str, store: EnvStore, files: Optional[Dict[str, str]] = None,
+                   block_size: int = DEFAULT_BLOCK_SIZE) -> Dict[str, int]:
+    """data/raw 의 변수별 CSV (pm.csv / temp.csv / humidity.csv) 를 저장소로 (기존 변수 데이터는 교체)"""
+    counts = {}
+    for variable, name in (files or RAW_FILES).items():
+        path = os.path.join(raw_dir, name)
+        if not os.path.exists(path):
+            continue
+        store.clear(variable)
+        counts[variable] = store.ingest_csv(path, variable, block_size=block_size)
+    return counts
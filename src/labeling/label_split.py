@@ -1,7 +1,13 @@
+import argparse
+import os
+import sys
 import pandas as pd
 from pathlib import Path
 from sklearn.model_selection import train_test_split
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from labeling.data_store import read_dataset, write_dataset
+
 OUT = Path("data/processed")
 OUT.mkdir(parents=True, exist_ok=True)
 
@@ -15,9 +21,9 @@ def relabel(df: pd.DataFrame) -> pd.DataFrame:
     ).astype(int)
     return df
 
-def main():
+def main(csv: bool = False):
     # synth_merge 결과 불러오기
-    df = pd.read_csv(OUT / "life_synth_merged.csv")
+    df = read_dataset(str(OUT / "life_synth_merged"))
 
     # 라벨링
     df = relabel(df)
@@ -27,13 +33,14 @@ def main():
     val, test = train_test_split(temp, test_size=0.5, random_state=42, stratify=temp["ConditionLabel"])
 
     # 저장
-    train.to_csv(OUT / "train.csv", index=False)
-    val.to_csv(OUT / "val.csv", index=False)
-    test.to_csv(OUT / "test.csv", index=False)
+    for name, part in (("train", train), ("val", val), ("test", test)):
+        write_dataset(part, name, data_dir=str(OUT), csv=csv)
 
     print(f"[INFO] saved train/val/test")
     print(f"train={train.shape}, val={val.shape}, test={test.shape}")
     print(f"label distribution:\n{df['ConditionLabel'].value_counts(normalize=True)}")
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="라벨링 + train/val/test 분리")
+    parser.add_argument("--csv", action="store_true", help="parquet 와 함께 CSV 도 저장")
+    main(csv=parser.parse_args().csv)
@@ -1,35 +1,35 @@
+import argparse
+import os
+import sys
 import pandas as pd
 from pathlib import Path
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from labeling.data_store import write_dataset
+from labeling.csv_ingest import read_csv_cached
+from labeling.env_store import EnvStore, ENV_STORE_DIR, ingest_raw_dir
+
 #폴더 위치 지정
 RAW = Path("data/raw")
 OUT = Path("data/processed")
 
-#utf-8 -> cp949
-def read_csv_safely(path, names, usecols):
-    try:
-        return pd.read_csv(path, header=None, names=names, usecols=usecols, encoding="utf-8")
-    except UnicodeDecodeError:
-        return pd.read_csv(path, header=None, names=names, usecols=usecols, encoding="cp949")
-
-#숫자형이면 문자열로, 문자열이면 공백 제거
-def normalize_date_col(df, col="date"):
-    if pd.api.types.is_numeric_dtype(df[col]):
-        df[col] = pd.to_datetime(df[col].astype(str), format="%Y%m%d", errors="coerce")
-    else:
-        df[col] = pd.to_datetime(df[col].astype(str).str.strip(), errors="coerce")
-    df.dropna(subset=[col], inplace=True)
-    return df
+# 원시 파일 컬럼 (헤더 없음, 0,1,2열) 과 dtype
+# - PM10 은 지정하지 않음: 정수 관측이면 int64 그대로 (기존 env_merged 와 같은 dtype), 소수가 섞이면 float64
+RAW_COLUMNS = [0, 1, 2]
+RAW_DTYPES = {"region": "string", "Temp": "float64", "Humidity": "float64"}
 
-#csv 파일의 0,1,2행만 읽고 date행을 날짜 타입으로 저장
-def merge_env_data_simple():
-    pm = read_csv_safely(RAW / "pm.csv", ["date", "region", "PM10"], [0, 1, 2])
-    tp = read_csv_safely(RAW / "temp.csv", ["date", "region", "Temp"], [0, 1, 2])
-    hm = read_csv_safely(RAW / "humidity.csv", ["date", "region", "Humidity"], [0, 1, 2])
+#인코딩은 앞부분으로 한 번만 판별(utf-8 -> cp949), 파싱 결과는 data/processed/csv_cache 에 캐시
+#date 는 읽으면서 datetime 으로 변환하고 변환 실패한 행은 제거
+def read_raw_csv(path, value_col):
+    return read_csv_cached(path, names=["date", "region", value_col], usecols=RAW_COLUMNS, header=False,
+                           dtypes={c: t for c, t in RAW_DTYPES.items() if c in ("region", value_col)},
+                           date_cols=["date"])
 
-    pm = normalize_date_col(pm, "date")
-    tp = normalize_date_col(tp, "date")
-    hm = normalize_date_col(hm, "date")
+#csv 파일의 0,1,2행만 읽고 date행을 날짜 타입으로 저장
+def merge_env_data_simple(csv: bool = False):
+    pm = read_raw_csv(RAW / "pm.csv", "PM10")
+    tp = read_raw_csv(RAW / "temp.csv", "Temp")
+    hm = read_raw_csv(RAW / "humidity.csv", "Humidity")
 
     #안에 값이 잇으면 merge
     df = (
@@ -39,13 +39,58 @@ def merge_env_data_simple():
           .reset_index(drop=True)
     )
 
-    # 엑셀이 텍스트로 인식하도록 날짜 앞에 ' 붙여 저장
-    df_out = df.copy()
-    df_out["date"] = "'" + df_out["date"].dt.strftime("%Y-%m-%d")
-    df_out.to_csv(OUT / "env_merged.csv", index=False, encoding="utf-8-sig")
+    save_env_merged(df, csv)
+    return df
+
+# 지역별 일별 피처 데이터셋 (env_merged 와 따로 저장: 하루에 지역 수만큼 행)
+REGIONS_DATASET = "env_daily_regions"
+# env_merged 컬럼 (synth_merge / build_datasets 는 하루 한 행의 이 컬럼만 가정)
+ENV_MERGED_COLUMNS = ["date", "region", "PM10", "Temp", "Humidity"]
 
-    print(f"[INFO] Saved: {OUT/'env_merged.csv'}")
+def merge_env_regions(csv: bool = False, tolerance: str = "3h", store_dir: str = None, region: str = None):
+    """
+    지역/시간별 원시 관측을 EnvStore 에 적재한 뒤 지역마다 as-of 정렬 → 일별 피처
+    - 지역을 버리지 않음: (date, region) 행 + PM10/Temp/Humidity 일평균, 최소/최대, 관측 수 → env_daily_regions
+    - region 을 주면 그 지역만 하루 한 행(date, region, PM10, Temp, Humidity)으로 env_merged 도 저장
+      (env_merged 는 synth_merge/build_datasets 가 하루 한 행으로 읽으므로 여러 지역을 섞어 쓰지 않음)
+    - 일별 원시 파일(현재 data/raw)이면 기존 merge_env_data_simple 과 같은 PM10/Temp/Humidity 값
+    """
+    store = EnvStore(store_dir or ENV_STORE_DIR)
+    counts = ingest_raw_dir(str(RAW), store)
+    print(f"[INFO] 원시 관측 적재: {counts} → {store.root} ({len(store.regions())}개 지역)")
+    df = store.daily_features(tolerance=pd.Timedelta(tolerance))
+    save_env_merged(df, csv, name=REGIONS_DATASET)
+    if region is not None:
+        one = df.loc[df["region"] == region, ENV_MERGED_COLUMNS].reset_index(drop=True)
+        if one.empty:
+            raise ValueError(f"지역 {region!r} 의 일별 데이터가 없음 (가능: {store.regions()})")
+        save_env_merged(one, csv)
     return df
 
+def save_env_merged(df, csv: bool = False, name: str = "env_merged"):
+    # 날짜는 datetime, region 은 category 로 저장
+    print(f"[INFO] Saved: {write_dataset(df, name, data_dir=str(OUT))}")
+
+    if csv:
+        # 엑셀이 텍스트로 인식하도록 날짜 앞에 ' 붙여 저장
+        df_out = df.copy()
+        df_out["date"] = "'" + df_out["date"].dt.strftime("%Y-%m-%d")
+        df_out.to_csv(OUT / f"{name}.csv", index=False, encoding="utf-8-sig")
+        print(f"[INFO] Saved: {OUT / f'{name}.csv'}")
+
 if __name__ == "__main__":
-    merge_env_data_simple()
+    parser = argparse.ArgumentParser(description="환경 데이터(PM10/기온/습도) 병합")
+    parser.add_argument("--csv", action="store_true", help="parquet 와 함께 엑셀용 CSV 도 저장")
+    parser.add_argument("--regions", action="store_true",
+                        help="EnvStore 로 지역별 as-of 정렬 + 일별 집계 → env_daily_regions (시간별 관측, 여러 지역 지원)")
+    parser.add_argument("--tolerance", default="3h", help="--regions: as-of 정렬 허용 오차 (예: 3h, 1D)")
+    parser.add_argument("--store-dir", default=None, help="--regions: 원시 관측 저장 위치 (기본 data/processed/env_store)")
+    parser.add_argument("--region", default=None,
+                        help="--regions: 이 지역의 일별 값으로 env_merged 도 갱신 (없으면 env_daily_regions 만 저장)")
+    args = parser.parse_args()
+    if args.region and not args.regions:
+        parser.error("--region 은 --regions 와 함께 사용")
+    if args.regions:
+        merge_env_regions(csv=args.csv, tolerance=args.tolerance, store_dir=args.store_dir, region=args.region)
+    else:
+        merge_env_data_simple(csv=args.csv)
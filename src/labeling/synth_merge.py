@@ -1,7 +1,22 @@
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 import numpy as np
 import pandas as pd
+import pyarrow.parquet as pq
 import yaml
 from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from labeling.data_store import read_dataset, to_table
+
+try:
+    from numba import njit
+except ImportError:  # numba 가 없으면 같은 커널을 순수 파이썬으로 실행
+    njit = None
 
 OUT = Path("data/processed")
 OUT.mkdir(parents=True, exist_ok=True)
@@ -22,9 +37,13 @@ def load_cfg(path="config/life_profile.yaml"):
     with open(path, "r", encoding="utf-8") as f:
         return yaml.safe_load(f)
 
-def synth_one_profile(n: int, seed: int, env_df: pd.DataFrame, params: dict, profile_name: str) -> pd.DataFrame:
-    rng = np.random.default_rng(seed)
-
+def resolve_profile(n: int, env_df: pd.DataFrame, params: dict, offset: int = 0, pm_stats=None) -> SimpleNamespace:
+    """
+    프로파일 params(defaults+overrides)에서 생성기 상수를 꺼내고,
+    env_merged 를 길이 n 으로 반복/자르기 한 환경 배열과 env_stress 까지 계산
+    - offset: 프로파일 전체에서 이 구간이 시작하는 행 (청크 생성 시 환경 순환 위치 유지)
+    - pm_stats: (mean, std) 청크 생성 시 프로파일 전체 기준 PM10 통계, None 이면 이 구간에서 계산
+    """
     # directions: phone-, caffeine-, activity+, env-
     dir_phone, dir_caf, dir_act, dir_env = -1, -1, +1, -1
 
@@ -84,11 +103,13 @@ def synth_one_profile(n: int, seed: int, env_df: pd.DataFrame, params: dict, pro
     debt_reduce_rng   = rules.get("caffeine_reduce_range_cups", [0, 1])
 
     # --- env_merged.csv 사용: 길이 n에 맞게 반복/자르기 ---
-    pm_arr   = np.resize(env_df["PM10"].to_numpy(), n)
-    temp_arr = np.resize(env_df["Temp"].to_numpy(), n)
-    hum_arr  = np.resize(env_df["Humidity"].to_numpy(), n)
+    idx = np.arange(offset, offset + int(n)) % len(env_df)
+    pm_arr   = env_df["PM10"].to_numpy()[idx]
+    temp_arr = env_df["Temp"].to_numpy()[idx]
+    hum_arr  = env_df["Humidity"].to_numpy()[idx]
 
-    pm_std  = (pm_arr - np.nanmean(pm_arr)) / (np.nanstd(pm_arr) + 1e-9)
+    pm_mean, pm_sd = pm_stats if pm_stats is not None else (np.nanmean(pm_arr), np.nanstd(pm_arr))
+    pm_std  = (pm_arr - pm_mean) / (pm_sd + 1e-9)
     temp_dev = np.abs(temp_arr - t0) / 8.0
     hum_dev  = np.abs(hum_arr - h0) / 20.0
 
@@ -96,6 +117,18 @@ def synth_one_profile(n: int, seed: int, env_df: pd.DataFrame, params: dict, pro
     if dir_env > 0:
         env_stress = -env_stress
 
+    consts = dict(locals())
+    for k in ("n", "env_df", "params", "offset", "pm_stats", "idx", "ew", "bases", "noise", "bounds", "rules"):
+        consts.pop(k)
+    return SimpleNamespace(**consts)
+
+def synth_one_profile_loop(n: int, seed: int, env_df: pd.DataFrame, params: dict, profile_name: str) -> pd.DataFrame:
+    """
+    하루 단위 파이썬 루프로 생성하는 기준 구현 (synth_one_profile 결과 검증용)
+    """
+    rng = np.random.default_rng(seed)
+    c = resolve_profile(n, env_df, params)
+
     # buffers
     n = int(n)
     sleep = np.zeros(n)
@@ -105,43 +138,43 @@ def synth_one_profile(n: int, seed: int, env_df: pd.DataFrame, params: dict, pro
     mood  = np.zeros(n)
     debt  = np.zeros(n)
 
-    sleep[0] = clamp(rng.normal(sleep_base, sleep_noise), sleep_min, sleep_max)
-    caf[0]   = int(clamp(rng.integers(caf_min, caf_max + 1), caf_abs_min, caf_abs_max))
-    phone[0] = clamp(rng.normal(phone_base, phone_noise), phone_min, phone_max)
-    act[0]   = clamp(rng.normal(act_base, act_noise), act_min, act_max)
+    sleep[0] = clamp(rng.normal(c.sleep_base, c.sleep_noise), c.sleep_min, c.sleep_max)
+    caf[0]   = int(clamp(rng.integers(c.caf_min, c.caf_max + 1), c.caf_abs_min, c.caf_abs_max))
+    phone[0] = clamp(rng.normal(c.phone_base, c.phone_noise), c.phone_min, c.phone_max)
+    act[0]   = clamp(rng.normal(c.act_base, c.act_noise), c.act_min, c.act_max)
     debt[0]  = max(0.0, 7 - sleep[0])
 
     for t in range(n):
         if t > 0:
-            reduce = rng.integers(debt_reduce_rng[0], debt_reduce_rng[1] + 1) if debt[t-1] > debt_gate_h else 0
-            caf[t] = int(clamp(rng.integers(caf_min, caf_max + 1) - reduce, caf_abs_min, caf_abs_max))
-            phone[t] = clamp(rng.normal(phone_base + phone_stress_gain * env_stress[t], phone_noise), phone_min, phone_max)
-            act[t]   = clamp(rng.normal(act_base - act_stress_drop * env_stress[t], act_noise), act_min, act_max)
+            reduce = rng.integers(c.debt_reduce_rng[0], c.debt_reduce_rng[1] + 1) if debt[t-1] > c.debt_gate_h else 0
+            caf[t] = int(clamp(rng.integers(c.caf_min, c.caf_max + 1) - reduce, c.caf_abs_min, c.caf_abs_max))
+            phone[t] = clamp(rng.normal(c.phone_base + c.phone_stress_gain * c.env_stress[t], c.phone_noise), c.phone_min, c.phone_max)
+            act[t]   = clamp(rng.normal(c.act_base - c.act_stress_drop * c.env_stress[t], c.act_noise), c.act_min, c.act_max)
 
-            over_pen = max(0.0, act[t] - over_act_th)
+            over_pen = max(0.0, act[t] - c.over_act_th)
             sleep_mean = (
                 7.0
-                + k_phone * (-dir_phone) * phone[t]
-                + k_caf   * (-dir_caf)   * caf[t]
-                + k_act_p * (+dir_act)   * act[t]
-                - k_act_n * (+dir_act)   * over_pen
-                + k_env   * (-dir_env)   * env_stress[t]
-                + k_debt * debt[t-1]
+                + c.k_phone * (-c.dir_phone) * phone[t]
+                + c.k_caf   * (-c.dir_caf)   * caf[t]
+                + c.k_act_p * (+c.dir_act)   * act[t]
+                - c.k_act_n * (+c.dir_act)   * over_pen
+                + c.k_env   * (-c.dir_env)   * c.env_stress[t]
+                + c.k_debt * debt[t-1]
             )
-            sleep[t] = clamp(rng.normal(sleep_mean, sleep_noise), sleep_min, sleep_max)
+            sleep[t] = clamp(rng.normal(sleep_mean, c.sleep_noise), c.sleep_min, c.sleep_max)
 
             recent = np.mean(sleep[max(0, t-2):t+1])
             debt[t] = max(0.0, 7 - recent)
 
         mood_mean = (
             60
-            + mood_sleep_gain * (sleep[t] - 7)
-            + mood_act_gain   * act[t]
-            + mood_caf_pen    * caf[t]
-            + mood_env_pen    * env_stress[t]
-            + mood_phone_pen  * phone[t]
+            + c.mood_sleep_gain * (sleep[t] - 7)
+            + c.mood_act_gain   * act[t]
+            + c.mood_caf_pen    * caf[t]
+            + c.mood_env_pen    * c.env_stress[t]
+            + c.mood_phone_pen  * phone[t]
         )
-        mood[t] = clamp(rng.normal(mood_mean, mood_noise), 0, 100)
+        mood[t] = clamp(rng.normal(mood_mean, c.mood_noise), 0, 100)
 
     return pd.DataFrame({
         "SleepTime": sleep,
@@ -149,45 +182,240 @@ def synth_one_profile(n: int, seed: int, env_df: pd.DataFrame, params: dict, pro
         "ActivityTime": act,
         "Caffeine": caf,
         "PhoneTime": phone,
-        "PM10": pm_arr,
-        "Temp": temp_arr,
-        "Humidity": hum_arr,
+        "PM10": c.pm_arr,
+        "Temp": c.temp_arr,
+        "Humidity": c.hum_arr,
         "profile_type": profile_name
     })
 
-def main():
-    cfg = load_cfg("config/life_profile.yaml")
-    defaults = cfg.get("defaults", {})
-    profiles = cfg.get("profiles", [])
-    seed = cfg.get("seed", 42)
+def _daily_kernel(rng, n, phone_mean, act_mean, env_stress,
+                  sleep_base, sleep_noise, sleep_min, sleep_max,
+                  phone_base, phone_noise, phone_min, phone_max,
+                  act_base, act_noise, act_min, act_max,
+                  caf_min, caf_max, caf_abs_min, caf_abs_max,
+                  debt_gate_h, reduce_lo, reduce_hi, over_act_th,
+                  c_phone, c_caf, c_act_p, c_act_n, c_env, k_debt):
+    """
+    수면부채 점화식(전날 debt → 오늘 카페인/수면)만 순차로 계산하는 커널
+    - 난수는 synth_one_profile_loop 과 완전히 같은 순서/개수로 뽑음 (debt 조건부 추첨 포함)
+    - rng.normal(m, s) == m + s * standard_normal() 이므로 기분 노이즈는 z 로만 받아 두고 밖에서 벡터화
+    """
+    sleep = np.zeros(n)
+    caf = np.zeros(n, dtype=np.int64)
+    phone = np.zeros(n)
+    act = np.zeros(n)
+    z_mood = np.zeros(n)
+
+    sleep[0] = min(max(sleep_base + sleep_noise * rng.standard_normal(), sleep_min), sleep_max)
+    caf[0] = min(max(rng.integers(caf_min, caf_max + 1), caf_abs_min), caf_abs_max)
+    phone[0] = min(max(phone_base + phone_noise * rng.standard_normal(), phone_min), phone_max)
+    act[0] = min(max(act_base + act_noise * rng.standard_normal(), act_min), act_max)
+    debt_prev = max(0.0, 7 - sleep[0])
+    z_mood[0] = rng.standard_normal()
+
+    for t in range(1, n):
+        reduce = rng.integers(reduce_lo, reduce_hi + 1) if debt_prev > debt_gate_h else 0
+        caf[t] = min(max(rng.integers(caf_min, caf_max + 1) - reduce, caf_abs_min), caf_abs_max)
+        phone[t] = min(max(phone_mean[t] + phone_noise * rng.standard_normal(), phone_min), phone_max)
+        act[t] = min(max(act_mean[t] + act_noise * rng.standard_normal(), act_min), act_max)
+
+        over_pen = max(0.0, act[t] - over_act_th)
+        sleep_mean = (
+            7.0
+            + c_phone * phone[t]
+            + c_caf   * caf[t]
+            + c_act_p * act[t]
+            - c_act_n * over_pen
+            + c_env   * env_stress[t]
+            + k_debt * debt_prev
+        )
+        sleep[t] = min(max(sleep_mean + sleep_noise * rng.standard_normal(), sleep_min), sleep_max)
+
+        lo = t - 2 if t >= 2 else 0
+        total = 0.0
+        for i in range(lo, t + 1):
+            total += sleep[i]
+        debt_prev = max(0.0, 7 - total / (t + 1 - lo))
+        z_mood[t] = rng.standard_normal()
 
-    # env_merged.csv 미리 로드(한 번만)
-    env_df = pd.read_csv(OUT / "env_merged.csv")
+    return sleep, caf, phone, act, z_mood
 
+if njit is not None:
+    _daily_kernel = njit(cache=True)(_daily_kernel)
+
+def synth_one_profile(n: int, seed: int, env_df: pd.DataFrame, params: dict, profile_name: str,
+                      offset: int = 0, pm_stats=None) -> pd.DataFrame:
+    """
+    벡터화 생성기: 같은 seed 면 synth_one_profile_loop 과 비트 단위로 같은 결과
+    - 환경 스트레스, phone/activity 평균, 기분 점수는 배열 연산으로 한 번에 계산
+    - 순차 의존이 있는 수면부채 점화식만 _daily_kernel(numba 컴파일)에서 처리
+    - offset/pm_stats 는 청크 단위 병렬 생성용 (resolve_profile 참고)
+    """
     rng = np.random.default_rng(seed)
-    all_dfs = []
+    c = resolve_profile(n, env_df, params, offset=offset, pm_stats=pm_stats)
+    n = int(n)
+
+    phone_mean = c.phone_base + c.phone_stress_gain * c.env_stress
+    act_mean = c.act_base - c.act_stress_drop * c.env_stress
 
+    sleep, caf, phone, act, z_mood = _daily_kernel(
+        rng, n, phone_mean, act_mean, c.env_stress,
+        c.sleep_base, c.sleep_noise, c.sleep_min, c.sleep_max,
+        c.phone_base, c.phone_noise, c.phone_min, c.phone_max,
+        c.act_base, c.act_noise, c.act_min, c.act_max,
+        c.caf_min, c.caf_max, c.caf_abs_min, c.caf_abs_max,
+        c.debt_gate_h, int(c.debt_reduce_rng[0]), int(c.debt_reduce_rng[1]), c.over_act_th,
+        c.k_phone * (-c.dir_phone), c.k_caf * (-c.dir_caf), c.k_act_p * (+c.dir_act),
+        c.k_act_n * (+c.dir_act), c.k_env * (-c.dir_env), c.k_debt
+    )
+
+    mood_mean = (
+        60
+        + c.mood_sleep_gain * (sleep - 7)
+        + c.mood_act_gain   * act
+        + c.mood_caf_pen    * caf
+        + c.mood_env_pen    * c.env_stress
+        + c.mood_phone_pen  * phone
+    )
+    mood = clamp(mood_mean + c.mood_noise * z_mood, 0, 100)
+
+    return pd.DataFrame({
+        "SleepTime": sleep,
+        "MoodScore": mood,
+        "ActivityTime": act,
+        "Caffeine": caf,
+        "PhoneTime": phone,
+        "PM10": c.pm_arr,
+        "Temp": c.temp_arr,
+        "Humidity": c.hum_arr,
+        "profile_type": profile_name
+    })
+
+def chunk_seed(profile_seed: int, chunk_idx: int, n_chunks: int) -> int:
+    """
+    청크별 시드: 청크가 1개면 프로파일 시드 그대로(기존 결과 유지),
+    여러 개면 (프로파일 시드, 청크 번호)에서 SeedSequence 로 파생 → 워커 수와 무관하게 결정적
+    """
+    if n_chunks == 1:
+        return profile_seed
+    return int(np.random.SeedSequence([profile_seed, chunk_idx]).generate_state(1, np.uint64)[0])
+
+def plan_tasks(profiles, defaults: dict, seed: int, env_df: pd.DataFrame, chunk_rows=None) -> list:
+    """
+    프로파일(과 큰 프로파일의 청크)별 생성 작업 목록
+    - 프로파일 시드는 기존처럼 cfg seed 의 rng 에서 프로파일 순서대로 뽑음
+    - 청크 경계에서는 하루 상태(수면부채 등)가 새로 시작됨 (chunk_rows 가 같으면 항상 같은 결과)
+    """
+    rng = np.random.default_rng(seed)
+    tasks = []
     for prof in profiles:
         name = prof["name"]
         rows = int(prof.get("rows", 1000))
         params = deep_merge(defaults, prof.get("overrides", {}))
+        profile_seed = int(rng.integers(0, 1_000_000_000))
 
-        # 인자 이름을 params로 통일
-        df_p = synth_one_profile(
-            n=rows,
-            seed=int(rng.integers(0, 1_000_000_000)),
-            env_df=env_df,
-            params=params,
-            profile_name=name
-        )
-        fp = OUT / f"synth_{name}.csv"
-        df_p.to_csv(fp, index=False, encoding="utf-8")
-        print(f"[INFO] saved {fp} shape={df_p.shape}")
-        all_dfs.append(df_p)
+        step = int(chunk_rows) if chunk_rows else rows
+        n_chunks = max(1, -(-rows // step))
+        pm_stats = None
+        if n_chunks > 1:
+            pm_all = np.resize(env_df["PM10"].to_numpy(), rows)
+            pm_stats = (np.nanmean(pm_all), np.nanstd(pm_all))
+        for i in range(n_chunks):
+            start = i * step
+            tasks.append({
+                "name": name, "chunk": i, "n": min(step, rows - start), "offset": start,
+                "seed": chunk_seed(profile_seed, i, n_chunks), "params": params, "pm_stats": pm_stats,
+            })
+    return tasks
+
+def _synth_chunk(task: dict, env_df: pd.DataFrame, parts_dir: Path, categories: dict, csv: bool) -> Path:
+    """
+    워커: 청크 하나 생성 후 parquet 조각(+ csv=True 면 헤더 없는 CSV 조각)으로 저장하고 경로만 반환
+    (DataFrame 은 프로세스 간 전달 안 함, profile_type 사전은 전체 프로파일 목록으로 고정)
+    """
+    df = synth_one_profile(
+        n=task["n"], seed=task["seed"], env_df=env_df, params=task["params"], profile_name=task["name"],
+        offset=task["offset"], pm_stats=task["pm_stats"]
+    )
+    fp = parts_dir / f"{task['name']}_{task['chunk']:05d}.parquet"
+    pq.write_table(to_table(df, categories=categories), fp)
+    if csv:
+        df.to_csv(fp.with_suffix(".csv"), index=False, header=False, encoding="utf-8")
+    return fp
+
+class _PartWriter:
+    """조각을 이어 붙여 <name>.parquet (+ <name>.csv) 한 파일로 스트리밍 저장"""
+    def __init__(self, name: str, csv: bool, header: str):
+        self.name = name
+        self.rows = 0
+        self._parquet = None
+        self._csv = open(OUT / f"{name}.csv", "w", encoding="utf-8", newline="") if csv else None
+        if self._csv:
+            self._csv.write(header)
+
+    def append(self, part: Path):
+        table = pq.read_table(part)
+        if self._parquet is None:
+            self._parquet = pq.ParquetWriter(OUT / f"{self.name}.parquet", table.schema, compression="zstd")
+        self._parquet.write_table(table)
+        self.rows += table.num_rows
+        if self._csv:
+            with open(part.with_suffix(".csv"), "r", encoding="utf-8", newline="") as f:
+                for block in iter(lambda: f.read(1 << 20), ""):
+                    self._csv.write(block)
+
+    def close(self):
+        if self._parquet:
+            self._parquet.close()
+        if self._csv:
+            self._csv.close()
+        print(f"[INFO] saved {OUT / self.name}.parquet rows={self.rows}" + (" (+csv)" if self._csv else ""))
+
+def main(workers: int = 1, chunk_rows=None, csv: bool = False):
+    cfg = load_cfg("config/life_profile.yaml")
+    defaults = cfg.get("defaults", {})
+    profiles = cfg.get("profiles", [])
+    seed = cfg.get("seed", 42)
+
+    # env_merged 미리 로드(한 번만, 측정값은 원본 dtype 그대로)
+    env_df = read_dataset(str(OUT / "env_merged"), columns=["PM10", "Temp", "Humidity"])
+
+    tasks = plan_tasks(profiles, defaults, seed, env_df, chunk_rows=chunk_rows)
+    header = ",".join(["SleepTime", "MoodScore", "ActivityTime", "Caffeine", "PhoneTime",
+                       "PM10", "Temp", "Humidity", "profile_type"]) + "\n"
+    categories = {"profile_type": [p["name"] for p in profiles]}
+
+    parts_dir = OUT / "_synth_parts"
+    parts_dir.mkdir(parents=True, exist_ok=True)
+    run = partial(_synth_chunk, env_df=env_df, parts_dir=parts_dir, categories=categories, csv=csv)
 
-    all_df = pd.concat(all_dfs, ignore_index=True)
-    all_df.to_csv(OUT / "life_synth_merged.csv", index=False, encoding="utf-8")
-    print(f"[INFO] saved life_synth_merged.csv shape={all_df.shape}")
+    # 조각은 완료 순서와 관계없이 작업 순서대로 받아 프로파일별 파일과 전체 병합 파일에 이어 씀
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    results = executor.map(run, tasks) if executor else map(run, tasks)
+    merged = _PartWriter("life_synth_merged", csv, header)
+    out = None
+    for task, part in zip(tasks, results):
+        if out is None or out.name != f"synth_{task['name']}":
+            if out:
+                out.close()
+            out = _PartWriter(f"synth_{task['name']}", csv, header)
+        out.append(part)
+        merged.append(part)
+        part.unlink()
+        if csv:
+            part.with_suffix(".csv").unlink()
+    if out:
+        out.close()
+    merged.close()
+    if executor:
+        executor.shutdown()
+    parts_dir.rmdir()
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="생활 데이터 합성")
+    parser.add_argument("--workers", type=int, default=1, help="프로세스 수 (1 이면 현재 프로세스에서 순차 실행)")
+    parser.add_argument("--chunk-rows", type=int, default=None,
+                        help="프로파일을 이 행 수 단위 청크로 나눠 생성 (기본: 나누지 않음)")
+    parser.add_argument("--csv", action="store_true", help="parquet 와 함께 CSV 도 저장")
+    args = parser.parse_args()
+    main(workers=args.workers, chunk_rows=args.chunk_rows, csv=args.csv)
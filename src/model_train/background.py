@@ -0,0 +1,182 @@
+# src/model_train/background.py
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import os
+import numpy as np
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+BACKGROUND_PATH = os.path.join(PROJECT_ROOT, "data", "models", "shap_background.npz")
+
+# SHAP 배경 데이터 행 수 (head / stratified)
+DEFAULT_BACKGROUND_ROWS = 100
+
+# 배경 데이터 선택 방식
+# - head: train.csv 앞 n 행 (기존 방식)
+# - stratified: profile_type × ConditionLabel 층별 비례 표본 (실제 행)
+# - kmeans: k-means 중심 k 개를 군집 크기 비례로 복제한 DEFAULT_BACKGROUND_ROWS 행
+BACKGROUND_METHODS = ("head", "stratified", "kmeans")
+STRATA_COLS = ("profile_type", "ConditionLabel")
+DEFAULT_SEED = 42
+# 기본 배경: 층별 표본 100행 (reports/background_error_curve.py 기준 mean|Δφ| 0.0033 으로 가장 작음,
+# 가중 복제 kmeans 100행은 k=10~100 에서 0.0035~0.0051 → --method kmeans 로 선택할 때만)
+DEFAULT_BACKGROUND_METHOD = "stratified"
+DEFAULT_KMEANS_K = 50
+
+
+def build_head_background(df_train, encoder, n_rows: int = DEFAULT_BACKGROUND_ROWS) -> np.ndarray:
+    """train DataFrame 앞 n_rows 행을 인코딩한 배경 행렬 (n_rows, n_features) float32"""
+    return encoder.encode_columns(df_train.head(n_rows))
+
+
+def allocate_rows(sizes: Sequence[int], n_rows: int) -> np.ndarray:
+    """
+    층 크기 비례로 n_rows 행 배분 (최대 나머지 방식)
+    - n_rows 가 층 수 이상이면 모든 층에 최소 1행
+    - 층 크기를 넘겨 배분하지 않음
+    """
+    sizes = np.asarray(sizes, dtype=np.int64)
+    n_rows = int(min(n_rows, sizes.sum()))
+    floor = (sizes > 0).astype(np.int64) if n_rows >= np.count_nonzero(sizes) else np.zeros_like(sizes)
+    quota = floor + (n_rows - floor.sum()) * (sizes - floor) / max(int((sizes - floor).sum()), 1)
+    alloc = np.minimum(np.floor(quota).astype(np.int64), sizes)
+    order = np.argsort(-(quota - alloc), kind="stable")
+    for i in order:
+        if alloc.sum() >= n_rows:
+            break
+        if alloc[i] < sizes[i]:
+            alloc[i] += 1
+    return alloc
+
+
+def build_stratified_background(
+    df_train,
+    encoder,
+    n_rows: int = DEFAULT_BACKGROUND_ROWS,
+    strata: Sequence[str] = STRATA_COLS,
+    seed: int = DEFAULT_SEED
+) -> np.ndarray:
+    """
+    profile_type × ConditionLabel 층마다 크기 비례로 실제 행을 뽑아 인코딩한 배경 행렬
+    - 앞부분 행만 쓰는 head 와 달리 프로필/등급 분포가 학습 데이터와 같음
+    - 층 안에서는 seed 고정 무작위 표본 (원래 행 순서 유지)
+    - n_rows 가 층 수(6 × 5 = 30)보다 작으면 큰 층부터 채워져 분포가 치우침
+    """
+    rng = np.random.default_rng(seed)
+    groups = list(df_train.groupby(list(strata), observed=True, sort=True).indices.values())
+    alloc = allocate_rows([len(g) for g in groups], n_rows)
+    picked = [rng.choice(g, size=a, replace=False) for g, a in zip(groups, alloc) if a > 0]
+    rows = np.sort(np.concatenate(picked))
+    return encoder.encode_columns(df_train.iloc[rows])
+
+
+def build_kmeans_background(
+    df_train,
+    encoder,
+    k: int = DEFAULT_KMEANS_K,
+    seed: int = DEFAULT_SEED,
+    n_rows: int = DEFAULT_BACKGROUND_ROWS
+) -> np.ndarray:
+    """
+    학습 데이터를 k-means 중심 k 개로 요약 → 군집 크기 비례로 복제한 배경 행렬 (max(n_rows, k), n_features) float32
+    - 수치 피처는 표준화한 공간에서 군집화 (PM10/습도처럼 값이 큰 피처가 거리를 독차지하지 않게)
+    - 중심의 수치 피처는 군집 평균(원래 단위), one-hot 블록은 군집 최빈 범주로 맞춤
+      (모델이 학습 중 본 적 없는 0.3/0.7 같은 범주 값이 들어가지 않게)
+    - shap masker 는 배경 행을 균등 평균하므로 중심을 군집 크기 비례 행 수(allocate_rows, 중심마다 최소 1행)로
+      복제해 가중치를 반영 (해석 시간은 복제 후 행 수에 비례)
+    """
+    from sklearn.cluster import KMeans
+
+    X = encoder.encode_columns(df_train).astype(np.float64)
+    n_num = len(encoder.numeric_cols)
+    mean = X[:, :n_num].mean(axis=0)
+    std = X[:, :n_num].std(axis=0)
+    Z = X.copy()
+    Z[:, :n_num] = (X[:, :n_num] - mean) / np.where(std > 0, std, 1.0)
+
+    k = int(min(k, len(X)))
+    labels = KMeans(n_clusters=k, n_init=4, random_state=seed).fit_predict(Z)
+    counts = np.bincount(labels, minlength=k)
+    centroids = np.zeros((k, X.shape[1]))
+    np.add.at(centroids, labels, X)
+    centroids /= counts[:, None]
+
+    offset = n_num
+    for cats in encoder.categories.values():
+        block = centroids[:, offset:offset + len(cats)]
+        snapped = np.zeros_like(block)
+        snapped[np.arange(k), block.argmax(axis=1)] = 1.0
+        centroids[:, offset:offset + len(cats)] = snapped
+        offset += len(cats)
+    reps = allocate_rows(counts, max(n_rows, k))
+    return np.repeat(centroids, reps, axis=0).astype(np.float32)
+
+
+def build_background(
+    df_train,
+    encoder,
+    method: str = DEFAULT_BACKGROUND_METHOD,
+    n_rows: Optional[int] = None,
+    seed: int = DEFAULT_SEED
+) -> np.ndarray:
+    """
+    method 별 배경 행렬 (n, n_features) float32
+    - n_rows: head/stratified 는 행 수 (기본 DEFAULT_BACKGROUND_ROWS), kmeans 는 중심 수 k (기본 DEFAULT_KMEANS_K,
+      중심은 DEFAULT_BACKGROUND_ROWS 행으로 가중 복제)
+    """
+    if n_rows is None:
+        n_rows = DEFAULT_KMEANS_K if method == "kmeans" else DEFAULT_BACKGROUND_ROWS
+    if method == "head":
+        return build_head_background(df_train, encoder, n_rows)
+    if method == "stratified":
+        return build_stratified_background(df_train, encoder, n_rows, seed=seed)
+    if method == "kmeans":
+        return build_kmeans_background(df_train, encoder, n_rows, seed=seed)
+    raise ValueError(f"지원하지 않는 배경 선택 방식: {method} (가능: {BACKGROUND_METHODS})")
+
+
+def save_background(path: str, background_X: np.ndarray, feature_names: List[str], method: Optional[str] = None):
+    """
+    배경 행렬 + 피처 이름을 작은 npz 파일로 저장 (UI 시작 시 train.csv 재파싱 방지)
+    - method 는 있을 때만 같이 저장 (예전 파일과 호환)
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    extra: Dict[str, Any] = {}
+    if method is not None:
+        extra["method"] = np.asarray(method)
+    np.savez(path, X=np.asarray(background_X, dtype=np.float32), feature_names=np.asarray(feature_names), **extra)
+
+
+def load_background(path: str = BACKGROUND_PATH) -> Tuple[np.ndarray, List[str]]:
+    with np.load(path, allow_pickle=False) as d:
+        return d["X"], d["feature_names"].tolist()
+
+
+def load_background_info(path: str = BACKGROUND_PATH) -> Dict[str, Any]:
+    """배경 artifact 요약: 선택 방식, 행 수 (예전 파일은 head)"""
+    with np.load(path, allow_pickle=False) as d:
+        return {
+            "method": str(d["method"]) if "method" in d.files else "head",
+            "rows": int(d["X"].shape[0]),
+        }
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+    from model_train.feature_encoder import FeatureEncoder, FEATURE_ENCODER_PATH
+    from labeling.data_store import read_dataset
+
+    parser = argparse.ArgumentParser(description="train.csv → SHAP 배경 데이터 artifact (npz)")
+    parser.add_argument("--method", choices=BACKGROUND_METHODS, default=DEFAULT_BACKGROUND_METHOD)
+    parser.add_argument("--rows", type=int, default=None,
+                        help=f"배경 행 수 (kmeans 는 중심 수 k, 기본 {DEFAULT_KMEANS_K} / 그 외 {DEFAULT_BACKGROUND_ROWS})")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--train", default=os.path.join(PROJECT_ROOT, "data/processed/train"))
+    parser.add_argument("--out", default=BACKGROUND_PATH)
+    args = parser.parse_args()
+
+    encoder = FeatureEncoder.load(FEATURE_ENCODER_PATH)
+    X = build_background(read_dataset(args.train), encoder, args.method, args.rows, args.seed)
+    save_background(args.out, X, encoder.feature_names, method=args.method)
+    print(f"[INFO] 배경 데이터 저장 ({args.method}, {X.shape[0]}행): {args.out}")
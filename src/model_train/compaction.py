@@ -0,0 +1,249 @@
+# src/model_train/compaction.py
+from typing import Any, Dict, List, Optional, Tuple
+import copy
+import os
+import sys
+import time
+import numpy as np
+import joblib
+import lightgbm as lgb
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from model_train.metrics import grade_metrics
+from model_train.hparam_search import measure_latency
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+COMPACT_DIR = os.path.join(PROJECT_ROOT, "data", "models", "compact")
+
+# 기본 비교 대상 (이름, 종류, 인자)
+DEFAULT_VARIANTS = [
+    ("cap_t30_l15", "cap", {"n_estimators": 30, "num_leaves": 15}),
+    ("cap_t20_l7", "cap", {"n_estimators": 20, "num_leaves": 7}),
+    ("prune_g999", "prune", {"keep_gain": 0.999}),
+    ("prune_g99", "prune", {"keep_gain": 0.99}),
+    ("distill_t20_l8", "distill", {"n_estimators": 20, "num_leaves": 8}),
+    ("distill_t10_l4", "distill", {"n_estimators": 10, "num_leaves": 4}),
+]
+
+
+def with_booster(template, booster: lgb.Booster):
+    """학습된 LGBMClassifier 의 booster 만 교체한 복사본 (classes_, 피처 수 등 나머지는 그대로)"""
+    model = copy.deepcopy(template)
+    model._Booster = booster
+    return model
+
+
+# ---------------------------------
+# 1) 트리 수 / 리프 수 제한 재학습
+# ---------------------------------
+
+def cap_model(teacher, X: np.ndarray, y: np.ndarray, n_estimators: int, num_leaves: int, **params):
+    """teacher 와 같은 설정에서 트리 수(라운드)와 리프 수만 줄여 다시 학습"""
+    base = {k: v for k, v in teacher.get_params().items() if v is not None}
+    model = lgb.LGBMClassifier(**{**base, "verbose": -1, **params,
+                                  "n_estimators": n_estimators, "num_leaves": num_leaves})
+    return model.fit(X, y)
+
+
+# ---------------------------------
+# 2) gain 낮은 트리 제거
+# ---------------------------------
+
+def _split_model_string(model_str: str) -> Tuple[str, List[str], str]:
+    """LightGBM 텍스트 모델 → (헤더, 트리 블록들, 'end of trees' 이후)"""
+    head, rest = model_str.split("\nTree=", 1)
+    trees, tail = ("Tree=" + rest).split("end of trees", 1)
+    return head, [b.strip("\n") for b in trees.split("\n\n\n") if b.strip()], tail
+
+
+def _tree_fields(block: str) -> Dict[str, str]:
+    return dict(line.split("=", 1) for line in block.split("\n"))
+
+
+def _constant_tree(tree_id: str, value: float) -> str:
+    """리프 1개짜리 트리 (항상 value 를 더함)"""
+    return "\n".join([
+        f"Tree={tree_id}", "num_leaves=1", "num_cat=0", "split_feature=", "split_gain=", "threshold=",
+        "decision_type=", "left_child=", "right_child=", f"leaf_value={value!r}", "leaf_weight=", "leaf_count=",
+        "internal_value=", "internal_weight=", "internal_count=", "is_linear=0", "shrinkage=1",
+    ])
+
+
+def prune_low_gain_trees(model, keep_gain: float = 0.99) -> Tuple[Any, int]:
+    """
+    split gain 합이 큰 트리부터 전체 gain 의 keep_gain 비율까지만 남기고,
+    나머지 트리는 학습 데이터 기준 평균 출력(leaf_count 가중 평균)을 더하는 상수 트리로 교체
+    - 다중 클래스는 트리 i 가 클래스 i % num_class 담당이라 트리를 빼지 않고 상수로 바꿔 순서 유지
+    - return: (교체된 모델, 남긴 트리 수)
+    """
+    head, blocks, tail = _split_model_string(model.booster_.model_to_string())
+    fields = [_tree_fields(b) for b in blocks]
+    gains = np.array([sum(map(float, f["split_gain"].split())) if f["split_gain"] else 0.0 for f in fields])
+
+    order = np.argsort(-gains, kind="stable")
+    cum = np.cumsum(gains[order]) / max(gains.sum(), 1e-12)
+    n_keep = int(np.searchsorted(cum, keep_gain) + 1)
+    keep = set(order[:n_keep].tolist())
+
+    new_blocks = []
+    for i, (block, f) in enumerate(zip(blocks, fields)):
+        if i in keep or f["num_leaves"] == "1":
+            new_blocks.append(block)
+            continue
+        values = np.array(f["leaf_value"].split(), dtype=np.float64)
+        counts = np.array(f["leaf_count"].split(), dtype=np.float64)
+        new_blocks.append(_constant_tree(f["Tree"], float(values @ counts / counts.sum())))
+
+    # tree_sizes 는 트리 블록 바이트 크기 목록 → 블록이 바뀌었으므로 제거 (로더가 순차 파싱)
+    head = "\n".join(line for line in head.split("\n") if not line.startswith("tree_sizes="))
+    model_str = head + "\n\n" + "\n\n\n".join(new_blocks) + "\n\n\nend of trees" + tail
+    return with_booster(model, lgb.Booster(model_str=model_str)), n_keep
+
+
+# ---------------------------------
+# 3) teacher 확률로 증류
+# ---------------------------------
+
+def _soft_label_objective(targets: np.ndarray):
+    """소프트 라벨 softmax 교차 엔트로피: grad = p - q, hess = p(1 - p)"""
+    def objective(preds: np.ndarray, _data):
+        z = preds - preds.max(axis=1, keepdims=True)
+        p = np.exp(z)
+        p /= p.sum(axis=1, keepdims=True)
+        return p - targets, np.maximum(p * (1.0 - p), 1e-6)
+    return objective
+
+
+def augment_rows(X: np.ndarray, numeric_idx: List[int], n_rows: int, noise: float, seed: int) -> np.ndarray:
+    """학습 행을 복원추출해서 숫자 피처에 (noise × 표준편차) 가우시안 잡음을 더한 행 (원-핫은 그대로)"""
+    rng = np.random.default_rng(seed)
+    out = X[rng.integers(0, len(X), n_rows)].copy()
+    std = X[:, numeric_idx].std(axis=0)
+    out[:, numeric_idx] += rng.standard_normal((n_rows, len(numeric_idx))).astype(X.dtype) * (noise * std)
+    return out
+
+
+def distill(teacher, X: np.ndarray, n_estimators: int = 20, num_leaves: int = 8, learning_rate: float = 0.3,
+            X_extra: Optional[np.ndarray] = None, seed: int = 42, **params):
+    """
+    teacher 의 predict_proba 를 목표로 작은 다중 클래스 booster 학습
+    - X_extra(증강 행)가 있으면 teacher 가 라벨을 붙여 함께 사용
+    - 결과는 objective=multiclass 모델 파일이라 기존 추론/SHAP/ONNX 변환 경로 그대로 사용 가능
+    """
+    X_fit = X if X_extra is None else np.vstack([X, X_extra])
+    targets = teacher.predict_proba(X_fit)
+    n_class = targets.shape[1]
+    booster = lgb.train(
+        {"objective": _soft_label_objective(targets), "num_class": n_class, "num_leaves": num_leaves,
+         "learning_rate": learning_rate, "seed": seed, "verbose": -1, **params},
+        lgb.Dataset(X_fit, label=np.argmax(targets, axis=1)),
+        num_boost_round=n_estimators,
+    )
+    # 사용자 정의 objective 로 학습한 모델은 raw score 를 내므로 softmax 변환 정보를 헤더에 추가
+    model_str = booster.model_to_string().replace(
+        "\nfeature_names=", f"\nobjective=multiclass num_class:{n_class}\nfeature_names=", 1
+    )
+    return with_booster(teacher, lgb.Booster(model_str=model_str))
+
+
+# ---------------------------------
+# 비교
+# ---------------------------------
+
+def evaluate_variant(name: str, model, X_val: np.ndarray, y_val: np.ndarray, teacher_proba: np.ndarray,
+                     out_dir: str) -> Dict[str, Any]:
+    """val 지표 + teacher 와의 차이 + 저장 크기/로드 시간/지연"""
+    path = os.path.join(out_dir, f"{name}.pkl")
+    joblib.dump(model, path)
+    t0 = time.perf_counter()
+    loaded = joblib.load(path)
+    load_seconds = time.perf_counter() - t0
+
+    proba = loaded.predict_proba(X_val)
+    m = grade_metrics(y_val, proba, classes=loaded.classes_.tolist())
+    tree_info = loaded.booster_.dump_model()["tree_info"]
+    n_trees = len(tree_info)
+    n_leaves = sum(t["num_leaves"] for t in tree_info)
+    return {
+        "name": name,
+        "path": path,
+        "accuracy": m["accuracy"],
+        "within_one": m["within_one"],
+        "log_loss": m["log_loss"],
+        "teacher_agreement": float(np.mean(np.argmax(proba, axis=1) == np.argmax(teacher_proba, axis=1))),
+        "mean_abs_diff": float(np.mean(np.abs(proba - teacher_proba))),
+        "max_abs_diff": float(np.max(np.abs(proba - teacher_proba))),
+        "file_bytes": os.path.getsize(path),
+        "load_seconds": load_seconds,
+        "n_trees": n_trees,
+        "n_leaves": n_leaves,
+        **measure_latency(loaded, X_val),
+    }
+
+
+def compact_variants(teacher, X_train: np.ndarray, y_train: np.ndarray, X_val: np.ndarray, y_val: np.ndarray,
+                     numeric_idx: List[int], variants=None, out_dir: str = COMPACT_DIR,
+                     augment_rows_n: int = 20_000, augment_noise: float = 0.1, seed: int = 42) -> List[Dict[str, Any]]:
+    """
+    teacher(원본) + 각 압축 변형을 만들어 out_dir 에 저장하고 비교 결과 목록 반환
+    - variants: [(이름, 'cap' | 'prune' | 'distill', 인자 dict)], 없으면 DEFAULT_VARIANTS
+    """
+    variants = DEFAULT_VARIANTS if variants is None else variants
+    os.makedirs(out_dir, exist_ok=True)
+    teacher_proba = teacher.predict_proba(X_val)
+    X_extra = None
+    if any(kind == "distill" for _, kind, _ in variants) and augment_rows_n > 0:
+        X_extra = augment_rows(X_train, numeric_idx, augment_rows_n, augment_noise, seed)
+
+    results = [evaluate_variant("teacher", teacher, X_val, y_val, teacher_proba, out_dir)]
+    for name, kind, kwargs in variants:
+        t0 = time.perf_counter()
+        if kind == "cap":
+            model = cap_model(teacher, X_train, y_train, **kwargs)
+        elif kind == "prune":
+            model, _ = prune_low_gain_trees(teacher, **kwargs)
+        elif kind == "distill":
+            model = distill(teacher, X_train, X_extra=X_extra, seed=seed, **kwargs)
+        else:
+            raise ValueError(f"알 수 없는 압축 종류: {kind}")
+        build_seconds = time.perf_counter() - t0
+        results.append({**evaluate_variant(name, model, X_val, y_val, teacher_proba, out_dir),
+                        "kind": kind, "build_seconds": build_seconds})
+    return results
+
+
+def print_report(results: List[Dict[str, Any]]):
+    print("  variant            trees  leaves  accuracy      ±1  agree  mean|Δp|   size(KB)  load(ms)  row(µs)  batch(µs/row)")
+    for r in results:
+        print(f"  {r['name']:<17} {r['n_trees']:>6} {r['n_leaves']:>7}  {r['accuracy']:8.4f}  {r['within_one']:6.4f}"
+              f"  {r['teacher_agreement']:5.3f}  {r['mean_abs_diff']:8.4f}  {r['file_bytes'] / 1024:9.1f}"
+              f"  {r['load_seconds'] * 1e3:8.2f}  {r['latency_row_us']:7.1f}  {r['latency_batch_row_us']:13.2f}")
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+    from model_train.feature_encoder import FeatureEncoder, FEATURE_ENCODER_PATH
+    from labeling.data_store import read_dataset
+
+    parser = argparse.ArgumentParser(description="LightGBM 모델 압축 (트리/리프 제한, 저gain 트리 제거, 증류) 비교")
+    parser.add_argument("--model", default=os.path.join(PROJECT_ROOT, "data/models/model_lgbm.pkl"))
+    parser.add_argument("--out-dir", default=COMPACT_DIR)
+    parser.add_argument("--augment-rows", type=int, default=20_000, help="증류용 증강 행 수 (0 이면 학습 행만)")
+    parser.add_argument("--augment-noise", type=float, default=0.1)
+    parser.add_argument("--report", default=None, help="비교 결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    encoder = FeatureEncoder.load(FEATURE_ENCODER_PATH)
+    train_df = read_dataset(os.path.join(PROJECT_ROOT, "data/processed/train"))
+    val_df = read_dataset(os.path.join(PROJECT_ROOT, "data/processed/val"))
+    X_tr, y_tr = encoder.encode_columns(train_df), train_df["ConditionLabel"].to_numpy()
+    X_va, y_va = encoder.encode_columns(val_df), val_df["ConditionLabel"].to_numpy()
+    numeric = [encoder.feature_names.index(c) for c in encoder.numeric_cols]
+
+    results = compact_variants(joblib.load(args.model), X_tr, y_tr, X_va, y_va, numeric, out_dir=args.out_dir,
+                               augment_rows_n=args.augment_rows, augment_noise=args.augment_noise)
+    print_report(results)
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
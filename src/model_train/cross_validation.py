@@ -0,0 +1,95 @@
+# src/model_train/cross_validation.py
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+import os
+import time
+import numpy as np
+import lightgbm as lgb
+from sklearn.model_selection import KFold, StratifiedKFold
+
+from model_train.metrics import GradeMetrics
+
+# 기존 run_pipeline_lgbm / cross_validate_lgbm 와 같은 기본 설정
+DEFAULT_PARAMS = {"random_state": 42}
+
+
+def _fit_fold(params: Dict[str, Any], X: np.ndarray, y: np.ndarray, train_idx: np.ndarray,
+              valid_idx: np.ndarray, classes: List[int], n_jobs: int) -> Dict[str, Any]:
+    """fold 하나 학습 후 검증 구간 확률을 classes 순서로 반환"""
+    model = lgb.LGBMClassifier(**{"verbose": -1, **params, "n_jobs": n_jobs})
+    t0 = time.perf_counter()
+    model.fit(X[train_idx], y[train_idx])
+    t1 = time.perf_counter()
+    raw = model.predict_proba(X[valid_idx])
+    t2 = time.perf_counter()
+
+    # 학습 구간에 없는 등급이 있어도 열 위치가 맞도록 classes 순서로 배치
+    proba = np.zeros((len(valid_idx), len(classes)), dtype=np.float64)
+    col = {c: i for i, c in enumerate(classes)}
+    for j, c in enumerate(model.classes_):
+        proba[:, col[c]] = raw[:, j]
+    return {"proba": proba, "fit_seconds": t1 - t0, "predict_seconds": t2 - t1}
+
+
+def cross_validate_oof(
+    X: np.ndarray,
+    y,
+    params: Optional[Dict[str, Any]] = None,
+    n_splits: int = 5,
+    n_workers: int = 1,
+    seed: int = 42,
+    stratified: bool = False,
+    classes: Optional[List[int]] = None
+) -> Dict[str, Any]:
+    """
+    K-Fold 를 fold 당 한 번만 학습해서 out-of-fold 확률을 모으고, 모든 지표를 거기서 계산
+    - n_workers 개 fold 를 스레드로 동시에 학습 (LightGBM 은 학습 중 GIL 을 놓음),
+      fold 당 LightGBM 스레드 수는 CPU 수 / n_workers
+    - 분할은 seed 로 고정 → n_workers 와 무관하게 같은 fold
+    - return: {"oof_proba", "folds": [fold 별 지표/시간], "overall": 전체 OOF 지표, "wall_seconds"}
+    """
+    X = np.asarray(X)
+    y = np.asarray(y)
+    params = {**DEFAULT_PARAMS, **(params or {})}
+    classes = sorted(np.unique(y).tolist()) if classes is None else list(classes)
+    n_workers = max(1, int(n_workers))
+    n_jobs = max(1, (os.cpu_count() or 1) // n_workers)
+
+    splitter = (StratifiedKFold if stratified else KFold)(n_splits=n_splits, shuffle=True, random_state=seed)
+    splits = list(splitter.split(X, y))
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=n_workers) as executor:
+        results = list(executor.map(
+            lambda s: _fit_fold(params, X, y, s[0], s[1], classes, n_jobs), splits
+        ))
+    wall = time.perf_counter() - t0
+
+    oof = np.zeros((len(y), len(classes)), dtype=np.float64)
+    overall = GradeMetrics(classes)
+    folds = []
+    for i, ((train_idx, valid_idx), r) in enumerate(zip(splits, results)):
+        oof[valid_idx] = r["proba"]
+        fold_metrics = GradeMetrics(classes).update(y[valid_idx], r["proba"])
+        overall.merge(fold_metrics)
+        m = fold_metrics.result()
+        folds.append({
+            "fold": i + 1,
+            "n_train": int(len(train_idx)),
+            "n_valid": int(len(valid_idx)),
+            "fit_seconds": r["fit_seconds"],
+            "predict_seconds": r["predict_seconds"],
+            **{k: m[k] for k in ("accuracy", "mae", "within_one", "log_loss", "macro_f1")},
+        })
+
+    return {
+        "params": params,
+        "n_splits": n_splits,
+        "n_workers": n_workers,
+        "n_jobs_per_fold": n_jobs,
+        "classes": classes,
+        "oof_proba": oof,
+        "folds": folds,
+        "overall": overall.result(),
+        "wall_seconds": wall,
+    }
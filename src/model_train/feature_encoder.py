@@ -0,0 +1,222 @@
+# src/model_train/feature_encoder.py
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+import json
+import os
+import numpy as np
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+FEATURE_ENCODER_PATH = os.path.join(PROJECT_ROOT, "data", "models", "feature_encoder.json")
+
+TARGET_COL = "ConditionLabel"
+
+
+def time_str_to_hours(time_str: str) -> float:
+    """'hh:mm[:ss]' 문자열 → 시간(float)"""
+    parts = time_str.split(':')
+    h, m, s = 0, 0, 0
+    if len(parts) >= 2: h, m = map(int, parts[:2])
+    if len(parts) == 3: s = int(parts[2])
+    return h + (m / 60) + (s / 3600)
+
+
+def parse_today_input(raw_data: Dict[str, str]) -> Dict[str, float]:
+    """
+    TodayInputPage 입력(dict of str) → 모델 입력 레코드
+    - 형식이 틀리면 ValueError / KeyError
+    """
+    return {
+        "SleepTime": time_str_to_hours(raw_data["sleep_time"]),
+        "ActivityTime": time_str_to_hours(raw_data["activity_time"]),
+        "PhoneTime": time_str_to_hours(raw_data["phone_time"]),
+        "Caffeine": int(raw_data["caffeine"]),
+        "MoodScore": int(raw_data["mood_score"]),
+        "Temp": float(raw_data["temp"]),
+        "Humidity": float(raw_data["humidity"]),
+        "PM10": float(raw_data["pm10"]),
+    }
+
+
+# TodayInputPage 입력 키 → 모델 입력 컬럼
+TIME_INPUT_KEYS = {"sleep_time": "SleepTime", "activity_time": "ActivityTime", "phone_time": "PhoneTime"}
+VALUE_INPUT_KEYS = {"caffeine": "Caffeine", "mood_score": "MoodScore", "temp": "Temp", "humidity": "Humidity", "pm10": "PM10"}
+
+
+def time_strs_to_hours(values) -> np.ndarray:
+    """
+    time_str_to_hours 배치 버전: 'hh:mm[:ss]' 문자열 배열 → 시간(float64)
+    - 숫자 배열이면 이미 시간 단위로 보고 그대로
+    - 형식이 틀린 값은 NaN
+    """
+    import pandas as pd  # UI 시작 경로(encode_record)에서는 pandas 를 import 하지 않도록 지연
+
+    s = pd.Series(np.asarray(values, dtype=object) if not hasattr(values, "to_pandas") else values.to_pandas())
+    if pd.api.types.is_numeric_dtype(s):
+        return s.to_numpy(dtype=np.float64)
+    parts = s.astype(str).str.strip().str.split(":", expand=True)
+    if parts.shape[1] < 2:
+        return np.full(len(s), np.nan)
+    h = pd.to_numeric(parts[0], errors="coerce")
+    m = pd.to_numeric(parts[1], errors="coerce")
+    sec = pd.to_numeric(parts[2], errors="coerce").fillna(0) if parts.shape[1] >= 3 else 0
+    if parts.shape[1] > 3:
+        h = h.where(parts[3].isna())
+    return (h + m / 60 + sec / 3600).to_numpy(dtype=np.float64)
+
+
+def parse_today_columns(columns, categorical_cols: Iterable[str] = ()) -> Dict[str, np.ndarray]:
+    """
+    parse_today_input 배치 버전: TodayInputPage 입력 컬럼(sleep_time, ..., pm10) → 모델 입력 컬럼 dict
+    - 모델 입력 컬럼(SleepTime, ...)이 이미 있으면 그 값을 그대로 사용
+    - 형식이 틀리거나 빈 값은 NaN (호출 측에서 valid 마스크로 걸러냄)
+    - categorical_cols(인코더의 범주 컬럼, profile_type 등)는 값 그대로 object 배열로 전달, 없으면 KeyError
+      (빠뜨리면 원-핫이 모두 0 으로 인코딩되어 등급이 달라짐)
+    """
+    import pandas as pd
+
+    names = set(columns.keys()) if hasattr(columns, "keys") else set(columns.column_names)
+    out = {}
+    for col in categorical_cols:
+        if col not in names:
+            raise KeyError(f"입력 컬럼이 없음: {col}")
+        values = columns[col]
+        values = values.to_pandas() if hasattr(values, "to_pandas") else values
+        out[col] = np.asarray(values, dtype=object)
+    for key, col in {**TIME_INPUT_KEYS, **VALUE_INPUT_KEYS}.items():
+        if col in names:
+            values = columns[col]
+            values = values.to_pandas() if hasattr(values, "to_pandas") else values
+            out[col] = pd.to_numeric(pd.Series(values), errors="coerce").to_numpy(dtype=np.float64)
+        elif key in names:
+            values = columns[key]
+            if key in TIME_INPUT_KEYS:
+                out[col] = time_strs_to_hours(values)
+            else:
+                values = values.to_pandas() if hasattr(values, "to_pandas") else values
+                out[col] = pd.to_numeric(pd.Series(values), errors="coerce").to_numpy(dtype=np.float64)
+                if key in ("caffeine", "mood_score"):
+                    # parse_today_input 의 int() 와 같게 소수점 이하 버림 (모델 입력 컬럼 값은 그대로)
+                    out[col] = np.trunc(out[col])
+        else:
+            raise KeyError(f"입력 컬럼이 없음: {key} (또는 {col})")
+    return out
+
+
+class FeatureEncoder:
+    """
+    학습 때의 pd.get_dummies 결과(컬럼 순서 포함)를 고정해 둔 인코더
+    - 숫자 컬럼은 그대로, 범주 컬럼(profile_type 등)은 '<col>_<value>' 원-핫
+    - 없는 컬럼/처음 보는 범주값은 0 (기존 reindex(fill_value=0)와 동일)
+    - 추론 경로에서는 pandas 없이 미리 할당한 float32 배열에 바로 기록
+    """
+    def __init__(self, feature_names: List[str], numeric_cols: List[str], categories: Dict[str, List[str]]):
+        self.feature_names = list(feature_names)
+        self.numeric_cols = list(numeric_cols)
+        self.categories = {col: list(vals) for col, vals in categories.items()}
+
+        index = {name: i for i, name in enumerate(self.feature_names)}
+        self._numeric_index = [(col, index[col]) for col in self.numeric_cols]
+        self._category_index = {
+            col: {val: index[f"{col}_{val}"] for val in vals}
+            for col, vals in self.categories.items()
+        }
+
+    @property
+    def n_features(self) -> int:
+        return len(self.feature_names)
+
+    @classmethod
+    def fit(cls, df, target: Optional[str] = TARGET_COL) -> "FeatureEncoder":
+        """학습 DataFrame 으로부터 get_dummies 와 같은 컬럼 순서를 만들어 고정"""
+        import pandas as pd
+
+        X = df.drop(columns=[target]) if target and target in df.columns else df
+        feature_names = pd.get_dummies(X).columns.tolist()
+        cat_cols = [c for c in X.columns if not pd.api.types.is_numeric_dtype(X[c]) and not pd.api.types.is_bool_dtype(X[c])]
+        numeric_cols = [c for c in X.columns if c not in cat_cols]
+        categories = {
+            col: [name[len(col) + 1:] for name in feature_names if name.startswith(f"{col}_")]
+            for col in cat_cols
+        }
+        return cls(feature_names, numeric_cols, categories)
+
+    def save(self, path: str = FEATURE_ENCODER_PATH):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({
+                "feature_names": self.feature_names,
+                "numeric_cols": self.numeric_cols,
+                "categories": self.categories,
+            }, f, ensure_ascii=False, indent=2)
+
+    @classmethod
+    def load(cls, path: str = FEATURE_ENCODER_PATH) -> "FeatureEncoder":
+        with open(path, "r", encoding="utf-8") as f:
+            d = json.load(f)
+        return cls(d["feature_names"], d["numeric_cols"], d["categories"])
+
+    def encode_record(self, record: Mapping[str, Any], out: Optional[np.ndarray] = None) -> np.ndarray:
+        """레코드 하나(dict) → (1, n_features) float32"""
+        if out is None:
+            out = np.zeros((1, self.n_features), dtype=np.float32)
+        else:
+            out.fill(0)
+        row = out[0]
+        for col, j in self._numeric_index:
+            v = record.get(col)
+            if v is not None:
+                row[j] = v
+        for col, index in self._category_index.items():
+            j = index.get(record.get(col))
+            if j is not None:
+                row[j] = 1.0
+        return out
+
+    def encode_records(self, records: Iterable[Mapping[str, Any]], out: Optional[np.ndarray] = None) -> np.ndarray:
+        """레코드 리스트 → (n, n_features) float32"""
+        records = records if isinstance(records, list) else list(records)
+        if out is None:
+            out = np.zeros((len(records), self.n_features), dtype=np.float32)
+        for i, record in enumerate(records):
+            self.encode_record(record, out=out[i:i + 1])
+        return out
+
+    def encode_columns(self, columns, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        컬럼형 배치(DataFrame, dict of arrays, pyarrow Table 등 columns[col] 로 꺼낼 수 있는 것)
+        → (n, n_features) float32, 컬럼 단위로 벡터화
+        """
+        names = set(columns.keys()) if hasattr(columns, "keys") else set(columns.column_names)
+        n = len(columns[next(iter(names))]) if names else 0
+        if out is None:
+            out = np.zeros((n, self.n_features), dtype=np.float32)
+        else:
+            out.fill(0)
+        for col, j in self._numeric_index:
+            if col in names:
+                out[:, j] = np.asarray(columns[col], dtype=np.float32)
+        for col, index in self._category_index.items():
+            if col not in names:
+                continue
+            codes, labels = _category_codes(columns[col])
+            if codes is not None:
+                # 범주형 컬럼(pandas category / Arrow dictionary)은 문자열 비교 대신 코드 비교
+                for k, val in enumerate(labels):
+                    j = index.get(val)
+                    if j is not None:
+                        out[:, j] = codes == k
+                continue
+            vals = np.asarray(columns[col], dtype=object)
+            for val, j in index.items():
+                out[:, j] = vals == val
+        return out
+
+
+def _category_codes(values):
+    """pandas category Series / Arrow dictionary 컬럼이면 (codes, 범주 목록), 아니면 (None, None)"""
+    if hasattr(values, "cat"):
+        return values.cat.codes.to_numpy(), values.cat.categories.tolist()
+    if hasattr(getattr(values, "type", None), "index_type"):
+        if hasattr(values, "unify_dictionaries"):
+            values = values.unify_dictionaries().combine_chunks()
+        return values.indices.fill_null(-1).to_numpy(), values.dictionary.to_pylist()
+    return None, None
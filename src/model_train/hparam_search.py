@@ -0,0 +1,300 @@
+# src/model_train/hparam_search.py
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+import hashlib
+import json
+import math
+import os
+import pickle
+import sys
+import time
+import numpy as np
+import lightgbm as lgb
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from model_train.metrics import grade_metrics
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+TRAIN_DATA_PATH = os.path.join(PROJECT_ROOT, "data/processed/train")
+VAL_DATA_PATH = os.path.join(PROJECT_ROOT, "data/processed/val")
+SEARCH_DIR = os.path.join(PROJECT_ROOT, "reports", "hparam_search")
+
+# 탐색 공간: (이름, 종류, 하한, 상한)  종류 = int / float / log (로그 균등)
+# 부스팅 라운드(n_estimators)는 탐색 대상이 아니라 successive halving 의 자원(budget)
+SEARCH_SPACE = [
+    ("learning_rate", "log", 0.02, 0.3),
+    ("num_leaves", "int", 4, 63),
+    ("max_depth", "int", 2, 10),
+    ("min_child_samples", "int", 5, 60),
+    ("subsample", "float", 0.5, 1.0),
+    ("colsample_bytree", "float", 0.5, 1.0),
+    ("reg_lambda", "log", 1e-3, 10.0),
+]
+
+# 기존 학습 설정 (모든 trial 공통)
+BASE_PARAMS = {"random_state": 42, "subsample_freq": 1, "verbose": -1, "n_jobs": 1}
+# 모델 결과와 무관한 실행 설정 (best_params.json 에는 넣지 않음)
+RUNTIME_PARAMS = ("verbose", "n_jobs")
+
+# 지연 측정: 1행 predict_proba 반복 횟수, 배치 크기
+LATENCY_REPEATS = 200
+LATENCY_BATCH = 1024
+
+
+def sample_config(config_id: int, seed: int) -> Dict[str, Any]:
+    """config_id 와 seed 로 결정되는 설정 (재개 시 같은 id 는 같은 설정)"""
+    rng = np.random.default_rng(np.random.SeedSequence([seed, config_id]))
+    params = {}
+    for name, kind, lo, hi in SEARCH_SPACE:
+        if kind == "int":
+            params[name] = int(rng.integers(lo, hi + 1))
+        elif kind == "log":
+            params[name] = float(np.exp(rng.uniform(np.log(lo), np.log(hi))))
+        else:
+            params[name] = float(rng.uniform(lo, hi))
+    return params
+
+
+def search_fingerprint(seed: int) -> str:
+    """seed + 탐색 공간 + 공통 학습 설정 해시 (이 값이 같아야 trial 기록을 이어서 쓸 수 있음)"""
+    payload = json.dumps({"seed": seed, "space": SEARCH_SPACE, "base": BASE_PARAMS}, sort_keys=True)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def hyperband_brackets(min_rounds: int, max_rounds: int, eta: int) -> List[Dict[str, Any]]:
+    """
+    Hyperband 브래킷 목록: 각 브래킷은 설정 n 개를 min 라운드에서 시작해 1/eta 만 eta 배 라운드로 승급
+    - 가장 공격적인 브래킷(많은 설정, 적은 라운드)부터 max_rounds 만 학습하는 브래킷까지
+    """
+    s_max = int(math.floor(math.log(max_rounds / min_rounds, eta) + 1e-9))
+    brackets = []
+    for s in range(s_max, -1, -1):
+        n = int(math.ceil((s_max + 1) / (s + 1) * eta ** s))
+        rungs = [int(round(max_rounds * eta ** (i - s))) for i in range(s + 1)]
+        brackets.append({"bracket": s_max - s, "n_configs": n, "rungs": rungs})
+    return brackets
+
+
+def score_key(record: Dict[str, Any]) -> Tuple:
+    """정렬 기준: ±1 등급 정확도 → 정확도 → log-loss (모두 높을수록 좋게)"""
+    return (record["within_one"], record["accuracy"], -record["log_loss"])
+
+
+def pareto_front(records: List[Dict[str, Any]], maximize=("within_one", "accuracy"),
+                 minimize=("latency_row_us",)) -> List[Dict[str, Any]]:
+    """다른 어떤 기록에도 모든 기준에서 밀리지 않는 기록들 (지연 오름차순)"""
+    def vec(r):
+        return [r[k] for k in maximize] + [-r[k] for k in minimize]
+
+    vecs = [vec(r) for r in records]
+    front = []
+    for i, a in enumerate(vecs):
+        dominated = any(
+            all(x >= y for x, y in zip(b, a)) and any(x > y for x, y in zip(b, a))
+            for j, b in enumerate(vecs) if j != i
+        )
+        if not dominated:
+            front.append(records[i])
+    return sorted(front, key=lambda r: r[minimize[0]])
+
+
+# ---------------------------------
+# trial 실행 (워커 프로세스)
+# ---------------------------------
+
+_DATA: Dict[str, Any] = {}
+
+
+def _init_worker(X_train, y_train, X_val, y_val):
+    _DATA.update(X_train=X_train, y_train=y_train, X_val=X_val, y_val=y_val)
+
+
+def measure_latency(model, X: np.ndarray, repeats: int = LATENCY_REPEATS, batch: int = LATENCY_BATCH) -> Dict[str, float]:
+    """1행 호출 지연 중앙값(µs)과 배치 호출의 행당 시간(µs)"""
+    row = X[:1]
+    model.predict_proba(row)
+    times = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        model.predict_proba(row)
+        times.append(time.perf_counter() - t0)
+    Xb = X[np.arange(batch) % len(X)]
+    t0 = time.perf_counter()
+    model.predict_proba(Xb)
+    t_batch = time.perf_counter() - t0
+    return {"latency_row_us": float(np.median(times) * 1e6), "latency_batch_row_us": t_batch / batch * 1e6}
+
+
+def run_trial(task: Dict[str, Any]) -> Dict[str, Any]:
+    """설정 하나를 task["rounds"] 라운드로 학습 → val 지표, 모델 크기, 지연"""
+    X_train, y_train, X_val, y_val = (_DATA[k] for k in ("X_train", "y_train", "X_val", "y_val"))
+    model = lgb.LGBMClassifier(**{**BASE_PARAMS, **task["params"], "n_estimators": task["rounds"]})
+    t0 = time.perf_counter()
+    model.fit(X_train, y_train)
+    fit_seconds = time.perf_counter() - t0
+
+    m = grade_metrics(y_val, model.predict_proba(X_val), classes=model.classes_.tolist())
+    return {
+        **{k: task[k] for k in ("config_id", "bracket", "rung", "rounds", "params")},
+        "within_one": m["within_one"],
+        "accuracy": m["accuracy"],
+        "mae": m["mae"],
+        "log_loss": m["log_loss"],
+        "fit_seconds": fit_seconds,
+        "model_bytes": len(pickle.dumps(model)),
+        "n_trees": int(model.booster_.num_trees()),
+        **measure_latency(model, X_val),
+    }
+
+
+# ---------------------------------
+# 탐색
+# ---------------------------------
+
+class TrialLog:
+    """
+    trial 결과 JSONL (한 줄 = 설정 × 라운드 한 번), 같은 키가 있으면 다시 학습하지 않음
+    - 기록마다 search_fingerprint 를 같이 저장, 다른 seed/탐색 공간의 기록이 있으면 이어 쓰지 않고 ValueError
+      (같은 config_id 가 다른 설정을 뜻하므로 예전 결과를 재사용하면 안 됨)
+    """
+    def __init__(self, path: str, fingerprint: str):
+        self.path = path
+        self.fingerprint = fingerprint
+        self.records: Dict[Tuple[int, int], Dict[str, Any]] = {}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if line:
+                        r = json.loads(line)
+                        if r.get("fingerprint") != fingerprint:
+                            raise ValueError(
+                                f"{path} 에 다른 --seed/탐색 공간의 trial 기록이 있음 "
+                                f"({r.get('fingerprint')} != {fingerprint}): 다른 --out-dir 을 쓰거나 파일을 지우고 다시 실행"
+                            )
+                        self.records[(r["config_id"], r["rounds"])] = r
+
+    def get(self, config_id: int, rounds: int) -> Optional[Dict[str, Any]]:
+        return self.records.get((config_id, rounds))
+
+    def append(self, record: Dict[str, Any]):
+        record = {**record, "fingerprint": self.fingerprint}
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.records[(record["config_id"], record["rounds"])] = record
+
+
+def hyperband_search(
+    X_train: np.ndarray, y_train: np.ndarray, X_val: np.ndarray, y_val: np.ndarray,
+    log_path: str,
+    min_rounds: int = 10,
+    max_rounds: int = 270,
+    eta: int = 3,
+    n_workers: int = 1,
+    seed: int = 42,
+    max_brackets: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """
+    Hyperband (브래킷별 successive halving)
+    - 같은 rung 의 설정들은 n_workers 프로세스에서 병렬 학습 (trial 당 LightGBM 스레드 1)
+    - 결과는 완료되는 대로 log_path 에 추가, 다시 실행하면 기록된 trial 은 건너뛰고 이어서 진행
+      (seed/탐색 공간이 다른 기록이면 ValueError)
+    - max_brackets: 앞쪽(공격적인) 브래킷 몇 개만 실행 (1 이면 순수 successive halving)
+    - return: 모든 trial 기록
+    """
+    log = TrialLog(log_path, search_fingerprint(seed))
+    brackets = hyperband_brackets(min_rounds, max_rounds, eta)[:max_brackets]
+    executor = ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker,
+                                   initargs=(X_train, y_train, X_val, y_val)) if n_workers > 1 else None
+    if executor is None:
+        _init_worker(X_train, y_train, X_val, y_val)
+
+    next_id = 0
+    records = []
+    try:
+        for b in brackets:
+            config_ids = list(range(next_id, next_id + b["n_configs"]))
+            next_id += b["n_configs"]
+            for rung, rounds in enumerate(b["rungs"]):
+                tasks = [
+                    {"config_id": cid, "bracket": b["bracket"], "rung": rung, "rounds": rounds,
+                     "params": sample_config(cid, seed)}
+                    for cid in config_ids
+                ]
+                todo = [t for t in tasks if log.get(t["config_id"], rounds) is None]
+                results = executor.map(run_trial, todo) if executor else map(run_trial, todo)
+                for r in results:
+                    log.append(r)
+                rung_records = [log.get(t["config_id"], rounds) for t in tasks]
+                records.extend(rung_records)
+                best = max(rung_records, key=score_key)
+                print(f"[bracket {b['bracket']} rung {rung}] rounds={rounds:4d} configs={len(tasks):3d} "
+                      f"(new {len(todo):3d}) best ±1={best['within_one']:.4f} acc={best['accuracy']:.4f} "
+                      f"logloss={best['log_loss']:.4f}")
+
+                # 상위 1/eta 만 다음 rung 으로
+                keep = max(1, len(rung_records) // eta)
+                config_ids = [r["config_id"] for r in sorted(rung_records, key=score_key, reverse=True)[:keep]]
+    finally:
+        if executor:
+            executor.shutdown()
+    return records
+
+
+def summarize(records: List[Dict[str, Any]], out_dir: str) -> Dict[str, Any]:
+    """
+    모든 trial(설정 × 라운드, 각각 그대로 쓸 수 있는 모델)로 Pareto front / 최고 설정 저장
+    - 최고 설정: 점수(score_key) 최고 중 1행 지연이 가장 짧은 것
+    - best_params 는 trial 과 같은 모델이 되도록 공통 학습 설정(subsample_freq 등, 실행 설정 제외)까지 포함
+    """
+    front = pareto_front(records)
+    top = max(score_key(r) for r in records)
+    best = min((r for r in records if score_key(r) == top), key=lambda r: r["latency_row_us"])
+    base = {k: v for k, v in BASE_PARAMS.items() if k not in RUNTIME_PARAMS}
+    best_params = {**base, **best["params"], "n_estimators": best["rounds"]}
+
+    os.makedirs(out_dir, exist_ok=True)
+    with open(os.path.join(out_dir, "pareto.json"), "w", encoding="utf-8") as f:
+        json.dump(front, f, ensure_ascii=False, indent=2)
+    with open(os.path.join(out_dir, "best_params.json"), "w", encoding="utf-8") as f:
+        json.dump(best_params, f, ensure_ascii=False, indent=2)
+    return {"front": front, "best": best, "best_params": best_params}
+
+
+if __name__ == "__main__":
+    import argparse
+    from model_train.feature_encoder import FeatureEncoder
+    from labeling.data_store import read_dataset
+
+    parser = argparse.ArgumentParser(description="LightGBM 하이퍼파라미터 탐색 (Hyperband, val ±1 등급 정확도)")
+    parser.add_argument("--out-dir", default=SEARCH_DIR, help="trials.jsonl / pareto.json / best_params.json 저장 폴더")
+    parser.add_argument("--min-rounds", type=int, default=10)
+    parser.add_argument("--max-rounds", type=int, default=270)
+    parser.add_argument("--eta", type=int, default=3)
+    parser.add_argument("--max-brackets", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    train_df = read_dataset(TRAIN_DATA_PATH)
+    val_df = read_dataset(VAL_DATA_PATH)
+    encoder = FeatureEncoder.fit(train_df)
+    X_tr, y_tr = encoder.encode_columns(train_df), train_df["ConditionLabel"].to_numpy()
+    X_va, y_va = encoder.encode_columns(val_df), val_df["ConditionLabel"].to_numpy()
+
+    t0 = time.perf_counter()
+    all_records = hyperband_search(
+        X_tr, y_tr, X_va, y_va, os.path.join(args.out_dir, "trials.jsonl"),
+        min_rounds=args.min_rounds, max_rounds=args.max_rounds, eta=args.eta,
+        n_workers=args.workers, seed=args.seed, max_brackets=args.max_brackets
+    )
+    summary = summarize(all_records, args.out_dir)
+    print(f"\n탐색 완료: trial {len(all_records)}개, {time.perf_counter() - t0:.1f}s")
+    print("\n[Pareto front: ±1 / 정확도 vs 1행 지연]")
+    print("  config  rounds      ±1  accuracy  log-loss  latency(µs)  batch(µs/row)  size(KB)")
+    for r in summary["front"]:
+        print(f"  {r['config_id']:>6}  {r['rounds']:>6}  {r['within_one']:.4f}  {r['accuracy']:8.4f}  {r['log_loss']:8.4f}"
+              f"  {r['latency_row_us']:11.1f}  {r['latency_batch_row_us']:13.2f}  {r['model_bytes'] / 1024:8.1f}")
+    print(f"\n최고 설정 (config {summary['best']['config_id']}): {summary['best_params']}")
+    print(f"저장: {args.out_dir}")
@@ -0,0 +1,211 @@
+# src/model_train/incremental.py
+from datetime import datetime
+from typing import Any, Dict, Optional
+import json
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+import joblib
+import lightgbm as lgb
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from model_train.metrics import grade_metrics
+from model_train.compaction import with_booster
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+MODEL_PATH = os.path.join(PROJECT_ROOT, "data/models/model_lgbm.pkl")
+TRAIN_DATA_PATH = os.path.join(PROJECT_ROOT, "data/processed/train")
+VAL_DATA_PATH = os.path.join(PROJECT_ROOT, "data/processed/val")
+# 마지막으로 학습에 반영한 위치 (append-only 학습 데이터의 행 수 / 시간 컬럼 최댓값)
+WATERMARK_PATH = os.path.join(PROJECT_ROOT, "data/models/train_watermark.json")
+
+TARGET_COL = "ConditionLabel"
+
+# 이어 학습 기본 설정: 기존 모델이 확신하는 행은 hessian p(1-p) 가 0 에 가까워
+# - 정규화 없이 이어 학습하면 첫 트리 리프 값이 수십까지 튐 → L2 와 리프 값 상한
+# - 기본 min_child_weight(1e-3)로는 어떤 분할도 못 해 트리가 추가되지 않음 → 하한을 낮춤
+WARM_START_PARAMS = {"reg_lambda": 1.0, "max_delta_step": 0.5, "min_child_weight": 1e-6}
+
+# LGBMClassifier 전용 인자 (lgb.train 파라미터가 아님)
+_SKLEARN_ONLY = {"n_estimators", "class_weight", "importance_type", "objective"}
+
+
+def load_watermark(path: str = WATERMARK_PATH) -> Optional[Dict[str, Any]]:
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_watermark(watermark: Dict[str, Any], path: str = WATERMARK_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(watermark, f, ensure_ascii=False, indent=2)
+
+
+def watermark_time(values) -> Any:
+    """시간 컬럼 최댓값 → JSON 에 저장할 값 (datetime 은 ISO 문자열, 숫자는 int/float, 그 외 문자열)"""
+    v = values.max()
+    if pd.isna(v):
+        return None
+    if isinstance(v, pd.Timestamp):
+        return v.isoformat()
+    return v.item() if isinstance(v, np.generic) else v
+
+
+def time_watermark_value(stored: Any, column) -> Any:
+    """
+    저장된 watermark 시간을 컬럼 dtype 값으로 복원 (문자열 비교가 아닌 컬럼 자체 비교를 위해)
+    - datetime 컬럼: Timestamp (컬럼에 시간대가 있으면 맞춤), 숫자 컬럼: 숫자, 그 외: 문자열
+    - 예전 watermark 의 str(max) 값도 같은 방식으로 복원됨, 복원 실패는 ValueError
+    """
+    dtype = column.dtype
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        ts = pd.Timestamp(stored)
+        tz = getattr(dtype, "tz", None)
+        if tz is not None:
+            ts = ts.tz_localize(tz) if ts.tzinfo is None else ts.tz_convert(tz)
+        return ts
+    if pd.api.types.is_numeric_dtype(dtype):
+        return pd.to_numeric(stored)
+    return str(stored)
+
+
+def select_new_rows(df, watermark: Dict[str, Any], time_col: Optional[str] = None):
+    """
+    watermark 이후 행: time_col 이 있으면 그 값이 watermark['time'] 보다 큰 행, 없으면 watermark['rows'] 번째 행부터
+    - 시간 비교는 컬럼 dtype 그대로 (숫자 9 < 10, 시간대가 다른 datetime 등 문자열 비교로 틀리는 경우 방지)
+    """
+    if time_col and watermark.get("time") is not None:
+        column = df[time_col]
+        return df[column > time_watermark_value(watermark["time"], column)]
+    return df.iloc[int(watermark.get("rows", 0)):]
+
+
+def booster_params(model) -> Dict[str, Any]:
+    """LGBMClassifier 설정 → lgb.train 파라미터 (sklearn 이름은 LightGBM 별칭으로 그대로 통함)"""
+    params = {k: v for k, v in model.get_params().items() if v is not None and k not in _SKLEARN_ONLY}
+    params.update(objective="multiclass", num_class=len(model.classes_), verbose=-1)
+    return params
+
+
+def warm_start(model, X_new: np.ndarray, y_new: np.ndarray, n_rounds: int = 20, **params):
+    """
+    기존 booster 에서 이어서 n_rounds 라운드 추가 학습 (새 행만 사용, init_model)
+    - 라벨은 기존 모델의 classes_ 순서 인덱스로 변환 → 새 행에 없는 등급이 있어도 클래스 배치 유지
+    """
+    index = {c: i for i, c in enumerate(model.classes_.tolist())}
+    labels = np.array([index[v] for v in np.asarray(y_new).tolist()])
+    booster = lgb.train(
+        {**booster_params(model), **WARM_START_PARAMS, **params},
+        lgb.Dataset(X_new, label=labels),
+        num_boost_round=n_rounds,
+        init_model=model.booster_,
+    )
+    return with_booster(model, booster)
+
+
+def full_retrain(model, X: np.ndarray, y: np.ndarray):
+    """같은 설정으로 전체 행 처음부터 다시 학습"""
+    return lgb.LGBMClassifier(**{**model.get_params(), "verbose": -1}).fit(X, y)
+
+
+def incremental_retrain(
+    model_path: str,
+    encoder,
+    df_all,
+    df_val,
+    watermark_path: str = WATERMARK_PATH,
+    n_rounds: int = 20,
+    tolerance: float = 0.0,
+    time_col: Optional[str] = None,
+    min_rows: int = 1,
+    dry_run: bool = False
+) -> Dict[str, Any]:
+    """
+    야간 갱신용 증분 학습
+    1) watermark 이후 새 행만 골라 기존 모델에서 warm-start (n_rounds 라운드 추가)
+    2) val ±1 등급 정확도가 기존 모델보다 tolerance 넘게 떨어지면 전체 행으로 처음부터 재학습
+    3) 채택한 모델을 model_path 에 저장하고 watermark 갱신 (dry_run 이면 저장 안 함)
+    - watermark 가 없으면 현재 데이터 끝을 watermark 로 기록만 함 (기존 모델이 전체를 학습했다고 가정)
+    """
+    watermark = load_watermark(watermark_path)
+    end = {"rows": int(len(df_all)), "time": watermark_time(df_all[time_col]) if time_col else None}
+    if time_col:
+        end["time_dtype"] = str(df_all[time_col].dtype)
+    if watermark is None:
+        report = {"mode": "init", "new_rows": 0, **end}
+        if not dry_run:
+            save_watermark({**end, "mode": "init", "updated_at": datetime.now().isoformat(timespec="seconds")},
+                           watermark_path)
+        return report
+
+    df_new = select_new_rows(df_all, watermark, time_col)
+    if len(df_new) < min_rows:
+        return {"mode": "skip", "new_rows": int(len(df_new)), **end}
+
+    model = joblib.load(model_path)
+    X_val, y_val = encoder.encode_columns(df_val), df_val[TARGET_COL].to_numpy()
+    classes = model.classes_.tolist()
+    before = grade_metrics(y_val, model.predict_proba(X_val), classes)
+
+    t0 = time.perf_counter()
+    warm = warm_start(model, encoder.encode_columns(df_new), df_new[TARGET_COL].to_numpy(), n_rounds=n_rounds)
+    warm_seconds = time.perf_counter() - t0
+    after = grade_metrics(y_val, warm.predict_proba(X_val), classes)
+
+    report = {
+        "new_rows": int(len(df_new)),
+        "val_before": {k: before[k] for k in ("within_one", "accuracy", "log_loss")},
+        "val_warm": {k: after[k] for k in ("within_one", "accuracy", "log_loss")},
+        "warm_seconds": warm_seconds,
+        **end,
+    }
+    if after["within_one"] >= before["within_one"] - tolerance:
+        chosen, report["mode"] = warm, "warm"
+    else:
+        # guardrail: ±1 정확도 회귀 → 전체 재학습
+        t0 = time.perf_counter()
+        chosen = full_retrain(model, encoder.encode_columns(df_all), df_all[TARGET_COL].to_numpy())
+        report["full_seconds"] = time.perf_counter() - t0
+        full = grade_metrics(y_val, chosen.predict_proba(X_val), classes)
+        report["val_full"] = {k: full[k] for k in ("within_one", "accuracy", "log_loss")}
+        report["mode"] = "full"
+    report["n_trees"] = int(chosen.booster_.num_trees())
+
+    if not dry_run:
+        joblib.dump(chosen, model_path)
+        save_watermark({
+            **end, "mode": report["mode"], "new_rows": report["new_rows"],
+            "val_within_one": (report.get("val_full") or report["val_warm"])["within_one"],
+            "updated_at": datetime.now().isoformat(timespec="seconds"),
+        }, watermark_path)
+    return report
+
+
+if __name__ == "__main__":
+    import argparse
+    from model_train.feature_encoder import FeatureEncoder, FEATURE_ENCODER_PATH
+    from labeling.data_store import read_dataset
+
+    parser = argparse.ArgumentParser(description="watermark 이후 새 행으로 LightGBM 증분 학습 (±1 회귀 시 전체 재학습)")
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--data", default=TRAIN_DATA_PATH, help="append-only 학습 데이터 (새 날이 뒤에 추가됨)")
+    parser.add_argument("--val", default=VAL_DATA_PATH)
+    parser.add_argument("--watermark", default=WATERMARK_PATH)
+    parser.add_argument("--rounds", type=int, default=20, help="warm-start 로 추가할 부스팅 라운드")
+    parser.add_argument("--tolerance", type=float, default=0.0, help="허용하는 val ±1 정확도 하락 폭")
+    parser.add_argument("--time-col", default=None, help="행 순서 대신 이 컬럼 값으로 새 행 판단 (예: date)")
+    parser.add_argument("--dry-run", action="store_true", help="모델/watermark 저장 없이 결과만 출력")
+    args = parser.parse_args()
+
+    result = incremental_retrain(
+        args.model, FeatureEncoder.load(FEATURE_ENCODER_PATH), read_dataset(args.data), read_dataset(args.val),
+        watermark_path=args.watermark, n_rounds=args.rounds, tolerance=args.tolerance,
+        time_col=args.time_col, dry_run=args.dry_run
+    )
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+    if result["mode"] in ("warm", "full") and not args.dry_run:
+        print("[INFO] 모델 갱신 완료. ONNX/OpenVINO 백엔드를 쓰는 경우 run_pipeline_lgbm.py 로 다시 변환해야 함")
@@ -1,21 +1,244 @@
 # src/model/infer.py
-from typing import Tuple, List, Optional
+from typing import Tuple, List, Optional, Dict, Any
+import json
+import os
+import threading
 import numpy as np
 import joblib
+import yaml
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+INFERENCE_CONFIG_PATH = os.path.join(PROJECT_ROOT, "config", "inference.yaml")
+# 모델 메타데이터: 확률 열 순서 ↔ 등급(label mapping), 피처 순서 (변환 모델은 classes_ 가 없으므로 여기서 읽음)
+MODEL_META_PATH = os.path.join(PROJECT_ROOT, "data", "models", "model_meta.json")
 
 def load_model(model_path: str):
     """학습된 LightGBM/Sklearn 모델 로드"""
     return joblib.load(model_path)
 
-def predict_grade_and_proba(model, X: np.ndarray, classes: Optional[List[int]] = None) -> Tuple[int, np.ndarray]:
+def save_model_meta(model, feature_names: List[str], path: str = MODEL_META_PATH):
     """
-    모델로 등급(정수)과 각 등급 확률 반환
-    - classes 미지정 시 [1,2,3,4,5]로 가정
+    학습된 모델의 label mapping 저장
+    - classes: 확률 열 i 가 뜻하는 등급 (LightGBM classes_ 순서 = ONNX/OpenVINO 출력 순서)
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    meta = {
+        "classes": [int(c) for c in model.classes_],
+        "feature_names": list(feature_names),
+        "n_features": len(feature_names),
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+    return meta
+
+def load_model_meta(path: str = MODEL_META_PATH) -> Optional[Dict[str, Any]]:
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def backend_classes(backend, meta: Optional[Dict[str, Any]] = None) -> List[int]:
+    """백엔드 확률 열 순서의 등급: LightGBM 은 classes_, 변환 모델은 모델 메타데이터 (없으면 1~5)"""
+    model = getattr(backend, "model", backend)
+    classes = getattr(model, "classes_", None)
+    if classes is not None:
+        return [int(c) for c in classes]
+    meta = meta if meta is not None else load_model_meta()
+    return list(meta["classes"]) if meta else [1, 2, 3, 4, 5]
+
+def predict_grades_and_proba(model, X: np.ndarray, classes: Optional[List[int]] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    배치 버전: predict_proba 한 번으로 모든 행의 등급/확률 반환
+    - model: predict_proba(X) 를 가진 객체 (LightGBM 모델 또는 아래 추론 백엔드)
+    - return: grades (n,), proba (n, n_classes)
     """
     if classes is None:
         classes = [1, 2, 3, 4, 5]
 
     proba = model.predict_proba(X)  # shape: (n, n_classes)
-    pred_idx = np.argmax(proba, axis=1)[0]
-    pred_grade = classes[pred_idx]
-    return pred_grade, proba[0]
+    grades = np.asarray(classes)[np.argmax(proba, axis=1)]
+    return grades, proba
+
+def predict_grade_and_proba(model, X: np.ndarray, classes: Optional[List[int]] = None) -> Tuple[int, np.ndarray]:
+    """
+    모델로 등급(정수)과 각 등급 확률 반환
+    - classes 미지정 시 [1,2,3,4,5]로 가정
+    """
+    grades, proba = predict_grades_and_proba(model, X, classes)
+    return int(grades[0]), proba[0]
+
+
+# ---------------------------------
+# 추론 백엔드 (lightgbm / onnx / openvino)
+# 모두 predict_proba(X) -> (n, n_classes) 인터페이스를 가짐
+# ---------------------------------
+class LightGBMBackend:
+    """joblib 으로 저장된 LightGBM 모델 (기준 구현)"""
+    name = "lightgbm"
+
+    def __init__(self, model_path: str, model=None):
+        self.model_path = model_path
+        self.model = model if model is not None else load_model(model_path)
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        return self.model.predict_proba(X)
+
+
+class OnnxRuntimeBackend:
+    """Hummingbird 로 변환한 ONNX 모델을 ONNX Runtime 으로 실행"""
+    name = "onnx"
+
+    def __init__(self, model_path: str, num_threads: int = 0):
+        import onnxruntime as ort
+
+        opts = ort.SessionOptions()
+        if num_threads:
+            opts.intra_op_num_threads = num_threads
+        self.model_path = model_path
+        self.session = ort.InferenceSession(model_path, sess_options=opts, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+        # 출력: [라벨 인덱스 (n,), 확률 (n, n_classes)] → 2차원 출력을 확률로 사용
+        self.proba_name = next(o.name for o in self.session.get_outputs() if len(o.shape) == 2)
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        return self.session.run([self.proba_name], {self.input_name: X})[0]
+
+
+class OpenVINOBackend:
+    """OpenVINO IR(xml/bin)을 컴파일해서 실행. 큰 배치는 AsyncInferQueue 로 나눠 병렬 추론"""
+    name = "openvino"
+
+    def __init__(self, model_path: str, device: str = "CPU", batch_size: int = 1024, num_requests: int = 0,
+                 inference_precision: str = "f32"):
+        import openvino as ov
+
+        self.model_path = model_path
+        # CPU 기본 bf16 힌트 대신 f32 로 고정 (기준 모델과 확률 차이 최소화)
+        config = {"INFERENCE_PRECISION_HINT": inference_precision} if device == "CPU" else {}
+        self.compiled = ov.Core().compile_model(model_path, device, config)
+        self.proba_port = next(o for o in self.compiled.outputs if o.get_partial_shape().rank.get_length() == 2)
+        self.batch_size = batch_size
+        self.num_requests = num_requests  # 0 → 디바이스 권장 개수
+        self._ov = ov
+        # infer request 는 스레드 간에 공유하면 안 되므로 스레드마다 하나씩 (워커 풀/서비스 executor 에서 동시 호출)
+        self._local = threading.local()
+        # AsyncInferQueue 는 한 번 만들어 재사용 (호출마다 만들고 버리면 LightGBM(OpenMP)과
+        # 같은 프로세스에서 종료 시 abort 발생), 콜백/출력 버퍼가 호출마다 바뀌므로 한 번에 한 호출만
+        self._queue = None
+        self._queue_lock = threading.Lock()
+
+    @property
+    def request(self):
+        """현재 스레드의 infer request (처음 호출 시 생성)"""
+        request = getattr(self._local, "request", None)
+        if request is None:
+            request = self._local.request = self.compiled.create_infer_request()
+        return request
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if X.shape[0] <= self.batch_size:
+            return self.request.infer({0: X})[self.proba_port].copy()
+        return self.predict_proba_async(X)
+
+    def predict_proba_async(self, X: np.ndarray) -> np.ndarray:
+        """batch_size 단위로 나눠 비동기 infer request 여러 개로 동시에 추론"""
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        n = X.shape[0]
+        out = np.empty((n, self.proba_port.get_partial_shape()[1].get_length()), dtype=np.float32)
+
+        def on_done(request, start):
+            stop = min(start + self.batch_size, n)
+            out[start:stop] = request.get_tensor(self.proba_port).data
+
+        with self._queue_lock:
+            if self._queue is None:
+                self._queue = self._ov.AsyncInferQueue(self.compiled, self.num_requests)
+            queue = self._queue
+            queue.set_callback(on_done)
+            for start in range(0, n, self.batch_size):
+                queue.start_async({0: X[start:start + self.batch_size]}, userdata=start)
+            queue.wait_all()
+        return out
+
+
+BACKENDS = {
+    LightGBMBackend.name: LightGBMBackend,
+    OnnxRuntimeBackend.name: OnnxRuntimeBackend,
+    OpenVINOBackend.name: OpenVINOBackend,
+}
+
+# (백엔드 종류, 절대경로, 파일 수정시각, 옵션) → 로드/컴파일된 백엔드
+_BACKEND_CACHE: Dict[tuple, Any] = {}
+
+def load_backend(kind: str, model_path: str, **options):
+    """
+    추론 백엔드 로드 (같은 파일/옵션이면 캐시된 컴파일 결과 재사용)
+    - 모델 파일이 바뀌면(mtime 변경) 다시 로드
+    """
+    if kind not in BACKENDS:
+        raise ValueError(f"지원하지 않는 추론 백엔드: {kind} (가능: {list(BACKENDS)})")
+    path = os.path.abspath(model_path)
+    key = (kind, path, os.path.getmtime(path), tuple(sorted(options.items())))
+    if key not in _BACKEND_CACHE:
+        _BACKEND_CACHE[key] = BACKENDS[kind](path, **options)
+    return _BACKEND_CACHE[key]
+
+def clear_backend_cache():
+    _BACKEND_CACHE.clear()
+
+def load_inference_config(config_path: str = INFERENCE_CONFIG_PATH) -> Dict[str, Any]:
+    with open(config_path, "r", encoding="utf-8") as f:
+        return yaml.safe_load(f)
+
+def load_backend_from_config(config_path: str = INFERENCE_CONFIG_PATH, kind: Optional[str] = None):
+    """config/inference.yaml 의 backend 항목으로 백엔드 선택 (kind 를 주면 그 백엔드를 같은 경로/옵션으로)"""
+    cfg = load_inference_config(config_path)
+    kind = kind or cfg.get("backend", LightGBMBackend.name)
+    model_path = cfg["paths"][kind]
+    if not os.path.isabs(model_path):
+        model_path = os.path.join(PROJECT_ROOT, model_path)
+    options = cfg.get("options", {}).get(kind) or {}
+    return load_backend(kind, model_path, **options)
+
+def load_verify_rows(cfg: Dict[str, Any]) -> Optional[np.ndarray]:
+    """
+    백엔드 검증용 실제 데이터 행 (설정 verify.data 의 held-out 데이터셋을 인코딩)
+    - verify.rows 개까지 seed 고정 무작위 표본 (0 이면 전부)
+    - 파일이 없으면 None
+    """
+    verify = cfg.get("verify", {}) or {}
+    path = verify.get("data")
+    if not path:
+        return None
+    if not os.path.isabs(path):
+        path = os.path.join(PROJECT_ROOT, path)
+    if not os.path.exists(path):
+        return None
+    from model_train.feature_encoder import FeatureEncoder, FEATURE_ENCODER_PATH
+    from labeling.data_store import read_dataset
+
+    X = FeatureEncoder.load(FEATURE_ENCODER_PATH).encode_columns(read_dataset(path))
+    n_rows = int(verify.get("rows", 0) or 0)
+    if 0 < n_rows < len(X):
+        rows = np.sort(np.random.default_rng(int(verify.get("seed", 0))).choice(len(X), size=n_rows, replace=False))
+        X = X[rows]
+    return X
+
+def verify_backend(backend, reference, X: np.ndarray, atol: float = 1e-4) -> Dict[str, float]:
+    """
+    백엔드 결과를 기준(LightGBM) 결과와 비교
+    - 등급(argmax)이 한 행이라도 다르거나 확률 차이가 atol 을 넘으면 ValueError
+    """
+    p_ref = np.asarray(reference.predict_proba(X), dtype=np.float64)
+    p_new = np.asarray(backend.predict_proba(X), dtype=np.float64)
+    max_diff = float(np.abs(p_ref - p_new).max())
+    mismatched = int(np.sum(p_ref.argmax(axis=1) != p_new.argmax(axis=1)))
+    agreement = 1.0 - mismatched / len(X)
+    if mismatched or max_diff > atol:
+        raise ValueError(
+            f"[{getattr(backend, 'name', backend)}] 기준 모델과 불일치 ({len(X)}행): 등급 불일치 {mismatched}행 "
+            f"(일치율={agreement:.4f}), 최대 확률 차이={max_diff:.2e} (허용 {atol:.0e})"
+        )
+    return {"max_abs_diff": max_diff, "grade_agreement": agreement, "rows": len(X)}
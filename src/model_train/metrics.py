@@ -0,0 +1,93 @@
+# src/model_train/metrics.py
+from typing import Any, Dict, List, Optional
+import numpy as np
+
+DEFAULT_CLASSES = [1, 2, 3, 4, 5]
+
+# log-loss 계산 시 확률 하한 (log(0) 방지)
+PROBA_EPS = 1e-15
+
+
+class GradeMetrics:
+    """
+    등급 예측 지표 누적기 (배치 단위로 update → result)
+    - 혼동 행렬 + log-loss 합만 들고 있어 행 수와 무관하게 메모리 일정
+    - 정확도, MAE, ±1 등급 정확도, 클래스별 precision/recall/f1 은 혼동 행렬에서 계산
+    """
+    def __init__(self, classes: Optional[List[int]] = None):
+        self.classes = list(DEFAULT_CLASSES if classes is None else classes)
+        self._classes_arr = np.asarray(self.classes)
+        self._sorter = np.argsort(self._classes_arr)
+        k = len(self.classes)
+        self.confusion = np.zeros((k, k), dtype=np.int64)  # [실제, 예측]
+        self.log_loss_sum = 0.0
+        self.n_proba = 0
+
+    @property
+    def n(self) -> int:
+        return int(self.confusion.sum())
+
+    def _indices(self, y) -> np.ndarray:
+        y = np.asarray(y).ravel()
+        pos = np.searchsorted(self._classes_arr, y, sorter=self._sorter)
+        idx = self._sorter[np.clip(pos, 0, len(self.classes) - 1)]
+        bad = self._classes_arr[idx] != y
+        if bad.any():
+            raise ValueError(f"알 수 없는 등급: {y[bad][0]} (classes={self.classes})")
+        return idx
+
+    def update(self, y_true, proba: Optional[np.ndarray] = None, y_pred=None) -> "GradeMetrics":
+        """
+        y_true: (n,) 실제 등급, proba: (n, n_classes) classes 순서 확률
+        - proba 가 없으면 y_pred (n,) 로 혼동 행렬만 갱신 (log-loss 제외)
+        """
+        t = self._indices(y_true)
+        if proba is not None:
+            proba = np.asarray(proba)
+            p = np.argmax(proba, axis=1)
+            picked = np.clip(proba[np.arange(len(t)), t], PROBA_EPS, 1.0)
+            self.log_loss_sum += float(-np.log(picked).sum())
+            self.n_proba += len(t)
+        else:
+            p = self._indices(y_pred)
+        k = len(self.classes)
+        self.confusion += np.bincount(t * k + p, minlength=k * k).reshape(k, k)
+        return self
+
+    def merge(self, other: "GradeMetrics") -> "GradeMetrics":
+        self.confusion += other.confusion
+        self.log_loss_sum += other.log_loss_sum
+        self.n_proba += other.n_proba
+        return self
+
+    def result(self) -> Dict[str, Any]:
+        cm = self.confusion
+        n = cm.sum()
+        grades = np.asarray(self.classes, dtype=np.float64)
+        dist = np.abs(grades[:, None] - grades[None, :])
+        tp = np.diag(cm).astype(np.float64)
+        pred_cnt = cm.sum(axis=0)
+        true_cnt = cm.sum(axis=1)
+        precision = np.divide(tp, pred_cnt, out=np.zeros_like(tp), where=pred_cnt > 0)
+        recall = np.divide(tp, true_cnt, out=np.zeros_like(tp), where=true_cnt > 0)
+        denom = precision + recall
+        f1 = np.divide(2 * precision * recall, denom, out=np.zeros_like(tp), where=denom > 0)
+        return {
+            "n": int(n),
+            "accuracy": float(tp.sum() / n) if n else 0.0,
+            "mae": float((cm * dist).sum() / n) if n else 0.0,
+            "within_one": float(cm[dist <= 1].sum() / n) if n else 0.0,
+            "log_loss": self.log_loss_sum / self.n_proba if self.n_proba else None,
+            "per_class": {
+                int(c): {"precision": float(precision[i]), "recall": float(recall[i]),
+                         "f1": float(f1[i]), "support": int(true_cnt[i])}
+                for i, c in enumerate(self.classes)
+            },
+            "macro_f1": float(f1.mean()),
+            "confusion": cm.tolist(),
+        }
+
+
+def grade_metrics(y_true, proba: np.ndarray, classes: Optional[List[int]] = None) -> Dict[str, Any]:
+    """한 번에 계산하는 버전: 확률 → 정확도/MAE/±1/log-loss/클래스별 지표"""
+    return GradeMetrics(classes).update(y_true, proba).result()
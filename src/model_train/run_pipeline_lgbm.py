@@ -10,44 +10,85 @@ import numpy as np
 # [추가] 파일 이동을 위한 shutil 라이브러리
 import shutil
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from model_train.feature_encoder import FeatureEncoder
+from model_train.background import DEFAULT_BACKGROUND_METHOD, build_background, save_background
+from model_train.infer import save_model_meta, MODEL_META_PATH
+from labeling.data_store import read_dataset
+
 # --- 설정 ---
 
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
 
-TRAIN_DATA_PATH = os.path.join(PROJECT_ROOT, "data/processed/train.csv")
+TRAIN_DATA_PATH = os.path.join(PROJECT_ROOT, "data/processed/train")
 MODELS_DIR = os.path.join(PROJECT_ROOT, "data/models")
 OPENVINO_DIR = os.path.join(MODELS_DIR, "openvino_ir")
 LGBM_MODEL_PATH = os.path.join(MODELS_DIR, "model_lgbm.pkl")
 # [수정] Hummingbird로 변환된 ONNX 파일 이름을 지정합니다.
 ONNX_MODEL_PATH = os.path.join(MODELS_DIR, "model_lgbm_hb.onnx")
+# 학습 컬럼 순서/원-핫 범주를 고정한 인코더 (추론 시 pd.get_dummies 대신 사용)
+FEATURE_ENCODER_PATH = os.path.join(MODELS_DIR, "feature_encoder.json")
+# SHAP 배경 행렬 + 피처 이름 (UI 시작 시 train.csv 대신 로드)
+BACKGROUND_PATH = os.path.join(MODELS_DIR, "shap_background.npz")
 
 # --- 디렉토리 생성 ---
 os.makedirs(OPENVINO_DIR, exist_ok=True)
 
 
-def train_lightgbm():
-    """1. LightGBM 모델 학습"""
+def train_lightgbm(params=None):
+    """
+    1. LightGBM 모델 학습
+    - params: LGBMClassifier 추가 인자 (예: hparam_search 의 best_params.json), 없으면 기본값
+    """
     print("--- 1. LightGBM 모델 학습 시작 ---")
 
-    df = pd.read_csv(TRAIN_DATA_PATH)
+    df = read_dataset(TRAIN_DATA_PATH)
     X = df.drop("ConditionLabel", axis=1)
     y = df["ConditionLabel"]
 
     print("데이터 전처리(원-핫 인코딩)를 수행합니다...")
+    encoder = FeatureEncoder.fit(X)
     X = pd.get_dummies(X)
 
     print(f"데이터 로드 및 전처리 완료. 피처 개수: {X.shape[1]}, 샘플 개수: {X.shape[0]}")
 
-    model = lgb.LGBMClassifier(random_state=42)
+    model = lgb.LGBMClassifier(**{"random_state": 42, **(params or {})})
     model.fit(X, y)
     print("모델 학습 완료.")
 
     joblib.dump(model, LGBM_MODEL_PATH)
     print(f"학습된 모델 저장 완료: {LGBM_MODEL_PATH}")
 
+    encoder.save(FEATURE_ENCODER_PATH)
+    print(f"피처 인코더 저장 완료: {FEATURE_ENCODER_PATH}")
+
+    save_model_meta(model, encoder.feature_names, MODEL_META_PATH)
+    print(f"모델 메타데이터(등급 매핑) 저장 완료: {MODEL_META_PATH}")
+
+    background_X = build_background(df, encoder, DEFAULT_BACKGROUND_METHOD)
+    save_background(BACKGROUND_PATH, background_X, encoder.feature_names, method=DEFAULT_BACKGROUND_METHOD)
+    print(f"SHAP 배경 데이터 저장 완료 ({DEFAULT_BACKGROUND_METHOD}, {len(background_X)}행): {BACKGROUND_PATH}")
+
     return model, X.shape[1]
 
 
+def compact_lightgbm(model):
+    """1-1. (선택) 학습된 모델의 압축 변형 생성 및 정확도/크기/지연 비교"""
+    from model_train.compaction import COMPACT_DIR, compact_variants, print_report
+
+    print("\n--- 1-1. 모델 압축 변형 비교 ---")
+    encoder = FeatureEncoder.load(FEATURE_ENCODER_PATH)
+    train_df = read_dataset(TRAIN_DATA_PATH)
+    val_df = read_dataset(os.path.join(PROJECT_ROOT, "data/processed/val"))
+    numeric = [encoder.feature_names.index(c) for c in encoder.numeric_cols]
+    results = compact_variants(
+        model, encoder.encode_columns(train_df), train_df["ConditionLabel"].to_numpy(),
+        encoder.encode_columns(val_df), val_df["ConditionLabel"].to_numpy(), numeric
+    )
+    print_report(results)
+    print(f"압축 변형 저장 위치: {COMPACT_DIR}")
+
+
 def convert_to_onnx(model, num_features):
     """2. 학습된 모델을 ONNX 형식으로 변환 (Hummingbird 사용)"""
     print("\n--- 2. ONNX 변환 시작 (Hummingbird 사용) ---")
@@ -70,7 +111,8 @@ def convert_to_openvino():
     print("\n--- 3. OpenVINO IR 변환 시작 ---")
 
     # --output 옵션을 제거하여 현재 폴더에 IR 파일을 생성
-    command = ["ovc", ONNX_MODEL_PATH]
+    # ovc 기본값(FP16 압축)은 트리 분할 임계값을 반올림해 등급이 바뀌는 행이 생기므로 FP32 그대로 저장
+    command = ["ovc", ONNX_MODEL_PATH, "--compress_to_fp16=False"]
     print(f"실행 명령어: {' '.join(command)}")
 
     try:
@@ -95,7 +137,22 @@ def convert_to_openvino():
 
 
 if __name__ == "__main__":
-    lgbm_model, feature_count = train_lightgbm()
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="LightGBM 학습 → ONNX → OpenVINO IR")
+    parser.add_argument("--params", default=None, help="LGBMClassifier 파라미터 JSON (예: reports/hparam_search/best_params.json)")
+    parser.add_argument("--compact", action="store_true", help="학습 후 압축 변형(compaction.py)을 만들어 비교 리포트 출력")
+    args = parser.parse_args()
+    params = None
+    if args.params:
+        with open(args.params, "r", encoding="utf-8") as f:
+            params = json.load(f)
+        print(f"하이퍼파라미터 적용: {params}")
+
+    lgbm_model, feature_count = train_lightgbm(params)
+    if args.compact:
+        compact_lightgbm(lgbm_model)
     convert_to_onnx(lgbm_model, feature_count)
     convert_to_openvino()
 
@@ -0,0 +1,177 @@
+# src/model_train/shap_pool.py
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+import uuid
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from model_train.infer import load_model
+from model_train.background import BACKGROUND_PATH, load_background
+from model_train.shap_utils import build_explainer_for_expected_grade, shap_values_for_batch, penalties_from_values
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+MODEL_PATH = os.path.join(PROJECT_ROOT, "data/models/model_lgbm.pkl")
+
+# 입력/결과 배열을 두는 곳: 있으면 메모리 파일시스템(/dev/shm), 없으면 시스템 임시 폴더
+SHARED_DIR = "/dev/shm" if os.path.isdir("/dev/shm") else None
+# 워커당 샤드 수 (느린 샤드 하나 때문에 다른 워커가 노는 시간 줄이기)
+SHARDS_PER_WORKER = 4
+# 샤드 최소 행 수 (너무 잘게 나누면 작업 전달 비용이 더 큼)
+MIN_SHARD_ROWS = 8
+
+# 워커 프로세스별 explainer (초기화 시 한 번 생성)
+_WORKER: Dict[str, Any] = {}
+
+
+def _init_worker(model_path: str, background_npy: str, mode: str, threads: int):
+    """
+    워커마다 모델 로드 + explainer 생성 (작업마다 모델/배경을 pickle 로 넘기지 않음)
+    - 배경 행렬은 공유 폴더의 .npy 를 memory-map (프로세스끼리 같은 페이지 공유)
+    - 첫 호출의 워밍업(permutation SHAP 은 ~10s)도 여기서 끝내 둠
+    """
+    if threads > 0:
+        try:
+            from threadpoolctl import threadpool_limits
+            threadpool_limits(threads)
+        except ImportError:
+            pass
+    background = np.load(background_npy, mmap_mode="r")
+    explainer = build_explainer_for_expected_grade(load_model(model_path), background, mode=mode)
+    shap_values_for_batch(explainer, np.asarray(background[:1], dtype=np.float32))
+    _WORKER["explainer"] = explainer
+
+
+def _explain_shard(task: Tuple[str, str, int, int]) -> Tuple[int, float]:
+    """공유 입력 X[start:stop] 해석 → 공유 결과 배열의 같은 위치에 기록 (반환은 행 수/시간만)"""
+    x_path, out_path, start, stop = task
+    t0 = time.perf_counter()
+    X = np.load(x_path, mmap_mode="r")
+    out = np.load(out_path, mmap_mode="r+")
+    out[start:stop] = shap_values_for_batch(_WORKER["explainer"], np.asarray(X[start:stop]))
+    out.flush()
+    return stop - start, time.perf_counter() - t0
+
+
+def plan_shards(n_rows: int, workers: int, shards_per_worker: int = SHARDS_PER_WORKER,
+                min_shard_rows: int = MIN_SHARD_ROWS) -> List[Tuple[int, int]]:
+    """[0, n_rows) → 비슷한 크기의 연속 구간 목록"""
+    if n_rows == 0:
+        return []
+    n_shards = max(1, min(workers * shards_per_worker, -(-n_rows // min_shard_rows)))
+    bounds = np.linspace(0, n_rows, n_shards + 1).round().astype(int)
+    return [(int(a), int(b)) for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+
+
+class ShapPool:
+    """
+    여러 프로세스로 나눠서 계산하는 기대등급 SHAP 해석기
+    - explain(X): 행을 샤드로 나눠 워커들이 병렬 해석 → (n_rows, n_features) float32 한 배열
+    - 입력 X 와 결과는 공유 폴더의 memory-mapped .npy 로 주고받고, 작업에는 (파일 경로, 구간)만 전달
+    - 모델/배경 데이터는 워커당 한 번만 로드 (배경은 memory-map)
+    - workers=1 이면 현재 프로세스에서 그대로 계산 (결과 형식 동일)
+    - permutation SHAP 은 표본 추출이 있어 실행마다 값이 조금 다름 (직렬 계산도 마찬가지), tree 는 결정적
+    """
+    def __init__(
+        self,
+        model_path: str = MODEL_PATH,
+        background_path: str = BACKGROUND_PATH,
+        mode: str = "permutation",
+        workers: Optional[int] = None,
+        shared_dir: Optional[str] = SHARED_DIR,
+        start_method: str = "spawn"
+    ):
+        self.model_path = model_path
+        self.mode = mode
+        self.workers = max(1, int(workers or os.cpu_count() or 1))
+        background, self.feature_names = load_background(background_path)
+        self.n_features = background.shape[1]
+        self.last_stats: Dict[str, Any] = {}
+        self._dir = tempfile.mkdtemp(prefix="shap_pool_", dir=shared_dir)
+        self._background_npy = os.path.join(self._dir, "background.npy")
+        np.save(self._background_npy, np.asarray(background, dtype=np.float32))
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._explainer = None
+        if self.workers > 1:
+            threads = max(1, (os.cpu_count() or 1) // self.workers)
+            # spawn: 부모 프로세스에서 이미 돈 LightGBM(OpenMP) 스레드 풀을 fork 로 물려받지 않도록
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context(start_method),
+                initializer=_init_worker,
+                initargs=(model_path, self._background_npy, mode, threads),
+            )
+
+    def warmup(self) -> float:
+        """워커를 모두 띄우고 초기화가 끝날 때까지 대기 (측정에서 기동 시간을 빼려면 먼저 호출) → 걸린 시간"""
+        t0 = time.perf_counter()
+        if self._executor is None:
+            background = np.load(self._background_npy, mmap_mode="r")
+            shap_values_for_batch(self._local_explainer(), np.asarray(background[:1], dtype=np.float32))
+        else:
+            list(self._executor.map(_noop, range(self.workers * 2)))
+        return time.perf_counter() - t0
+
+    def _local_explainer(self):
+        if self._explainer is None:
+            background = np.load(self._background_npy, mmap_mode="r")
+            self._explainer = build_explainer_for_expected_grade(load_model(self.model_path), background, mode=self.mode)
+        return self._explainer
+
+    def explain(self, X: np.ndarray) -> np.ndarray:
+        """X (n_rows, n_features) → 기대등급 SHAP 값 (n_rows, n_features) float32, 입력 행 순서"""
+        X = np.ascontiguousarray(np.atleast_2d(X), dtype=np.float32)
+        if X.shape[1] != self.n_features:
+            raise ValueError(f"피처 수가 다름: {X.shape[1]} != {self.n_features}")
+        n = X.shape[0]
+        t0 = time.perf_counter()
+        if self._executor is None or n == 0:
+            out = (shap_values_for_batch(self._local_explainer(), X).astype(np.float32) if n
+                   else np.zeros((0, self.n_features), dtype=np.float32))
+            self.last_stats = {"rows": n, "shards": 1 if n else 0, "wall_seconds": time.perf_counter() - t0}
+            return out
+
+        call = uuid.uuid4().hex
+        x_path = os.path.join(self._dir, f"x_{call}.npy")
+        out_path = os.path.join(self._dir, f"out_{call}.npy")
+        try:
+            np.save(x_path, X)
+            np.lib.format.open_memmap(out_path, mode="w+", dtype=np.float32, shape=X.shape).flush()
+            shards = plan_shards(n, self.workers)
+            results = list(self._executor.map(_explain_shard, [(x_path, out_path, a, b) for a, b in shards]))
+            out = np.array(np.load(out_path, mmap_mode="r"))
+        finally:
+            for path in (x_path, out_path):
+                if os.path.exists(path):
+                    os.remove(path)
+        self.last_stats = {
+            "rows": n,
+            "shards": len(shards),
+            "wall_seconds": time.perf_counter() - t0,
+            "shard_seconds": [s for _n, s in results],
+        }
+        return out
+
+    def penalties(self, X: np.ndarray) -> List[List[Tuple[str, float]]]:
+        """shap_penalties_for_batch 와 같은 형식 (행마다 양수 기여만 크기순)"""
+        return [penalties_from_values(v, self.feature_names) for v in self.explain(X)]
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+        shutil.rmtree(self._dir, ignore_errors=True)
+
+    def __enter__(self) -> "ShapPool":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _noop(_i: int) -> int:
+    return os.getpid()
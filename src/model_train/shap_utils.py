@@ -12,12 +12,59 @@ def expected_grade_proba(model, X: np.ndarray) -> np.ndarray:
     classes = np.arange(1, P.shape[1] + 1)  # [1..5]
     return (P * classes).sum(axis=1)
 
-def build_explainer_for_expected_grade(model, background_X: np.ndarray):
+class TreeExpectedGradeExplainer:
+    """
+    LightGBM 트리에서 바로 기대등급 기여도를 계산하는 Explainer
+    - pred_contrib(TreeSHAP)로 클래스별 raw score 기여도 phi[k, j]를 구하고
+    - 기대등급 E = sum_k k * softmax(z)_k 의 기울기 dE/dz_k 를
+      기준점 z0 → z(x) 직선 경로에서 적분(Gauss-Legendre)해 가중합
+    - sum_j phi_E[j] = E(x) - E(z0) 가 성립(가법성), predict_proba 반복 호출 없음
+    - 기준점은 학습 데이터 분포(트리 cover) 기반이라 background_X 를 쓰지 않음
+    """
+    def __init__(self, model, n_nodes: int = 16):
+        self.booster = model.booster_ if hasattr(model, "booster_") else model
+        nodes, weights = np.polynomial.legendre.leggauss(n_nodes)
+        self.nodes = (nodes + 1.0) / 2.0  # [-1, 1] → [0, 1]
+        self.weights = weights / 2.0
+
+    def __call__(self, X: np.ndarray) -> shap.Explanation:
+        X = np.atleast_2d(X)
+        n, p = X.shape
+        contrib = np.asarray(self.booster.predict(X, pred_contrib=True))
+        contrib = contrib.reshape(n, -1, p + 1)  # (n, n_classes, n_features + bias)
+        phi = contrib[:, :, :p]
+        z0 = contrib[:, :, p]
+        z = contrib.sum(axis=2)
+
+        classes = np.arange(1, contrib.shape[1] + 1)
+        grad = np.zeros_like(z)
+        for a, w in zip(self.nodes, self.weights):
+            za = z0 + a * (z - z0)
+            P = np.exp(za - za.max(axis=1, keepdims=True))
+            P /= P.sum(axis=1, keepdims=True)
+            grad += w * P * (classes - (P * classes).sum(axis=1, keepdims=True))
+
+        P0 = np.exp(z0 - z0.max(axis=1, keepdims=True))
+        P0 /= P0.sum(axis=1, keepdims=True)
+        values = np.einsum("nk,nkp->np", grad, phi)
+        return shap.Explanation(values=values, base_values=(P0 * classes).sum(axis=1), data=X)
+
+EXPLAINER_MODES = ("permutation", "tree")
+
+def build_explainer_for_expected_grade(model, background_X: np.ndarray, mode: str = "permutation"):
     """
     기대등급 함수를 대상으로 SHAP Explainer 구성
+    - mode="permutation": predict_proba 기반 model-agnostic shap.Explainer (기존 방식)
+      배경 행은 넘겨받은 그대로 모두 사용 (shap 기본 masker 는 100행 초과 시 무작위 100행으로 줄임)
+    - mode="tree": LightGBM 트리 기반 TreeExpectedGradeExplainer (빠름, background 불필요)
     """
+    if mode == "tree":
+        return TreeExpectedGradeExplainer(model)
+    if mode != "permutation":
+        raise ValueError(f"지원하지 않는 explainer mode: {mode} (가능: {EXPLAINER_MODES})")
     f = lambda X: expected_grade_proba(model, X)
-    explainer = shap.Explainer(f, background_X)
+    masker = shap.maskers.Independent(background_X, max_samples=max(len(background_X), 1))
+    explainer = shap.Explainer(f, masker)
     return explainer
 
 def shap_penalties_for_sample(
@@ -30,10 +77,33 @@ def shap_penalties_for_sample(
     - 기대등급을 '올리는' 방향(=나빠지는 쪽) 기여만 penalty로 사용
     - 양수만 취하고 크기순 정렬
     """
-    phi = explainer(X_row)  # shap values for expected grade
-    vals = np.asarray(phi.values)[0]  # (n_features,)
+    return shap_penalties_for_batch(explainer, X_row, feature_names)[0]  # [(var, penalty), ...]
+
+def shap_values_for_batch(explainer, X: np.ndarray) -> np.ndarray:
+    """
+    여러 샘플(X shape: (n, n_features))을 explainer 한 번 호출로 해석
+    - return: 기대등급 기준 SHAP 값 (n, n_features)
+    """
+    phi = explainer(X)
+    return np.asarray(phi.values).reshape(X.shape[0], -1)
+
+def penalties_from_values(vals: np.ndarray, feature_names: List[str]) -> List[Tuple[str, float]]:
+    """
+    한 행의 SHAP 값 (n_features,) → 양수(감점) 기여만 크기순 정렬한 (변수, penalty) 리스트
+    """
     penalties = np.maximum(0.0, vals)
 
     pairs = [(feature_names[i], float(penalties[i])) for i in range(len(feature_names)) if penalties[i] > 0]
     pairs.sort(key=lambda x: x[1], reverse=True)
-    return pairs  # [(var, penalty), ...]
+    return pairs
+
+def shap_penalties_for_batch(
+    explainer,
+    X: np.ndarray,
+    feature_names: List[str]
+) -> List[List[Tuple[str, float]]]:
+    """
+    배치 버전: 행마다 shap_penalties_for_sample 과 같은 (변수, penalty) 리스트 반환
+    """
+    vals = shap_values_for_batch(explainer, X)
+    return [penalties_from_values(v, feature_names) for v in vals]
@@ -0,0 +1,177 @@
+# src/model_train/streaming_eval.py
+from typing import Any, Dict, Iterator, List, Optional
+import json
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from model_train.metrics import GradeMetrics
+from model_train.infer import backend_classes
+from labeling.data_store import PROCESSED_DIR, FORMATS, resolve_dataset, apply_schema, column_types_for
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+DATA_PATH = os.path.join(PROJECT_ROOT, "data/processed/val")
+
+TARGET_COL = "ConditionLabel"
+
+# 한 번에 읽어서 인코딩/추론하는 행 수 (메모리 사용량 상한 = 청크 크기 × 백엔드 수 만큼의 확률 배열)
+DEFAULT_CHUNK_ROWS = 65536
+
+
+def iter_chunks(name_or_path: str, columns: Optional[List[str]] = None, chunk_rows: int = DEFAULT_CHUNK_ROWS,
+                data_dir: str = PROCESSED_DIR) -> Iterator[Any]:
+    """
+    평가 데이터셋을 chunk_rows 행씩 나눠 읽기 (전체를 메모리에 올리지 않음)
+    - parquet: row group 단위로 디코딩하며 배치 생성 / feather: memory-map 후 slice (복사 없음)
+    - csv: pandas chunksize 로 읽고 학습 데이터와 같은 dtype 적용
+    - 파일에 없는 컬럼은 건너뜀 (인코더가 0 으로 채움)
+    """
+    path = resolve_dataset(name_or_path, data_dir)
+    if path.endswith(FORMATS["parquet"]):
+        pf = pq.ParquetFile(path, memory_map=True)
+        if columns is not None:
+            columns = [c for c in columns if c in pf.schema_arrow.names]
+        for batch in pf.iter_batches(batch_size=chunk_rows, columns=columns):
+            yield pa.Table.from_batches([batch])
+    elif path.endswith(FORMATS["feather"]):
+        table = feather.read_table(path, memory_map=True)
+        if columns is not None:
+            table = table.select([c for c in columns if c in table.column_names])
+        for start in range(0, table.num_rows, chunk_rows):
+            yield table.slice(start, chunk_rows)
+    else:
+        usecols = None if columns is None else (lambda c: c in columns)
+        for df in pd.read_csv(path, usecols=usecols, chunksize=chunk_rows):
+            yield apply_schema(df, column_types_for(path))
+
+
+class StreamingEvaluator:
+    """
+    청크 단위 다중 백엔드 평가기
+    - 청크를 한 번 인코딩해서 모든 백엔드에 같은 배열으로 추론 → 데이터는 한 번만 읽음
+    - 백엔드별 GradeMetrics(혼동 행렬/MAE/±1/log-loss) 누적 + 첫 백엔드 기준 등급 일치율, 최대 확률 차이
+    """
+    def __init__(self, backends: Dict[str, Any], encoder, classes: Optional[List[int]] = None,
+                 target: str = TARGET_COL):
+        if not backends:
+            raise ValueError("평가할 백엔드가 없음")
+        self.backends = dict(backends)
+        self.encoder = encoder
+        self.target = target
+        self.reference = next(iter(self.backends))
+        first = self.backends[self.reference]
+        self.classes = list(classes) if classes is not None else backend_classes(first)
+        self.metrics = {name: GradeMetrics(self.classes) for name in self.backends}
+        self.predict_seconds = {name: 0.0 for name in self.backends}
+        self.agree = {name: 0 for name in self.backends}
+        self.max_abs_diff = {name: 0.0 for name in self.backends}
+        self.encode_seconds = 0.0
+        self.n_chunks = 0
+        self._buf: Optional[np.ndarray] = None
+
+    @property
+    def columns(self) -> List[str]:
+        """데이터셋에서 읽을 컬럼 (인코더 입력 + 정답)"""
+        return [*self.encoder.numeric_cols, *self.encoder.categories, self.target]
+
+    def update(self, chunk) -> "StreamingEvaluator":
+        names = chunk.column_names if isinstance(chunk, pa.Table) else list(chunk.columns)
+        if self.target not in names:
+            raise ValueError(f"평가 데이터에 정답 컬럼이 없음: {self.target}")
+        n = len(chunk) if not isinstance(chunk, pa.Table) else chunk.num_rows
+        if n == 0:
+            return self
+        # 인코딩 버퍼는 가장 큰 청크 크기로 한 번만 할당해서 재사용
+        if self._buf is None or self._buf.shape[0] < n:
+            self._buf = np.empty((n, self.encoder.n_features), dtype=np.float32)
+        t0 = time.perf_counter()
+        X = self.encoder.encode_columns(chunk, out=self._buf[:n])
+        self.encode_seconds += time.perf_counter() - t0
+        y = np.asarray(chunk[self.target]).astype(np.int64)
+
+        ref_grade = None
+        ref_proba = None
+        for name, backend in self.backends.items():
+            t0 = time.perf_counter()
+            proba = np.asarray(backend.predict_proba(X), dtype=np.float64)
+            self.predict_seconds[name] += time.perf_counter() - t0
+            self.metrics[name].update(y, proba)
+            grade = proba.argmax(axis=1)
+            if ref_proba is None:
+                ref_grade, ref_proba = grade, proba
+            self.agree[name] += int((grade == ref_grade).sum())
+            self.max_abs_diff[name] = max(self.max_abs_diff[name], float(np.abs(proba - ref_proba).max()))
+        self.n_chunks += 1
+        return self
+
+    def result(self) -> Dict[str, Any]:
+        out: Dict[str, Any] = {"classes": self.classes, "reference": self.reference, "n_chunks": self.n_chunks,
+                               "encode_seconds": self.encode_seconds, "backends": {}}
+        for name, m in self.metrics.items():
+            r = m.result()
+            out["backends"][name] = {
+                **r,
+                "predict_seconds": self.predict_seconds[name],
+                "rows_per_second": r["n"] / self.predict_seconds[name] if self.predict_seconds[name] else None,
+                "grade_agreement": self.agree[name] / r["n"] if r["n"] else None,
+                "max_abs_diff": self.max_abs_diff[name],
+            }
+        return out
+
+
+def evaluate_stream(name_or_path: str, backends: Dict[str, Any], encoder, chunk_rows: int = DEFAULT_CHUNK_ROWS,
+                    classes: Optional[List[int]] = None, target: str = TARGET_COL) -> Dict[str, Any]:
+    """데이터셋을 청크로 한 번 훑으면서 모든 백엔드 평가 → StreamingEvaluator.result() + 전체 시간"""
+    evaluator = StreamingEvaluator(backends, encoder, classes=classes, target=target)
+    t0 = time.perf_counter()
+    for chunk in iter_chunks(name_or_path, evaluator.columns, chunk_rows):
+        evaluator.update(chunk)
+    report = evaluator.result()
+    report["wall_seconds"] = time.perf_counter() - t0
+    report["data"] = resolve_dataset(name_or_path)
+    report["chunk_rows"] = chunk_rows
+    return report
+
+
+def print_report(report: Dict[str, Any]):
+    print(f"[평가 데이터] {report['data']} (청크 {report['n_chunks']}개 × 최대 {report['chunk_rows']}행, "
+          f"전체 {report['wall_seconds']:.2f}s, 인코딩 {report['encode_seconds']:.2f}s)")
+    print("  backend        n  accuracy     MAE      ±1  log-loss  agree(ref)  max|Δp|   rows/s")
+    for name, r in report["backends"].items():
+        ll = f"{r['log_loss']:8.4f}" if r["log_loss"] is not None else "       -"
+        print(f"  {name:<8} {r['n']:>7}  {r['accuracy']:8.4f}  {r['mae']:6.4f}  {r['within_one']:6.4f}  {ll}"
+              f"  {r['grade_agreement']:10.4f}  {r['max_abs_diff']:7.1e}  {r['rows_per_second']:8.0f}")
+    for name, r in report["backends"].items():
+        print(f"\n[{name}] 혼동 행렬 (행: 실제 {report['classes']}, 열: 예측)")
+        for grade, row in zip(report["classes"], r["confusion"]):
+            print(f"  {grade}: " + " ".join(f"{v:>7d}" for v in row))
+
+
+if __name__ == "__main__":
+    import argparse
+    from model_train.feature_encoder import FeatureEncoder, FEATURE_ENCODER_PATH
+    from model_train.infer import BACKENDS, INFERENCE_CONFIG_PATH, load_backend_from_config
+
+    parser = argparse.ArgumentParser(description="평가 데이터를 청크로 스트리밍하며 여러 추론 백엔드를 한 번에 평가")
+    parser.add_argument("--data", default=DATA_PATH, help="평가 데이터셋 (parquet/feather/csv, 이름만 줘도 됨)")
+    parser.add_argument("--backends", nargs="+", default=["lightgbm"], choices=sorted(BACKENDS),
+                        help="첫 번째가 일치율/확률 차이의 기준")
+    parser.add_argument("--config", default=INFERENCE_CONFIG_PATH, help="백엔드별 모델 경로/옵션")
+    parser.add_argument("--encoder", default=FEATURE_ENCODER_PATH)
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS)
+    parser.add_argument("--out", default=None, help="리포트 JSON 저장 경로")
+    args = parser.parse_args()
+
+    backends = {kind: load_backend_from_config(args.config, kind=kind) for kind in args.backends}
+    result = evaluate_stream(args.data, backends, FeatureEncoder.load(args.encoder), chunk_rows=args.chunk_rows)
+    print_report(result)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"\n리포트 저장: {args.out}")
@@ -0,0 +1,68 @@
+import os
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional
+
+from model_train.feature_encoder import FeatureEncoder
+from model_train.background import DEFAULT_BACKGROUND_METHOD, build_background, save_background
+
+
+class BackendLoader:
+    """
+    CoachPipeline 을 GUI 스레드 밖에서 한 번만 생성
+    - start() 를 로그인 화면을 띄우기 전에 호출하면, 사용자가 로그인하는 동안 백그라운드에서 로드
+    - pandas / shap / lightgbm import 도 로더 스레드에서 처음 일어남
+    - 배경 artifact(npz)가 없으면 train.csv 에서 한 번 만들어 저장해 두고 다음부터 재사용
+    """
+    def __init__(self, model_path: str, background_path: str, encoder_path: str, train_data_path: str, **pipeline_kwargs):
+        self.model_path = model_path
+        self.background_path = background_path
+        self.encoder_path = encoder_path
+        self.train_data_path = train_data_path
+        self.pipeline_kwargs = pipeline_kwargs
+
+        # 인코더는 작은 json 이라 바로 로드 (없으면 로더 스레드에서 train.csv 로 생성)
+        self.encoder: Optional[FeatureEncoder] = (
+            FeatureEncoder.load(encoder_path) if os.path.exists(encoder_path) else None
+        )
+        self.load_seconds: Optional[float] = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="backend-loader")
+        self._future: Optional[Future] = None
+
+    def start(self) -> Future:
+        if self._future is None:
+            self._future = self._executor.submit(self._build)
+            self._executor.shutdown(wait=False)
+        return self._future
+
+    def ready(self) -> bool:
+        return self._future is not None and self._future.done()
+
+    def get(self, timeout: Optional[float] = None):
+        """생성된 CoachPipeline 반환 (아직 로드 중이면 완료까지 대기)"""
+        return self.start().result(timeout)
+
+    def _build(self):
+        t0 = time.perf_counter()
+        from coach.pipeline import CoachPipeline
+
+        if not os.path.exists(self.background_path) or self.encoder is None:
+            from labeling.data_store import read_dataset
+
+            df_train = read_dataset(self.train_data_path)
+            if self.encoder is None:
+                self.encoder = FeatureEncoder.fit(df_train)
+            background_X = build_background(df_train, self.encoder, DEFAULT_BACKGROUND_METHOD)
+            save_background(self.background_path, background_X, self.encoder.feature_names,
+                            method=DEFAULT_BACKGROUND_METHOD)
+            print(f"[INFO] SHAP 배경 데이터 생성: {self.background_path}")
+
+        pipeline = CoachPipeline.from_artifacts(self.model_path, self.background_path, **self.pipeline_kwargs)
+        self.load_seconds = time.perf_counter() - t0
+
+        print("="*50)
+        print("로드된 모델 객체의 정보:")
+        print(pipeline.model)
+        print(f"백엔드 로드 시간: {self.load_seconds:.2f}s")
+        print("="*50)
+        return pipeline
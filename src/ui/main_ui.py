@@ -1,3 +1,7 @@
+import time
+# 시작 시간 측정 기준점 (무거운 import 전에 기록)
+_PROCESS_T0 = time.perf_counter()
+
 import sys
 import os
 
@@ -5,22 +9,36 @@ current_dir = os.path.dirname(__file__)
 parent_dir = os.path.abspath(os.path.join(current_dir, '..'))
 sys.path.append(parent_dir)
 
-import numpy as np
-import pandas as pd
+from PySide6.QtCore import QTimer, QThreadPool
 from PySide6.QtWidgets import QApplication, QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QStackedWidget, QMessageBox
 
 from login_ui import LoginWindow
 from home_ui import MainWindow
 from today_ui import TodayInputPage
 from result_ui import ResultPage
-from coach.pipeline import CoachPipeline
+from backend_loader import BackendLoader
+from prediction_worker import PredictionWorker
+from model_train.feature_encoder import parse_today_input
+from coach.prediction_cache import PredictionCache, DEFAULT_QUANTIZE_STEPS
+
+# 시작 시간 측정 모드에서 첫 예측에 쓰는 입력
+SAMPLE_INPUT = {
+    "sleep_time": "07:00:00", "activity_time": "01:00:00", "phone_time": "03:00:00", "caffeine": "2",
+    "mood_score": "60", "temp": "21", "humidity": "45", "pm10": "30"
+}
 
 
 class ApplicationWindow(QWidget):
-    def __init__(self, pipeline: CoachPipeline, feature_names: list):
+    def __init__(self, backend: BackendLoader):
         super().__init__()
-        self.pipeline = pipeline
-        self.feature_names = feature_names
+        # 파이프라인은 백그라운드에서 로드 중일 수 있으므로 예측 워커에서 backend.get() 으로 꺼냄
+        self.backend = backend
+
+        # 예측은 GUI 스레드 밖(QThreadPool)에서 실행, 가장 최근 제출만 화면에 반영
+        self.thread_pool = QThreadPool(self)
+        self.thread_pool.setMaxThreadCount(1)
+        self._latest_request_id = 0
+        self._pending_raw_data = {}
 
         self.setWindowTitle("Fiture")
         self.setFixedSize(400, 800)
@@ -74,27 +92,32 @@ class ApplicationWindow(QWidget):
     def handle_prediction(self, raw_data: dict):
         try:
             print("Today's input data:", raw_data)
-            def time_str_to_hours(time_str):
-                parts = time_str.split(':')
-                h, m, s = 0, 0, 0
-                if len(parts) >= 2: h, m = map(int, parts[:2])
-                if len(parts) == 3: s = int(parts[2])
-                return h + (m / 60) + (s / 3600)
-
-            sleep_time = time_str_to_hours(raw_data["sleep_time"])
-            activity_time = time_str_to_hours(raw_data["activity_time"])
-            phone_time = time_str_to_hours(raw_data["phone_time"])
-            caffeine = int(raw_data["caffeine"])
-            mood_score = int(raw_data["mood_score"])
-            temp = float(raw_data["temp"])
-            humidity = float(raw_data["humidity"])
-            pm10 = float(raw_data["pm10"])
-            input_df = pd.DataFrame(
-                [{"SleepTime": sleep_time, "ActivityTime": activity_time, "PhoneTime": phone_time, "Caffeine": caffeine,
-                  "MoodScore": mood_score, "Temp": temp, "Humidity": humidity, "PM10": pm10}])
-            input_processed = pd.get_dummies(input_df).reindex(columns=self.feature_names, fill_value=0)
-            X_row = input_processed.values.astype(np.float32)
-            card_result = self.pipeline.predict_card(X_row)
+            record = parse_today_input(raw_data)
+        except (ValueError, KeyError, IndexError) as e:
+            QMessageBox.warning(self, "Input Error", "입력값을 확인해주세요. 시간은 hh:mm:ss 형식, 나머지는 숫자로 입력해야 합니다.")
+            return
+
+        # 새 제출이 오면 이전 요청은 취소(대기 중이면 큐에서 제거, 실행 중이면 결과 무시)
+        self._latest_request_id += 1
+        request_id = self._latest_request_id
+        self.thread_pool.clear()
+        self._pending_raw_data = {request_id: raw_data}
+
+        worker = PredictionWorker(request_id, record, self.backend, self.is_current_request)
+        worker.signals.finished.connect(self.on_prediction_finished)
+        worker.signals.failed.connect(self.on_prediction_failed)
+        self.today_page.set_busy(True)
+        self.thread_pool.start(worker)
+
+    def is_current_request(self, request_id: int) -> bool:
+        return request_id == self._latest_request_id
+
+    def on_prediction_finished(self, request_id: int, card_result: dict):
+        if not self.is_current_request(request_id):
+            return
+        self.today_page.set_busy(False)
+        raw_data = self._pending_raw_data.pop(request_id, {})
+        try:
             print("Generated card_result:", card_result)
 
             print("받아온 card_result 내용:", card_result)
@@ -120,11 +143,16 @@ class ApplicationWindow(QWidget):
             self.result_page.update_results(card_result, raw_data)
             self.switch_page(2)
 
-        except (ValueError, KeyError, IndexError) as e:
-            QMessageBox.warning(self, "Input Error", "입력값을 확인해주세요. 시간은 hh:mm:ss 형식, 나머지는 숫자로 입력해야 합니다.")
         except Exception as e:
             QMessageBox.critical(self, "Error", f"예측 중 오류가 발생했습니다:\n{e}")
 
+    def on_prediction_failed(self, request_id: int, message: str):
+        if not self.is_current_request(request_id):
+            return
+        self.today_page.set_busy(False)
+        self._pending_raw_data.pop(request_id, None)
+        QMessageBox.critical(self, "Error", f"예측 중 오류가 발생했습니다:\n{message}")
+
     def switch_page(self, index):
         if index == 2:
             self.stacked_widget.setCurrentIndex(2)
@@ -271,9 +299,10 @@ class ApplicationWindow(QWidget):
 
 # MainApplication 클래스와 if __name__ == '__main__' 부분은 이전과 동일
 class MainApplication:
-    def __init__(self):
+    def __init__(self, measure_startup: bool = False):
         self.app = QApplication(sys.argv)
         self.login_window = LoginWindow()
+        self.measure_startup = measure_startup
 
         # --- [핵심] 백엔드 파이프라인 객체 생성 ---
         # 1. 프로젝트 최상위 경로 계산
@@ -282,42 +311,52 @@ class MainApplication:
         PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
 
         # 2. 모델 및 데이터 경로 설정
-        model_path = os.path.join(PROJECT_ROOT, "data", "models", "model_lgbm.pkl")
-        train_data_path = os.path.join(PROJECT_ROOT, "data", "processed", "train.csv")
-
-        # 3. SHAP 분석을 위한 배경 데이터 준비
-        df_train = pd.read_csv(train_data_path)
-        X_train = pd.get_dummies(df_train.drop("ConditionLabel", axis=1))
-
-        background_X = X_train.head(100).values.astype(np.float32)
-
-        self.feature_names = X_train.columns.tolist()
-
-        # 4. 파이프라인 객체 생성
-        self.pipeline = CoachPipeline(
-            model_path=model_path,
-            background_X=background_X,
-            feature_names=self.feature_names
+        models_dir = os.path.join(PROJECT_ROOT, "data", "models")
+        train_data_path = os.path.join(PROJECT_ROOT, "data", "processed", "train")
+
+        # 3. 파이프라인은 로그인 화면이 떠 있는 동안 백그라운드 스레드에서 로드
+        #    (SHAP 배경 데이터/피처 이름은 학습 때 저장한 artifact 사용)
+        self.backend = BackendLoader(
+            model_path=os.path.join(models_dir, "model_lgbm.pkl"),
+            background_path=os.path.join(models_dir, "shap_background.npz"),
+            encoder_path=os.path.join(models_dir, "feature_encoder.json"),
+            train_data_path=train_data_path,
+            # 같은 값 재제출(오타 수정 후 재시도, 결과 화면에서 돌아오기 등)은 캐시에서 바로 응답
+            cache=PredictionCache(max_size=128, ttl_seconds=6 * 3600, quantize_steps=DEFAULT_QUANTIZE_STEPS)
         )
+        self.backend.start()
 
-        print("="*50)
-        print("로드된 모델 객체의 정보:")
-        print(self.pipeline.model)
-        print("="*50)
-
-        self.app_window = ApplicationWindow(self.pipeline, self.feature_names)
+        self.app_window = ApplicationWindow(self.backend)
 
         self.login_window.login_successful.connect(self.show_main_window)
 
     def run(self):
         self.login_window.show()
+        if self.measure_startup:
+            QTimer.singleShot(0, self.report_startup)
         sys.exit(self.app.exec())
 
     def show_main_window(self):
         self.login_window.close()
         self.app_window.show()
 
+    def report_startup(self):
+        """--measure-startup: 첫 창까지 / 첫 예측까지 걸린 시간 출력 후 종료"""
+        t_window = time.perf_counter() - _PROCESS_T0
+        pipeline = self.backend.get()
+        t_ready = time.perf_counter() - _PROCESS_T0
+        X_row = self.backend.encoder.encode_record(parse_today_input(SAMPLE_INPUT))
+        pipeline.predict_card(X_row)
+        t_pred = time.perf_counter() - _PROCESS_T0
+
+        print("="*50)
+        print(f"time-to-first-window    : {t_window:.3f}s")
+        print(f"time-to-backend-ready   : {t_ready:.3f}s (로더 {self.backend.load_seconds:.3f}s)")
+        print(f"time-to-first-prediction: {t_pred:.3f}s")
+        print("="*50)
+        self.app.quit()
+
 
 if __name__ == '__main__':
-    main_app = MainApplication()
-    main_app.run()
\ No newline at end of file
+    main_app = MainApplication(measure_startup="--measure-startup" in sys.argv)
+    main_app.run()
@@ -0,0 +1,45 @@
+from typing import Callable
+
+from PySide6.QtCore import QObject, QRunnable, Signal
+
+
+class PredictionSignals(QObject):
+    """워커 → GUI 스레드 결과 전달용 시그널 (QRunnable 은 시그널을 가질 수 없음)"""
+    finished = Signal(int, dict)     # (request_id, card_result)
+    failed = Signal(int, str)        # (request_id, error message)
+    cancelled = Signal(int)          # (request_id)
+
+
+class PredictionWorker(QRunnable):
+    """
+    QThreadPool 에서 실행되는 예측 작업 1건
+    - backend.get() (로드 대기) → 인코딩 → predict_card 를 GUI 스레드 밖에서 수행
+    - is_current(request_id) 가 False 가 되면(더 새로운 제출이 들어오면) 결과를 버림
+    """
+    def __init__(self, request_id: int, record: dict, backend, is_current: Callable[[int], bool]):
+        super().__init__()
+        self.request_id = request_id
+        self.record = record
+        self.backend = backend
+        self.is_current = is_current
+        self.signals = PredictionSignals()
+
+    def run(self):
+        try:
+            if not self.is_current(self.request_id):
+                self.signals.cancelled.emit(self.request_id)
+                return
+            pipeline = self.backend.get()
+            X_row = self.backend.encoder.encode_record(self.record)
+            if not self.is_current(self.request_id):
+                self.signals.cancelled.emit(self.request_id)
+                return
+            card_result = pipeline.predict_card(X_row)
+        except Exception as e:
+            self.signals.failed.emit(self.request_id, str(e))
+            return
+
+        if self.is_current(self.request_id):
+            self.signals.finished.emit(self.request_id, card_result)
+        else:
+            self.signals.cancelled.emit(self.request_id)
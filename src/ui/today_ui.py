@@ -9,10 +9,14 @@ from PySide6.QtCore import Qt, Signal
 class TodayInputPage(QWidget):
     data_submitted = Signal(dict)
 
+    SAVE_TEXT = "저장하고 예측하기"
+    BUSY_TEXT = "예측 중... (다시 누르면 새 값으로 예측)"
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setObjectName("todayPage")
         self.setWindowTitle("Enter Today's Condition")
+        self._busy = False
 
         main_layout = QVBoxLayout(self)
         main_layout.setContentsMargins(0, 0, 0, 0)
@@ -51,13 +55,13 @@ class TodayInputPage(QWidget):
 
         content_layout.addStretch()
 
-        save_button = QPushButton("저장하고 예측하기")
-        save_button.setObjectName("saveButton")
-        save_button.clicked.connect(self.on_save_clicked)
+        self.save_button = QPushButton(self.SAVE_TEXT)
+        self.save_button.setObjectName("saveButton")
+        self.save_button.clicked.connect(self.on_save_clicked)
 
         # [핵심 수정] 스크롤 영역이 남는 공간을 모두 차지하고, 버튼은 하단에 위치하도록 설정
         main_layout.addWidget(scroll_area, 1)
-        main_layout.addWidget(save_button)
+        main_layout.addWidget(self.save_button)
 
     def create_input_field(self, title_text, placeholder_text, description_text):
         layout = QVBoxLayout()
@@ -74,6 +78,17 @@ class TodayInputPage(QWidget):
         layout.addWidget(description_label)
         return line_edit, layout
 
+    def set_busy(self, busy: bool):
+        """예측 진행 중 표시 (버튼은 눌러둔 채로 두어 새 값 재제출 가능)"""
+        if busy == self._busy:
+            return
+        self._busy = busy
+        self.save_button.setText(self.BUSY_TEXT if busy else self.SAVE_TEXT)
+        if busy:
+            QApplication.setOverrideCursor(Qt.BusyCursor)
+        else:
+            QApplication.restoreOverrideCursor()
+
     def on_save_clicked(self):
         raw_data = {
             "sleep_time": self.sleep_input.text(), "activity_time": self.activity_input.text(),